@@ -0,0 +1,15 @@
+# File: apps.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: app config for the code shared by the apps (cs412/caching.py,
+#   cs412/database.py, cs412/images.py, cs412/templates/...).
+
+from django.apps import AppConfig
+
+
+class Cs412Config(AppConfig):
+    name = "cs412"
+    verbose_name = "CS412 shared"
+
+    def ready(self):
+        import cs412.caching
+        import cs412.database
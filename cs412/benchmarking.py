@@ -0,0 +1,622 @@
+# File: benchmarking.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: load-testing harness for all the apps, used by
+#   `manage.py benchmark`.
+#
+#   Notes:
+#   - seed_<app>() fills a throwaway database with synthetic data at realistic
+#     sizes (SIZES, scaled by --scale): millions of voters, tens of thousands of
+#     marathon results, a power-law mini_insta follow graph (a few profiles are
+#     followed by thousands, most by a handful), thousands of listings. Rows
+#     go in with bulk_create, so the derived tables (feeds, counters, search
+#     index, voter rollups) are rebuilt afterwards, as after an import.
+#   - MIXES lists, for each app, the requests a visitor makes and how often
+#     (weights), including writes such as likes, comments, follows and
+#     interest requests from a pool of logged-in users.
+#   - The mix is replayed in process through the test Client, or over HTTP
+#     against a threaded local WSGI server with several concurrent workers.
+#   - For every endpoint we keep the latency percentiles (p50/p95/p99), the
+#     queries per request (from the Server-Timing header of
+#     cs412/profiling.py), status codes and errors; per app the throughput and
+#     the process memory. save_results() writes it all, with the git commit,
+#     as JSON, and compare_results() diffs two such files.
+
+import json
+import os
+import random
+import re
+import resource
+import socketserver
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dt_time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import django
+import requests
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, transaction
+from django.test import Client
+from django.utils.crypto import get_random_string
+
+# rows per app at --scale 1
+SIZES = {
+    'voters': 2_000_000,
+    'results': 30_000,
+    'profiles': 10_000,
+    'posts': 60_000,
+    'likes': 300_000,
+    'comments': 60_000,
+    'listings': 5_000,
+    'jokes': 2_000,
+    'pictures': 500,
+}
+
+# rows per INSERT while seeding
+BATCH_SIZE = 10_000
+
+# logged-in users per app that the mix sends writes and private pages from
+LOGIN_POOL = 20
+
+WORDS = (
+    "sunset beach coffee brunch campus library snow boston charles river "
+    "marathon concert pizza puppy kitten birthday graduation study finals "
+    "fenway kenmore allston travel hiking mountain city lights friends family "
+    "weekend throwback selfie sunrise garden museum art music dance rain"
+).split()
+FIRST_NAMES = ['Ana', 'Ben', 'Chloe', 'Diego', 'Emma', 'Finn', 'Grace', 'Hugo', 'Ines', 'Jack', 'Kai', 'Lena']
+CITIES = [
+    ('Chicago', 'IL'), ('Boston', 'MA'), ('New York', 'NY'), ('Denver', 'CO'), ('Austin', 'TX'),
+    ('Seattle', 'WA'), ('Madison', 'WI'), ('Toronto', 'ON'), ('London', ''), ('Mexico City', ''),
+]
+PARTIES = ['D', 'R', 'U', 'L', 'J', 'CC', 'G', 'Q']
+PARTY_WEIGHTS = [40, 15, 40, 1, 1, 1, 1, 1]
+
+# around BU, where the TerrierBnB listings are
+BU_LATITUDE, BU_LONGITUDE = 42.3505, -71.1054
+
+
+def bulk_insert(model, objects, batch_size=BATCH_SIZE):
+    '''bulk_create an iterable of unsaved objects in batches; return the saved ones.'''
+    saved = []
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == batch_size:
+            saved += model.objects.bulk_create(batch)
+            batch = []
+    saved += model.objects.bulk_create(batch)
+    return saved
+
+
+def create_users(prefix, n):
+    '''n Users without usable passwords (no hashing) and without signals.'''
+    return bulk_insert(User, (User(username=f'{prefix}{i}', password='!') for i in range(n)))
+
+
+##########################################################################
+# seeding: each seed_<app>(sizes, rng) fills the tables of one app and returns
+# the ids its mix needs, plus 'users' for the logged-in requests
+
+def seed_quotes(sizes, rng):
+    return {}
+
+
+def seed_restaurant(sizes, rng):
+    return {}
+
+
+def seed_mini_insta(sizes, rng):
+    from mini_insta import search
+    from mini_insta.models import Comment, Follow, Like, Photo, Post, Profile
+
+    n = sizes['profiles']
+    users = create_users('insta', n)
+    profiles = bulk_insert(Profile, (
+        Profile(user=user, username=user.username, display_name=f'{rng.choice(FIRST_NAMES)} {i}',
+                bio_text=' '.join(rng.choices(WORDS, k=8)))
+        for i, user in enumerate(users)
+    ))
+    profile_ids = [profile.pk for profile in profiles]
+
+    # Zipf popularity: the profile at rank r is followed in proportion to 1/r
+    popular = profile_ids[:]
+    rng.shuffle(popular)
+    cum_popularity = list(accumulate(1 / rank for rank in range(1, n + 1)))
+
+    def follows():
+        for follower in profile_ids:
+            # heavy-tailed out-degree too: most follow a few dozen, some thousands
+            degree = min(int(rng.paretovariate(1.2) * 4), n - 1)
+            targets = set(rng.choices(popular, cum_weights=cum_popularity, k=degree))
+            targets.discard(follower)
+            for target in targets:
+                yield Follow(profile_id=target, follower_profile_id=follower)
+    bulk_insert(Follow, follows())
+
+    posts = bulk_insert(Post, (
+        Post(profile_id=rng.choice(profile_ids), caption=' '.join(rng.choices(WORDS, k=rng.randint(3, 12))))
+        for i in range(sizes['posts'])
+    ))
+    post_ids = [post.pk for post in posts]
+    bulk_insert(Photo, (
+        Photo(post_id=pk, image_url=f'https://picsum.photos/seed/{pk}-{j}/800/800', rendition_status='skipped')
+        for pk in post_ids for j in range(rng.randint(1, 3))
+    ))
+
+    likes = {(rng.choice(post_ids), rng.choice(profile_ids)) for _ in range(sizes['likes'])}
+    bulk_insert(Like, (Like(post_id=post, profile_id=profile) for post, profile in likes))
+    bulk_insert(Comment, (
+        Comment(post_id=rng.choice(post_ids), profile_id=rng.choice(profile_ids), text=' '.join(rng.choices(WORDS, k=5)))
+        for _ in range(sizes['comments'])
+    ))
+
+    # what the signals and views would have kept up to date
+    call_command('reconcile_counters', stdout=open(os.devnull, 'w'))
+    call_command('rebuild_feeds', stdout=open(os.devnull, 'w'))
+    search.rebuild_index()
+
+    return {
+        'profile_ids': profile_ids, 'popular': popular, 'cum_popularity': cum_popularity, 'post_ids': post_ids,
+        'users': rng.sample(users, min(LOGIN_POOL, n)),
+    }
+
+
+def seed_marathon_analytics(sizes, rng):
+    from marathon_analytics.models import Result
+
+    n = sizes['results']
+    # finish times from about 2h05 to 7h, most around 4h30
+    finishes = sorted(max(7500, min(25200, int(rng.gauss(16200, 3000)))) for _ in range(n))
+    place_gender = Counter()
+    place_division = Counter()
+
+    def results():
+        for place, seconds in enumerate(finishes, start=1):
+            gender = rng.choices(['M', 'F', 'X'], [55, 44, 1])[0]
+            age = rng.randint(18, 79)
+            division = f'{gender}{age - age % 5}-{age - age % 5 + 4}'
+            place_gender[gender] += 1
+            place_division[division] += 1
+            city, state = rng.choice(CITIES)
+            start = 7 * 3600 + 30 * 60 + rng.randrange(3600)
+            half = int(seconds * rng.uniform(0.46, 0.5))
+            yield Result(
+                bib=place * 7 % 100_000, first_name=rng.choice(FIRST_NAMES), last_name=f'Runner{place}',
+                ctz='USA' if state else 'INT', city=city, state=state, gender=gender, division=division,
+                place_overall=place, place_gender=place_gender[gender], place_division=place_division[division],
+                start_time_of_day=clock(start), finish_time_of_day=clock(start + seconds),
+                time_finish=clock(seconds), time_half1=clock(half), time_half2=clock(seconds - half),
+            )
+    bulk_insert(Result, results())
+    return {'cities': [city for city, state in CITIES]}
+
+
+def clock(seconds):
+    '''A time of day from a number of seconds (wrapping past midnight).'''
+    seconds %= 24 * 3600
+    return dt_time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def seed_voter_analytics(sizes, rng):
+    from voter_analytics import rollups
+    from voter_analytics.models import Voter
+
+    last_names = [f'Name{i}' for i in range(5000)]
+
+    def voters():
+        for i in range(sizes['voters']):
+            flags = [1 if rng.random() < p else 0 for p in (0.7, 0.3, 0.2, 0.5, 0.25)]
+            voter = Voter(
+                voter_id=f'B{i:09d}', last_name=rng.choice(last_names), first_name=rng.choice(FIRST_NAMES),
+                address_street_number=rng.randrange(1, 400), address_street_name='Commonwealth Ave',
+                address_zip_code=2459,
+                date_birth=date(rng.randint(1925, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+                party=rng.choices(PARTIES, PARTY_WEIGHTS)[0],
+                v20state=flags[0], v21town=flags[1], v21primary=flags[2], v22general=flags[3], v23town=flags[4],
+                voter_score=sum(flags),
+            )
+            voter.set_derived_fields()
+            yield voter
+    with transaction.atomic():
+        bulk_insert(Voter, voters())
+    rollups.rebuild()
+    pks = Voter.objects.values_list('pk', flat=True)
+    return {'voter_ids': (pks.order_by('pk').first(), pks.order_by('-pk').first())}
+
+
+def seed_dadjokes(sizes, rng):
+    from dadjokes.models import Joke, Picture
+
+    jokes = bulk_insert(Joke, (
+        Joke(joke=f'Why did the {rng.choice(WORDS)} cross the {rng.choice(WORDS)}? #{i}',
+             author=rng.choice(FIRST_NAMES), weight=rng.randint(1, 5))
+        for i in range(sizes['jokes'])
+    ))
+    bulk_insert(Picture, (
+        Picture(image_url=f'https://picsum.photos/seed/joke{i}/600/400', author=rng.choice(FIRST_NAMES),
+                weight=rng.randint(1, 5))
+        for i in range(sizes['pictures'])
+    ))
+    return {'joke_ids': [joke.pk for joke in jokes]}
+
+
+def seed_project(sizes, rng):
+    from project import geo
+    from project.models import InterestRequest, Listing, ListingPhoto, UserProfile
+
+    n = sizes['listings']
+    hosts = create_users('host', max(1, n // 20))
+    subletters = create_users('subletter', max(LOGIN_POOL, n // 10))
+    profiles = bulk_insert(UserProfile, (
+        UserProfile(user=user, display_name=user.username, role=role, email=f'{user.username}@bu.edu')
+        for users, role in [(hosts, 'host'), (subletters, 'subletter')] for user in users
+    ))
+    host_profiles = profiles[:len(hosts)]
+    subletter_profiles = profiles[len(hosts):]
+
+    areas = [value for value, label in Listing.AREA_CHOICES]
+    first_day = date(2026, 1, 1)
+
+    def listings():
+        for i in range(n):
+            start_date = first_day + timedelta(days=rng.randrange(365))
+            latitude = BU_LATITUDE + rng.uniform(-0.03, 0.03)
+            longitude = BU_LONGITUDE + rng.uniform(-0.04, 0.04)
+            yield Listing(
+                lister=rng.choice(host_profiles), title=f'Sublet {i}', description='Furnished room near campus',
+                price_per_month=Decimal(rng.randrange(600, 4000)), address=f'{rng.randrange(1, 999)} Commonwealth Ave',
+                start_date=start_date, end_date=start_date + timedelta(days=rng.choice([30, 60, 90, 120, 180, 365])),
+                area=rng.choice(areas), number_of_roommates=rng.randrange(5),
+                latitude=latitude, longitude=longitude, geohash=geo.encode(latitude, longitude),
+                is_available=rng.random() > 0.1,
+            )
+    listing_ids = [listing.pk for listing in bulk_insert(Listing, listings())]
+    bulk_insert(ListingPhoto, (
+        ListingPhoto(listing_id=pk, image_url=f'https://picsum.photos/seed/listing{pk}-{j}/1200/800',
+                     rendition_status='skipped')
+        for pk in listing_ids for j in range(rng.randint(1, 4))
+    ))
+    requests_sent = {(rng.choice(listing_ids), rng.choice(subletter_profiles).pk) for _ in range(n * 2)}
+    bulk_insert(InterestRequest, (
+        InterestRequest(listing_id=listing, requester_id=requester, message='Is this still available?')
+        for listing, requester in requests_sent
+    ))
+    return {'listing_ids': listing_ids, 'areas': areas, 'users': rng.sample(subletters, LOGIN_POOL)}
+
+
+SEEDERS = {
+    'quotes': seed_quotes,
+    'restaurant': seed_restaurant,
+    'mini_insta': seed_mini_insta,
+    'marathon_analytics': seed_marathon_analytics,
+    'voter_analytics': seed_voter_analytics,
+    'dadjokes': seed_dadjokes,
+    'project': seed_project,
+}
+
+
+##########################################################################
+# request mixes: (endpoint name, weight, logged in?, make) where
+# make(data, rng) returns (method, path, form data or None)
+
+def popular_profile(data, rng):
+    return rng.choices(data['popular'], cum_weights=data['cum_popularity'])[0]
+
+
+def listing_filter(data, rng):
+    return rng.choice([
+        f"area={rng.choice(data['areas'])}",
+        "min_price=1000&max_price=1600&sort=price",
+        f"area={rng.choice(data['areas'])}&start_date=2026-06-01&end_date=2026-08-15",
+    ])
+
+
+def map_viewport(rng, zoom):
+    '''?south=&west=&north=&east=&zoom= for a map window around BU.'''
+    span = 0.5 ** (zoom - 10)
+    south = BU_LATITUDE + rng.uniform(-0.02, 0.02) - span / 2
+    west = BU_LONGITUDE + rng.uniform(-0.02, 0.02) - span / 2
+    return f'south={south:.5f}&west={west:.5f}&north={south + span:.5f}&east={west + span:.5f}&zoom={zoom}'
+
+
+MIXES = {
+    'quotes': [
+        ('quote', 60, False, lambda d, r: ('GET', '/quotes/', None)),
+        ('show_all', 30, False, lambda d, r: ('GET', '/quotes/show_all/', None)),
+        ('about', 10, False, lambda d, r: ('GET', '/quotes/about/', None)),
+    ],
+    'restaurant': [
+        ('main', 50, False, lambda d, r: ('GET', '/restaurant/', None)),
+        ('order', 50, False, lambda d, r: ('GET', '/restaurant/order/', None)),
+    ],
+    'mini_insta': [
+        ('feed', 30, True, lambda d, r: ('GET', '/mini_insta/profile/feed', None)),
+        ('profile', 20, False, lambda d, r: ('GET', f'/mini_insta/profile/{popular_profile(d, r)}', None)),
+        ('post', 20, False, lambda d, r: ('GET', f"/mini_insta/post/{r.choice(d['post_ids'])}", None)),
+        ('followers', 4, False, lambda d, r: ('GET', f'/mini_insta/profile/{popular_profile(d, r)}/followers', None)),
+        ('search', 8, True, lambda d, r: ('GET', f'/mini_insta/profile/search?q={r.choice(WORDS)}', None)),
+        ('all_profiles', 2, False, lambda d, r: ('GET', '/mini_insta/show_all_profiles/', None)),
+        ('like', 8, True, lambda d, r: ('POST', f"/mini_insta/post/{r.choice(d['post_ids'])}/like/", {})),
+        ('comment', 6, True, lambda d, r: (
+            'POST', f"/mini_insta/post/{r.choice(d['post_ids'])}/comment/", {'text': ' '.join(r.choices(WORDS, k=4))})),
+        ('follow', 2, True, lambda d, r: ('POST', f'/mini_insta/profile/{popular_profile(d, r)}/follow/', {})),
+    ],
+    'marathon_analytics': [
+        ('results', 50, False, lambda d, r: ('GET', '/marathon_analytics/results', None)),
+        ('results_city', 35, False, lambda d, r: ('GET', f"/marathon_analytics/results?city={r.choice(d['cities'])}", None)),
+        ('home', 15, False, lambda d, r: ('GET', '/marathon_analytics/', None)),
+    ],
+    'voter_analytics': [
+        ('list', 30, False, lambda d, r: ('GET', '/voter_analytics/', None)),
+        ('filter', 40, False, lambda d, r: ('GET', '/voter_analytics/?' + r.choice([
+            f"party={r.choice(PARTIES)}",
+            f"min_year={r.randint(1930, 1990)}&max_year={r.randint(1991, 2005)}",
+            f"party=d&voter_score={r.randint(0, 5)}",
+            "elections=22general&elections=23town",
+        ]), None)),
+        ('detail', 20, False, lambda d, r: ('GET', f"/voter_analytics/voter/{r.randint(*d['voter_ids'])}/", None)),
+        ('graphs', 10, False, lambda d, r: ('GET', '/voter_analytics/graphs/', None)),
+    ],
+    'dadjokes': [
+        ('random', 30, False, lambda d, r: ('GET', '/dadjokes/', None)),
+        ('api_random', 25, False, lambda d, r: ('GET', '/dadjokes/api/random/', None)),
+        ('api_jokes', 15, False, lambda d, r: ('GET', '/dadjokes/api/jokes/', None)),
+        ('joke', 10, False, lambda d, r: ('GET', f"/dadjokes/joke/{r.choice(d['joke_ids'])}/", None)),
+        ('api_random_picture', 10, False, lambda d, r: ('GET', '/dadjokes/api/random_picture/', None)),
+        ('jokes', 5, False, lambda d, r: ('GET', '/dadjokes/jokes/', None)),
+        ('pictures', 5, False, lambda d, r: ('GET', '/dadjokes/pictures/', None)),
+    ],
+    'project': [
+        ('listings', 30, False, lambda d, r: ('GET', '/project/listings/', None)),
+        ('listings_filtered', 20, False, lambda d, r: ('GET', f'/project/listings/?{listing_filter(d, r)}', None)),
+        ('listing', 25, False, lambda d, r: ('GET', f"/project/listing/{r.choice(d['listing_ids'])}/", None)),
+        ('map', 10, False, lambda d, r: ('GET', f'/project/listings/map/?{map_viewport(r, r.choice([12, 14, 16]))}', None)),
+        ('hosts', 3, False, lambda d, r: ('GET', '/project/hosts/', None)),
+        ('my_interest_requests', 7, True, lambda d, r: ('GET', '/project/my_interest_requests/', None)),
+        ('interest_request', 5, True, lambda d, r: (
+            'POST', f"/project/listing/{r.choice(d['listing_ids'])}/interest/create/", {'message': 'Is it still available?'})),
+    ],
+}
+
+
+##########################################################################
+# replaying a mix
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def query_count(server_timing):
+    '''Queries of one request, from the db entry of its Server-Timing header.'''
+    match = _QUERIES.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+class ClientTransport:
+    '''Sends requests in process through the test Client, one Client per logged-in user.'''
+
+    concurrent = False
+
+    def __init__(self, users):
+        self.clients = {None: Client()}
+        for user in users:
+            self.clients[user.pk] = Client()
+            self.clients[user.pk].force_login(user)
+
+    def send(self, user, method, path, form):
+        client = self.clients[user.pk if user else None]
+        start = time.perf_counter()
+        response = client.get(path) if method == 'GET' else client.post(path, form)
+        elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, query_count(response.get('Server-Timing'))
+
+    def close(self):
+        pass
+
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    # wsgiref writes the headers and the body separately; without this,
+    # Nagle's algorithm holds the body back until the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+
+class WSGITransport:
+    '''
+    Sends requests over HTTP to a threaded WSGI server on a free local port.
+    Logged-in users reuse the session cookie of a force_login(), with a CSRF
+    cookie and header so writes pass CsrfViewMiddleware.
+    '''
+
+    concurrent = True
+
+    def __init__(self, users):
+        self.server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                                  server_class=ThreadingWSGIServer, handler_class=QuietWSGIRequestHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.csrf_token = get_random_string(32)
+        self.cookies = {None: {settings.CSRF_COOKIE_NAME: self.csrf_token}}
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            self.cookies[user.pk] = {
+                settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value,
+                settings.CSRF_COOKIE_NAME: self.csrf_token,
+            }
+
+    def send(self, user, method, path, form):
+        start = time.perf_counter()
+        response = requests.request(
+            method, self.base_url + path, data=form, allow_redirects=False,
+            cookies=self.cookies[user.pk if user else None], headers={'X-CSRFToken': self.csrf_token},
+        )
+        elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, query_count(response.headers.get('Server-Timing'))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+def rss_mb():
+    '''Resident memory of this process in MB (peak RSS where /proc is missing).'''
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles(values):
+    '''{p50, p95, p99} of a list of numbers.'''
+    if len(values) == 1:
+        return {'p50': values[0], 'p95': values[0], 'p99': values[0]}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def summarize(samples):
+    '''Statistics of a list of (status, seconds, queries, allocated bytes or None) samples.'''
+    latencies = [seconds * 1000 for status, seconds, queries, allocated in samples]
+    queries = [queries for status, seconds, queries, allocated in samples if queries is not None]
+    allocated = [allocated / 1024 for status, seconds, queries, allocated in samples if allocated is not None]
+    summary = {
+        'requests': len(samples),
+        'errors': sum(1 for status, seconds, queries, allocated in samples if status is None or status >= 500),
+        'status': dict(Counter(str(status) for status, seconds, queries, allocated in samples)),
+        'latency_ms': {key: round(value, 3) for key, value in percentiles(latencies).items()},
+    }
+    summary['latency_ms'].update(mean=round(statistics.fmean(latencies), 3), max=round(max(latencies), 3))
+    if queries:
+        summary['queries'] = {'mean': round(statistics.fmean(queries), 2), 'max': max(queries)}
+    if allocated:
+        summary['allocated_kb'] = {'p50': round(statistics.median(allocated), 1), 'max': round(max(allocated), 1)}
+    return summary
+
+
+def run_mix(app, data, transport, requests_count, warmup=20, concurrency=1, seed=412, trace_memory=False):
+    '''
+    Replay requests_count weighted requests of the app's mix (after warmup
+    unrecorded ones) and return its summary: overall, per endpoint, throughput
+    and memory.
+    '''
+    mix = MIXES[app]
+    rng = random.Random(seed)
+    users = data.get('users', [])
+    plan = []
+    for endpoint, weight, login, make in rng.choices(mix, [weight for _, weight, _, _ in mix], k=warmup + requests_count):
+        plan.append((endpoint, rng.choice(users) if login else None, make(data, rng)))
+
+    def send(step):
+        endpoint, user, (method, path, form) = step
+        if trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        try:
+            status, seconds, queries = transport.send(user, method, path, form)
+        except Exception:
+            status, seconds, queries = None, 0.0, None
+        allocated = tracemalloc.get_traced_memory()[1] - before if trace_memory else None
+        return endpoint, (status, seconds, queries, allocated)
+
+    for step in plan[:warmup]:
+        send(step)
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(send, plan[warmup:]))
+    else:
+        results = [send(step) for step in plan[warmup:]]
+    wall = time.perf_counter() - start
+
+    by_endpoint = {}
+    for endpoint, sample in results:
+        by_endpoint.setdefault(endpoint, []).append(sample)
+    return {
+        'seconds': round(wall, 3),
+        'throughput_rps': round(len(results) / wall, 1) if wall else None,
+        'memory_mb': {'rss_before': round(rss_before, 1), 'rss_after': round(rss_mb(), 1),
+                      'rss_peak': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)},
+        'overall': summarize([sample for endpoint, sample in results]),
+        'endpoints': {endpoint: summarize(samples) for endpoint, samples in sorted(by_endpoint.items())},
+    }
+
+
+##########################################################################
+# results files
+
+def git_state():
+    '''(commit, dirty) of the working tree, or (None, None) outside git.'''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def run_metadata(options, sizes):
+    commit, dirty = git_state()
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': '.'.join(map(str, sys.version_info[:3])),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'sizes': sizes,
+        **options,
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare_results(old, new, tolerance=0.10):
+    '''
+    Yield (app, endpoint, metric, old value, new value, regressed) for the
+    p50/p95/p99 latency and mean query count of every endpoint in both runs.
+    A latency is a regression when it grew by more than tolerance; a query
+    count when it grew at all.
+    '''
+    for app, new_app in new['apps'].items():
+        old_app = old.get('apps', {}).get(app)
+        if old_app is None:
+            continue
+        for endpoint, stats in [('(all)', new_app['overall'])] + list(new_app['endpoints'].items()):
+            old_stats = old_app['overall'] if endpoint == '(all)' else old_app['endpoints'].get(endpoint)
+            if old_stats is None:
+                continue
+            for key in ('p50', 'p95', 'p99'):
+                before, after = old_stats['latency_ms'][key], stats['latency_ms'][key]
+                yield app, endpoint, f'{key} ms', before, after, after > before * (1 + tolerance)
+            if 'queries' in stats and 'queries' in old_stats:
+                before, after = old_stats['queries']['mean'], stats['queries']['mean']
+                yield app, endpoint, 'queries', before, after, after > before
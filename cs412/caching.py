@@ -0,0 +1,166 @@
+# File: caching.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: per-view response caching with model-driven invalidation,
+#   shared by the apps.
+#
+#   Notes:
+#   - Every model has a version number in the "views" cache (file based, so
+#     all worker processes see the same numbers).
+#   - A cached view lists the models its page is built from (cache_models).
+#     The versions of those models are part of the cache key, so a change to
+#     any of them makes the old entries unreachable; they simply expire.
+#   - Only those models are watched: each app's AppConfig.ready() calls
+#     watch_models() for the models its cached views (and anything else
+#     keyed on the versions, like dadjokes' ETags and sampling) depend on.
+#     That connects post_save/post_delete receivers with sender=..., so saves
+#     of every other model cost nothing here, and it happens in every
+#     process, including `manage.py shell`, loaddata and the commands that
+#     never load the views. The version is bumped once the change commits,
+#     when other connections can see it; a page cached in the meantime was
+#     keyed on the old version. Bulk loaders that skip the signals call
+#     bump_model_version() themselves.
+#   - Anonymous visitors share one entry per URL. Logged-in users get their
+#     own entries (keyed by session), since their pages show their name, a
+#     logout form with their CSRF token, and so on.
+#   - Only plain 200 GET/HEAD responses are stored, and never ones that set a
+#     cookie, show flash messages or put a CSRF token on an anonymous page.
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+DEFAULT_TIMEOUT = 5 * 60
+
+
+def get_cache():
+    return caches[getattr(settings, 'VIEW_CACHE_ALIAS', 'default')]
+
+
+def version_key(model):
+    return f'model_version:{model._meta.label_lower}'
+
+
+def get_model_versions(models):
+    '''
+    Return {model: version} for models in one cache round trip. A missing
+    version starts from the current time in milliseconds, so after an
+    eviction it never returns to a number that older entries were keyed on.
+    '''
+    cache = get_cache()
+    keys = {version_key(model): model for model in models}
+    found = cache.get_many(list(keys))
+    for key in keys.keys() - found.keys():
+        cache.add(key, int(time.time() * 1000), None)
+        found[key] = cache.get(key)
+    return {model: found[key] for key, model in keys.items()}
+
+
+def get_model_version(model):
+    return get_model_versions([model])[model]
+
+
+def bump_model_version(model):
+    '''Mark model as changed, invalidating every cached response built from it.'''
+    cache = get_cache()
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        # not set yet: the next read starts a fresh, later version
+        cache.delete(version_key(model))
+
+
+def bump_on_change(sender, using=None, **kwargs):
+    '''post_save/post_delete receiver: bump the version once the change commits (now, outside a transaction).'''
+    transaction.on_commit(lambda: bump_model_version(sender), using=using)
+
+
+def watch_models(models):
+    '''Bump the versions of models whenever one of their rows is saved or deleted.'''
+    for model in models:
+        uid = f'cs412.caching:{model._meta.label_lower}'
+        post_save.connect(bump_on_change, sender=model, dispatch_uid=uid)
+        post_delete.connect(bump_on_change, sender=model, dispatch_uid=uid)
+
+
+def get_cache_key(request, view_name, models):
+    '''The response cache key for this request: URL, audience and model versions.'''
+    if request.user.is_authenticated:
+        # per session, and per CSRF cookie since the page may hold a token for it
+        private = f"{request.session.session_key}:{request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')}"
+        audience = 'user:' + hashlib.sha1(private.encode()).hexdigest()[:16]
+    else:
+        audience = 'anon'
+    versions = get_model_versions(models)
+    state = ','.join(f'{model._meta.label_lower}={versions[model]}' for model in models)
+    url = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+    return f'view:{view_name}:{audience}:{url}:{hashlib.sha1(state.encode()).hexdigest()[:16]}'
+
+
+def is_cacheable(request, response):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    # flash messages are shown once, not on every later hit
+    if getattr(getattr(request, '_messages', None), 'used', False):
+        return False
+    # an anonymous page with a CSRF token would hand the same token to everyone
+    return request.user.is_authenticated or not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+
+
+def cache_response(view_func, view_name, models, timeout=DEFAULT_TIMEOUT):
+    '''
+    Wrap view_func so its GET/HEAD responses are cached until timeout or
+    until one of models changes (watch them in the app's ready()). Adds an
+    X-View-Cache: hit|miss header.
+    '''
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = get_cache_key(request, view_name, models)
+        response = cache.get(key)
+        if response is not None:
+            response['X-View-Cache'] = 'hit'
+            return response
+
+        response = view_func(request, *args, **kwargs)
+
+        def store(response):
+            if is_cacheable(request, response):
+                cache.set(key, response, timeout)
+            response['X-View-Cache'] = 'miss'
+
+        if hasattr(response, 'render') and callable(response.render) and not response.is_rendered:
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+    return wrapper
+
+
+def cache_page_for_models(*models, timeout=DEFAULT_TIMEOUT):
+    '''Decorator for function views: @cache_page_for_models(Listing, ListingPhoto)'''
+    def decorator(view_func):
+        return cache_response(view_func, f'{view_func.__module__}.{view_func.__name__}', models, timeout)
+    return decorator
+
+
+class CachedViewMixin:
+    '''
+    Class-based view mixin: declare the models the page is built from in
+    cache_models, e.g. cache_models = [Joke], and watch them in the app's
+    AppConfig.ready(). Put it before ListView and friends in the bases.
+    '''
+    cache_models = ()
+    cache_timeout = DEFAULT_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        view_name = f'{type(self).__module__}.{type(self).__name__}'
+        view = cache_response(super().dispatch, view_name, self.cache_models, self.cache_timeout)
+        return view(request, *args, **kwargs)
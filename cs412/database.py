@@ -0,0 +1,271 @@
+# File: database.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: SQLite connection setup for production use, shared by the apps.
+#
+#   Notes:
+#   - Every new SQLite connection gets the SQLITE_PRAGMAS from settings.py:
+#     a bigger page cache and memory-mapped reads. With SQLITE_WAL=1 in the
+#     environment they add WAL journaling (readers never wait for the writer,
+#     and the writer never waits for readers) and synchronous=NORMAL (fsync at
+#     checkpoints instead of on every commit, still safe in WAL mode). WAL is
+#     opt-in because it is recorded in the database file itself: every later
+#     connection, and a checkout of the file, stays in WAL mode.
+#   - DATABASES sets transaction_mode IMMEDIATE, so a transaction that will
+#     write takes the write lock at BEGIN and waits there for the busy
+#     timeout. With the default DEFERRED mode it would take a read lock first
+#     and fail with "database is locked" at its first write, without waiting.
+#   - A statement still refused with "database is locked" after the busy
+#     timeout is retried up to SQLITE_LOCK_RETRIES times with backoff, but
+#     only outside a transaction (autocommit statements and BEGIN itself),
+#     where nothing has been done that a retry could repeat.
+#   - Connections are persistent (CONN_MAX_AGE), so each request no longer
+#     opens the file and runs the pragmas again.
+#   - `manage.py sqlite_maintenance --loop` runs PRAGMA optimize and a WAL
+#     checkpoint periodically, see run_maintenance().
+#   - The ANALYTICS_APPS (voter_analytics, marathon_analytics) read from a
+#     separate snapshot file, ANALYTICS_DB_PATH, so their big scans and
+#     GROUP BYs no longer hold read locks on db.sqlite3 (cs412/routers.py).
+#     `manage.py sync_analytics` rebuilds it from the primary with
+#     sync_analytics(). The file is replaced, never changed in place, so it
+#     is opened read-only and immutable (no locking at all), and a process
+#     still holding the previous file reconnects at its next request.
+#   - sync_analytics() stamps the snapshot (PRAGMA user_version) with a hash
+#     of the analytics tables and columns the code expects. After a migration
+#     changes them, the old snapshot no longer matches and reads fall back to
+#     the primary until the next `manage.py sync_analytics`, instead of
+#     failing on a missing column.
+#   - Writes to the analytics models always go to the primary. Reads do too
+#     while a primary transaction is open or inside use_primary(), so code
+#     that writes and then reads back (importers, rollups) sees its writes.
+
+import functools
+import hashlib
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal, receiver
+
+from cs412 import caching
+
+# first wait before retrying a locked statement, in seconds; doubles each time
+LOCK_RETRY_DELAY = 0.05
+
+# page size of the analytics snapshot: bigger pages suit long sequential scans
+SNAPSHOT_PAGE_SIZE = 16384
+
+# sent with tables={table: rows} after sync_analytics() swaps in a new snapshot
+analytics_synced = Signal()
+
+# use_primary() nesting depth, per thread
+_primary = threading.local()
+
+# {snapshot id: schema stamp} of the snapshot file last looked at
+_snapshot_stamps = {}
+
+
+def retry_when_locked(execute, sql, params, many, context):
+    '''Execute wrapper: retry a statement refused with "database is locked", outside transactions.'''
+    connection = context['connection']
+    retries = getattr(settings, 'SQLITE_LOCK_RETRIES', 0)
+    attempt = 0
+    while True:
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as e:
+            if 'database is locked' not in str(e) or attempt >= retries or connection.in_atomic_block:
+                raise
+            time.sleep(LOCK_RETRY_DELAY * 2 ** attempt * random.uniform(0.5, 1.5))
+            attempt += 1
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    '''Apply SQLITE_PRAGMAS to a new SQLite connection and install the lock retry.'''
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+    if connection.alias == get_analytics_alias():
+        connection.snapshot_id = get_snapshot_id()
+    # the wrapper list outlives reconnects of the same connection object
+    if retry_when_locked not in connection.execute_wrappers:
+        connection.execute_wrappers.append(retry_when_locked)
+
+
+def run_maintenance(alias='default', checkpoint_mode='TRUNCATE'):
+    '''
+    Refresh the query planner statistics that need it (PRAGMA optimize) and
+    copy the WAL back into the database file, truncating it. Return
+    (WAL pages, pages checkpointed), or None for other databases.
+    '''
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA optimize')
+        cursor.execute(f'PRAGMA wal_checkpoint({checkpoint_mode})')
+        busy, wal_pages, checkpointed = cursor.fetchone()
+    return wal_pages, checkpointed
+
+
+##########################################################################
+# analytics snapshot
+
+def get_analytics_alias():
+    '''The database alias of the analytics snapshot, or None when it is turned off.'''
+    return getattr(settings, 'ANALYTICS_DATABASE', None)
+
+
+def get_snapshot_id():
+    '''(inode, mtime) of the snapshot file, which changes whenever a sync replaces it; None if missing.'''
+    try:
+        stat = os.stat(settings.ANALYTICS_DB_PATH)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def get_schema_stamp(app_labels=None):
+    '''A 28-bit hash of the tables and columns of the analytics models, as the code defines them.'''
+    return _schema_stamp(tuple(app_labels or getattr(settings, 'ANALYTICS_APPS', [])))
+
+
+@functools.lru_cache
+def _schema_stamp(app_labels):
+    schema = sorted(
+        (model._meta.db_table, sorted(field.column for field in model._meta.local_concrete_fields))
+        for model in get_analytics_models(app_labels)
+    )
+    return int(hashlib.sha1(repr(schema).encode()).hexdigest()[:7], 16)
+
+
+def get_snapshot_stamp():
+    '''The schema stamp sync_analytics() wrote into the current snapshot; None if there is none.'''
+    snapshot_id = get_snapshot_id()
+    if snapshot_id is None:
+        return None
+    if snapshot_id not in _snapshot_stamps:
+        try:
+            snapshot = sqlite3.connect(f'file:{settings.ANALYTICS_DB_PATH}?mode=ro', uri=True)
+            try:
+                stamp = snapshot.execute('PRAGMA user_version').fetchone()[0]
+            finally:
+                snapshot.close()
+        except sqlite3.DatabaseError:
+            stamp = None
+        _snapshot_stamps.clear()
+        _snapshot_stamps[snapshot_id] = stamp
+    return _snapshot_stamps[snapshot_id]
+
+
+def analytics_available():
+    '''
+    True when analytics reads can go to the snapshot: it is configured, has
+    been synced, and was synced with the tables and columns the code expects.
+    '''
+    return bool(get_analytics_alias()) and get_snapshot_stamp() == get_schema_stamp()
+
+
+@contextmanager
+def use_primary():
+    '''Read the analytics models from the primary database inside this block.'''
+    _primary.depth = getattr(_primary, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _primary.depth -= 1
+
+
+def reads_pinned_to_primary():
+    '''True inside use_primary() or a transaction on the primary (it may hold unsynced writes).'''
+    return getattr(_primary, 'depth', 0) > 0 or connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+@receiver(request_started)
+def reopen_replaced_snapshot(sender, **kwargs):
+    '''Close a persistent snapshot connection whose file was replaced by a sync since it opened.'''
+    alias = get_analytics_alias()
+    if not alias:
+        return
+    connection = connections[alias]
+    if connection.connection is not None and getattr(connection, 'snapshot_id', None) != get_snapshot_id():
+        connection.close()
+
+
+def get_analytics_models(app_labels=None):
+    '''The concrete models of ANALYTICS_APPS (or of app_labels), with their auto-created m2m tables.'''
+    models = []
+    for label in app_labels or getattr(settings, 'ANALYTICS_APPS', []):
+        for model in apps.get_app_config(label).get_models(include_auto_created=True):
+            if model._meta.managed and not model._meta.proxy:
+                models.append(model)
+    return models
+
+
+def sync_analytics(app_labels=None):
+    '''
+    Build a new analytics snapshot from the primary and move it over
+    ANALYTICS_DB_PATH. All tables are copied in one read transaction, so
+    they agree with each other; indexes are created after the rows are in,
+    then ANALYZE. Return {table: rows}.
+    '''
+    primary = connections[DEFAULT_DB_ALIAS]
+    if primary.vendor != 'sqlite':
+        raise NotImplementedError("sync_analytics copies from a SQLite primary only")
+    models = get_analytics_models(app_labels)
+    tables = [model._meta.db_table for model in models]
+
+    path = str(settings.ANALYTICS_DB_PATH)
+    partial = f'{path}.{os.getpid()}.partial'
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    copied = {}
+    snapshot = sqlite3.connect(partial, isolation_level=None)
+    try:
+        snapshot.execute(f'PRAGMA page_size = {SNAPSHOT_PAGE_SIZE}')
+        # a file nobody reads until it is complete: no journal, no fsyncs
+        snapshot.execute('PRAGMA journal_mode = OFF')
+        snapshot.execute('PRAGMA synchronous = OFF')
+        primary_name = str(primary.settings_dict['NAME'])
+        if not primary_name.startswith('file:'):
+            primary_name = f'file:{primary_name}?mode=ro'
+        snapshot.execute('ATTACH DATABASE ? AS primary_db', [primary_name])
+
+        snapshot.execute('BEGIN')
+        indexes = []
+        for table in tables:
+            schema = snapshot.execute(
+                "SELECT type, sql FROM primary_db.sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL",
+                [table],
+            ).fetchall()
+            for kind, sql in schema:
+                if kind == 'table':
+                    snapshot.execute(sql)
+                else:
+                    indexes.append(sql)
+            copied[table] = snapshot.execute(f'INSERT INTO main."{table}" SELECT * FROM primary_db."{table}"').rowcount
+        snapshot.execute('COMMIT')
+        snapshot.execute('DETACH DATABASE primary_db')
+
+        for sql in indexes:
+            snapshot.execute(sql)
+        snapshot.execute('ANALYZE')
+        snapshot.execute(f'PRAGMA user_version = {get_schema_stamp(app_labels)}')
+    finally:
+        snapshot.close()
+
+    os.replace(partial, path)
+    for model in models:
+        caching.bump_model_version(model)
+    analytics_synced.send(sender=None, tables=copied)
+    return copied
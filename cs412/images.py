@@ -0,0 +1,185 @@
+# File: images.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: background image pipeline for uploaded photos, shared by the
+#   apps (mini_insta Photo, project ListingPhoto).
+#
+#   Notes:
+#   - Views only save the uploaded original; the row starts out with
+#     rendition_status = 'pending', which is its place in the queue.
+#   - `manage.py process_images` picks pending rows up and renders them in a
+#     process pool: each original becomes a thumb, card and full rendition,
+#     in both WebP and JPEG, rotated upright and with EXIF/XMP metadata dropped.
+#   - The rendition paths and the original's dimensions are stored on the row,
+#     and templates include cs412/templates/responsive_photo.html, which offers
+#     every rendition in a srcset so the browser downloads the smallest one
+#     that fits. Rows that are not processed yet fall back to the original.
+#   - render_renditions() runs in worker processes, so it only uses Pillow
+#     and plain paths, never the ORM.
+
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models
+
+from cs412 import caching
+
+# name -> longest edge in pixels, smallest first
+RENDITION_SIZES = {
+    'thumb': 320,
+    'card': 800,
+    'full': 1920,
+}
+
+# (format key, Pillow format, file extension, save options)
+RENDITION_FORMATS = [
+    ('webp', 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+]
+
+RENDITIONS_DIR = 'renditions'
+
+
+def render_renditions(source_path, output_dir):
+    '''
+    Write every rendition of the image at source_path into output_dir.
+    Returns {'width', 'height', 'renditions': {name: {'width', 'height', fmt: filename}}},
+    with the original's (upright) dimensions. Raises OSError if the file is
+    not a readable image.
+    '''
+    from PIL import Image, ImageOps
+
+    os.makedirs(output_dir, exist_ok=True)
+    with Image.open(source_path) as original:
+        # apply the EXIF orientation to the pixels, since the EXIF itself is dropped
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    icc_profile = image.info.get('icc_profile')
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    result = {'width': image.width, 'height': image.height, 'renditions': {}}
+    for name, edge in RENDITION_SIZES.items():
+        rendition = image.copy()
+        rendition.thumbnail((edge, edge), Image.LANCZOS) # never upscales
+        entry = {'width': rendition.width, 'height': rendition.height}
+        for key, pil_format, extension, options in RENDITION_FORMATS:
+            out = rendition
+            if pil_format == 'JPEG' and has_alpha:
+                # JPEG has no alpha channel: flatten onto white
+                out = Image.new('RGB', rendition.size, 'white')
+                out.paste(rendition, mask=rendition.getchannel('A'))
+            filename = f'{name}.{extension}'
+            save_options = dict(options)
+            if icc_profile:
+                save_options['icc_profile'] = icc_profile # keep colors, not metadata
+            out.save(os.path.join(output_dir, filename), pil_format, **save_options)
+            entry[key] = filename
+        result['renditions'][name] = entry
+    return result
+
+
+class ImageRenditionsMixin(models.Model):
+    '''
+    Abstract base for photo models with an `image_file` ImageField: adds the
+    processing state, the original's dimensions and the rendition files.
+    '''
+    STATUS_CHOICES = [
+        ('pending', 'Waiting to be processed'),
+        ('done', 'Renditions ready'),
+        ('failed', 'Could not be processed'),
+        ('skipped', 'No uploaded file'),
+    ]
+
+    rendition_status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', editable=False)
+    width = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    height = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    # {name: {'width', 'height', 'webp': filename, 'jpeg': filename}}, see render_renditions()
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def renditions_dir(self):
+        '''Return the storage-relative directory that holds this photo's renditions.'''
+        return f'{RENDITIONS_DIR}/{self._meta.label_lower}/{self.pk}'
+
+    def rendition_url(self, name, fmt='jpeg'):
+        '''Return the URL of one rendition, or None if it does not exist (yet).'''
+        entry = self.renditions.get(name) if self.rendition_status == 'done' else None
+        if not entry or fmt not in entry:
+            return None
+        return default_storage.url(f'{self.renditions_dir()}/{entry[fmt]}')
+
+    def srcset(self, fmt):
+        '''Return an <img srcset> value listing every rendition in one format.'''
+        if self.rendition_status != 'done':
+            return ''
+        candidates = {}
+        for name, entry in sorted(self.renditions.items(), key=lambda item: item[1]['width']):
+            # small originals are never upscaled, so several renditions can share a width
+            if fmt in entry and entry['width'] not in candidates:
+                candidates[entry['width']] = self.rendition_url(name, fmt)
+        return ', '.join(f'{url} {width}w' for width, url in candidates.items())
+
+    @property
+    def webp_srcset(self):
+        return self.srcset('webp')
+
+    @property
+    def jpeg_srcset(self):
+        return self.srcset('jpeg')
+
+    @property
+    def display_url(self):
+        '''The URL for a plain <img src>: the card JPEG when ready, else the original.'''
+        url = self.rendition_url('card')
+        if url:
+            return url
+        if self.image_file:
+            return self.image_file.url
+        return getattr(self, 'image_url', '') or ''
+
+
+def get_rendition_models():
+    '''Return the model classes listed in settings.IMAGE_RENDITION_MODELS.'''
+    return [apps.get_model(label) for label in getattr(settings, 'IMAGE_RENDITION_MODELS', [])]
+
+
+def process_batch(model, pool, batch_size=50):
+    '''
+    Render up to batch_size pending photos of one model in the process pool
+    and record the results. Returns (done, failed, skipped).
+    '''
+    pending = list(model.objects.filter(rendition_status='pending').order_by('pk')[:batch_size])
+
+    # photos that only link to an external image_url have nothing to render
+    skipped = [photo.pk for photo in pending if not photo.image_file]
+    model.objects.filter(pk__in=skipped).update(rendition_status='skipped')
+
+    jobs = {}
+    for photo in pending:
+        if photo.image_file:
+            source = default_storage.path(photo.image_file.name)
+            output = default_storage.path(photo.renditions_dir())
+            jobs[pool.submit(render_renditions, source, output)] = photo
+
+    done = failed = 0
+    for future, photo in jobs.items():
+        try:
+            result = future.result()
+        except Exception:
+            model.objects.filter(pk=photo.pk).update(rendition_status='failed')
+            failed += 1
+            continue
+        model.objects.filter(pk=photo.pk).update(
+            rendition_status='done', width=result['width'], height=result['height'],
+            renditions=result['renditions'],
+        )
+        done += 1
+    if pending:
+        # the updates skip the signals; pages showing these photos are stale now
+        caching.bump_model_version(model)
+    return done, failed, len(skipped)
@@ -0,0 +1,163 @@
+# File: bench_sqlite.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: benchmark of SQLite under concurrent writes, before and after
+#   the tuning in cs412/database.py. Writer threads like/unlike and comment on
+#   mini_insta posts the way AddLikeView and CreateCommentView do, while
+#   reader threads load feed pages; every operation ends like a request
+#   (connection closed unless persistent). Runs once with Django's defaults
+#   (rollback journal, DEFERRED transactions, a new connection per request, no
+#   retries) and once with the DATABASES / SQLITE_* settings. Uses a throwaway
+#   database file, so the real db.sqlite3 is never touched.
+#
+#   python manage.py bench_sqlite --writers 8 --readers 8 --seconds 10
+
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+from django.test.utils import override_settings
+
+from cs412 import benchmarking
+from mini_insta.models import Comment, Like, Post, Profile
+
+
+class Command(BaseCommand):
+    help = "Compare SQLite throughput and latency under concurrent writes, default settings vs tuned."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--profiles', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        tuned = {
+            'OPTIONS': connection.settings_dict.get('OPTIONS', {}),
+            'CONN_MAX_AGE': connection.settings_dict.get('CONN_MAX_AGE', 0),
+            # WAL as a SQLITE_WAL=1 deployment has it; the file is a throwaway
+            'SQLITE_PRAGMAS': {**getattr(settings, 'SQLITE_PRAGMAS', {}), 'journal_mode': 'WAL', 'synchronous': 'NORMAL'},
+            'SQLITE_LOCK_RETRIES': getattr(settings, 'SQLITE_LOCK_RETRIES', 0),
+        }
+        baseline = {
+            'OPTIONS': {},
+            'CONN_MAX_AGE': 0,
+            # the journal mode is stored in the file, so switch it back explicitly
+            'SQLITE_PRAGMAS': {'journal_mode': 'DELETE'},
+            'SQLITE_LOCK_RETRIES': 0,
+        }
+        # a file, since an in-memory database has no journal to compare
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(
+            tempfile.gettempdir(), f'cs412_bench_sqlite_{os.getpid()}.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            profile_ids, post_ids = self.seed(options['profiles'], options['posts'])
+            self.stdout.write(f"{'config':<10}{'journal':>9}{'writes/s':>10}{'w p50':>8}{'w p95':>8}{'w p99':>9}"
+                              f"{'reads/s':>9}{'r p50':>8}{'r p95':>8}{'r p99':>9}{'errors':>8}")
+            for label, config in [('default', baseline), ('tuned', tuned)]:
+                self.run(label, config, profile_ids, post_ids, options)
+        finally:
+            connection.settings_dict['OPTIONS'] = tuned['OPTIONS']
+            connection.settings_dict['CONN_MAX_AGE'] = tuned['CONN_MAX_AGE']
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, profiles, posts):
+        rng = random.Random(412)
+        with transaction.atomic():
+            users = benchmarking.create_users('writer', profiles)
+            profile_ids = [profile.pk for profile in benchmarking.bulk_insert(Profile, (
+                Profile(user=user, username=user.username) for user in users
+            ))]
+            post_ids = [post.pk for post in benchmarking.bulk_insert(Post, (
+                Post(profile_id=rng.choice(profile_ids), caption=' '.join(rng.choices(benchmarking.WORDS, k=8)))
+                for _ in range(posts)
+            ))]
+        return profile_ids, post_ids
+
+    def run(self, label, config, profile_ids, post_ids, options):
+        connection.close()
+        connection.settings_dict['OPTIONS'] = config['OPTIONS']
+        connection.settings_dict['CONN_MAX_AGE'] = config['CONN_MAX_AGE']
+        with override_settings(DEBUG=False, SQLITE_PRAGMAS=config['SQLITE_PRAGMAS'],
+                               SQLITE_LOCK_RETRIES=config['SQLITE_LOCK_RETRIES']):
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal = cursor.fetchone()[0]
+            connection.close()
+
+            deadline = time.perf_counter() + options['seconds']
+            writes, reads = [], []
+            errors = Counter()
+            threads = [
+                threading.Thread(target=self.worker, args=(self.write, writes, errors, deadline, seed, profile_ids, post_ids))
+                for seed in range(options['writers'])
+            ] + [
+                threading.Thread(target=self.worker, args=(self.read, reads, errors, deadline, seed, profile_ids, post_ids))
+                for seed in range(options['writers'], options['writers'] + options['readers'])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        seconds = options['seconds']
+        w = self.percentiles(writes)
+        r = self.percentiles(reads)
+        self.stdout.write(f"{label:<10}{journal:>9}{len(writes) / seconds:>10.0f}{w[0]:>8.1f}{w[1]:>8.1f}{w[2]:>9.1f}"
+                          f"{len(reads) / seconds:>9.0f}{r[0]:>8.1f}{r[1]:>8.1f}{r[2]:>9.1f}{sum(errors.values()):>8}")
+        for message, count in errors.most_common():
+            self.stdout.write(f"    {count} x {message}")
+
+    def worker(self, operation, samples, errors, deadline, seed, profile_ids, post_ids):
+        '''Run operation until the deadline, one "request" at a time; record ms of the successful ones.'''
+        rng = random.Random(seed)
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    operation(rng, profile_ids, post_ids)
+                    samples.append((time.perf_counter() - start) * 1000)
+                except OperationalError as e:
+                    errors[str(e)] += 1
+                finally:
+                    # what request_finished does: close unless CONN_MAX_AGE keeps it
+                    connection.close_if_unusable_or_obsolete()
+        finally:
+            connection.close()
+
+    def write(self, rng, profile_ids, post_ids):
+        '''Like or unlike a post (as AddLikeView / RemoveLikeView), or comment on it.'''
+        post_id = rng.choice(post_ids)
+        profile_id = rng.choice(profile_ids)
+        with transaction.atomic():
+            if rng.random() < 0.25:
+                Comment.objects.create(post_id=post_id, profile_id=profile_id, text='nice')
+                Post.objects.filter(pk=post_id).update(num_comments=F('num_comments') + 1)
+                return
+            like, created = Like.objects.get_or_create(post_id=post_id, profile_id=profile_id)
+            if created:
+                Post.objects.filter(pk=post_id).update(num_likes=F('num_likes') + 1)
+            else:
+                like.delete()
+                Post.objects.filter(pk=post_id).update(num_likes=F('num_likes') - 1)
+
+    def read(self, rng, profile_ids, post_ids):
+        '''One feed-sized page of posts from a few profiles, with their photos.'''
+        authors = rng.sample(profile_ids, 20)
+        list(Post.objects.filter(profile_id__in=authors).for_feed().order_by('-timestamp', '-pk')[:50])
+
+    def percentiles(self, samples):
+        '''(p50, p95, p99) in ms, or zeros when nothing succeeded.'''
+        if len(samples) < 2:
+            return (samples[0],) * 3 if samples else (0.0, 0.0, 0.0)
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        return cuts[49], cuts[94], cuts[98]
@@ -0,0 +1,162 @@
+# File: benchmark.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: load test of every app (see cs412/benchmarking.py). Seeds a
+#   throwaway SQLite file with synthetic data, replays each app's weighted
+#   request mix, prints p50/p95/p99 latency and queries per endpoint, and
+#   saves the results as JSON under benchmarks/ (named after the commit), so
+#   two commits can be compared. The real db.sqlite3 is never touched.
+#
+#   python manage.py benchmark --scale 0.05 --requests 300
+#   python manage.py benchmark --mode wsgi --concurrency 8 --apps mini_insta project
+#   python manage.py benchmark --compare benchmarks/<older run>.json
+
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from cs412 import benchmarking
+
+
+class Command(BaseCommand):
+    help = "Seed synthetic data for every app, replay weighted request mixes and report latency percentiles as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apps', nargs='+', choices=list(benchmarking.SEEDERS), default=list(benchmarking.SEEDERS))
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help="multiplier for the seeded row counts (1 = %(sizes)s)" % {'sizes': benchmarking.SIZES})
+        parser.add_argument('--requests', type=int, default=500, help="recorded requests per app")
+        parser.add_argument('--warmup', type=int, default=20, help="unrecorded requests per app first")
+        parser.add_argument('--mode', choices=['client', 'wsgi'], default='client',
+                            help="in-process test Client, or HTTP to a threaded local WSGI server")
+        parser.add_argument('--concurrency', type=int, default=1, help="concurrent workers (wsgi mode)")
+        parser.add_argument('--seed', type=int, default=412)
+        parser.add_argument('--trace-memory', action='store_true',
+                            help="also record the Python memory allocated per request (client mode; slower)")
+        parser.add_argument('--no-view-cache', action='store_true', help="measure with the per-view cache off")
+        parser.add_argument('--output', default=None, help="results file (default benchmarks/<date>-<commit>.json)")
+        parser.add_argument('--compare', default=None, help="earlier results file to diff against")
+        parser.add_argument('--tolerance', type=float, default=0.10,
+                            help="latency growth counted as a regression in --compare (0.10 = 10%%)")
+
+    def handle(self, *args, **options):
+        if options['mode'] == 'client' and options['concurrency'] > 1:
+            raise CommandError("--concurrency needs --mode wsgi; the test Client runs one request at a time.")
+        if options['trace_memory'] and options['concurrency'] > 1:
+            raise CommandError("--trace-memory measures one request at a time; use --concurrency 1.")
+
+        sizes = {key: max(1, int(rows * options['scale'])) for key, rows in benchmarking.SIZES.items()}
+        rng = random.Random(options['seed'])
+
+        # a file rather than the usual in-memory test database, so the WSGI
+        # server threads share it and it behaves like db.sqlite3 on disk
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(
+            tempfile.gettempdir(), f'cs412_benchmark_{os.getpid()}.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        views_cache = 'django.core.cache.backends.dummy.DummyCache' if options['no_view_cache'] \
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        overrides = override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=['testserver', '127.0.0.1', 'localhost'],
+            CACHES={**settings.CACHES, 'views': {'BACKEND': views_cache, 'LOCATION': 'cs412-benchmark'}},
+            # counts and times only; tracing every query's source would skew the latencies
+            QUERY_PROFILER_ENABLED=True,
+            QUERY_PROFILER_TRACE_SOURCES=False,
+            # the analytics apps read the seeded rows, not the real snapshot
+            ANALYTICS_DATABASE=None,
+        )
+        # the N+1 warnings are for development, not for a load test
+        logging.getLogger('cs412.profiling').setLevel(logging.ERROR)
+        try:
+            with overrides:
+                results = self.run(options, sizes, rng)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks',
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{(results['meta']['commit'] or 'nogit')[:8]}.json")
+        benchmarking.save_results(results, output)
+        self.stdout.write(f"results saved to {output}")
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                self.compare(json.load(f), results, options['tolerance'])
+
+    def run(self, options, sizes, rng):
+        seed_seconds = {}
+        data = {}
+        for app in options['apps']:
+            start = time.perf_counter()
+            with transaction.atomic():
+                data[app] = benchmarking.SEEDERS[app](sizes, rng)
+            seed_seconds[app] = round(time.perf_counter() - start, 1)
+            self.stdout.write(f"seeded {app} in {seed_seconds[app]}s")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        users = [user for app_data in data.values() for user in app_data.get('users', [])]
+        transport_class = benchmarking.WSGITransport if options['mode'] == 'wsgi' else benchmarking.ClientTransport
+        transport = transport_class(users)
+        if options['trace_memory']:
+            tracemalloc.start()
+
+        apps = {}
+        try:
+            for app in options['apps']:
+                # some views print debugging lines on every request
+                with contextlib.redirect_stdout(io.StringIO()):
+                    apps[app] = benchmarking.run_mix(
+                        app, data[app], transport, options['requests'], warmup=options['warmup'],
+                        concurrency=options['concurrency'], seed=options['seed'], trace_memory=options['trace_memory'],
+                    )
+                self.report(app, apps[app])
+        finally:
+            transport.close()
+            if options['trace_memory']:
+                tracemalloc.stop()
+
+        meta = benchmarking.run_metadata({
+            key: options[key] for key in ('scale', 'requests', 'warmup', 'mode', 'concurrency', 'seed',
+                                          'trace_memory', 'no_view_cache')
+        }, sizes)
+        meta['seed_seconds'] = seed_seconds
+        return {'meta': meta, 'apps': apps}
+
+    def report(self, app, summary):
+        self.stdout.write(f"\n{app}: {summary['throughput_rps']} req/s, "
+                          f"RSS {summary['memory_mb']['rss_after']} MB (peak {summary['memory_mb']['rss_peak']} MB)")
+        self.stdout.write(f"  {'endpoint':<22}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+        for endpoint, stats in [('(all)', summary['overall'])] + list(summary['endpoints'].items()):
+            latency = stats['latency_ms']
+            queries = stats.get('queries', {}).get('mean', '-')
+            self.stdout.write(f"  {endpoint:<22}{stats['requests']:>6}{latency['p50']:>9.1f}{latency['p95']:>9.1f}"
+                              f"{latency['p99']:>9.1f}{queries:>9}{stats['errors']:>8}")
+
+    def compare(self, old, new, tolerance):
+        self.stdout.write(f"\ncompared with {(old['meta'].get('commit') or '?')[:8]} ({old['meta'].get('date')}):")
+        differences = [
+            key for key in ('scale', 'mode', 'concurrency', 'requests', 'no_view_cache')
+            if old['meta'].get(key) != new['meta'].get(key)
+        ]
+        if differences:
+            self.stdout.write(f"  note: the runs differ in {', '.join(differences)}")
+        regressions = 0
+        for app, endpoint, metric, before, after, regressed in benchmarking.compare_results(old, new, tolerance):
+            change = f"{(after - before) / before * 100:+.0f}%" if before else ''
+            flag = '  REGRESSION' if regressed else ''
+            regressions += regressed
+            self.stdout.write(f"  {app + ' ' + endpoint:<40}{metric:>9}{before:>10}{after:>10}{change:>7}{flag}")
+        self.stdout.write(f"{regressions} regressions")
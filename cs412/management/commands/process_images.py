@@ -0,0 +1,46 @@
+# File: process_images.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: background worker that renders the thumb/card/full WebP and
+#   JPEG renditions of uploaded photos (mini_insta Photo, project ListingPhoto),
+#   outside the request path. Rows with rendition_status='pending' are the
+#   queue; the resizing runs in a process pool. See cs412/images.py.
+#
+#   python manage.py process_images --workers 4 --loop --interval 10
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from cs412 import images
+
+
+class Command(BaseCommand):
+    help = "Render the responsive renditions of uploaded photos that are still pending."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help="worker processes (default: one per CPU)")
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help="photos to render per batch and model")
+        parser.add_argument('--loop', action='store_true',
+                            help="keep running, checking for new photos every --interval seconds")
+        parser.add_argument('--interval', type=float, default=10)
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                handled = 0
+                for model in images.get_rendition_models():
+                    done, failed, skipped = images.process_batch(model, pool, options['batch_size'])
+                    handled = max(handled, done + failed + skipped)
+                    if done or failed or skipped:
+                        self.stdout.write(
+                            f"{model._meta.label}: {done} rendered, {failed} failed, {skipped} without a file"
+                        )
+
+                if not options['loop']:
+                    return
+                # a full batch means there may be more waiting; go again right away
+                if handled < options['batch_size']:
+                    time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+# File: sqlite_maintenance.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: periodic SQLite upkeep for the WAL setup in cs412/database.py:
+#   PRAGMA optimize, then a checkpoint that copies the write-ahead log back
+#   into db.sqlite3 and truncates it, so the WAL does not keep growing while
+#   the persistent connections keep reading from it.
+#
+#   python manage.py sqlite_maintenance --loop --interval 3600
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from cs412 import database
+
+
+class Command(BaseCommand):
+    help = "Run PRAGMA optimize and a WAL checkpoint on the SQLite databases."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'], default='TRUNCATE',
+                            help="checkpoint mode; PASSIVE never waits for readers or writers")
+        parser.add_argument('--loop', action='store_true',
+                            help="keep running, every --interval seconds")
+        parser.add_argument('--interval', type=float, default=3600)
+
+    def handle(self, *args, **options):
+        while True:
+            for alias in connections:
+                if alias == database.get_analytics_alias():
+                    continue # read-only; sync_analytics replaces it whole
+                result = database.run_maintenance(alias, options['mode'])
+                if result is not None:
+                    wal_pages, checkpointed = result
+                    self.stdout.write(f"{alias}: optimized, checkpointed {checkpointed} of {wal_pages} WAL pages")
+                # don't hold the file open between runs
+                connections[alias].close()
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,40 @@
+# File: sync_analytics.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: rebuild the read-only analytics snapshot (ANALYTICS_DB_PATH)
+#   from db.sqlite3, see cs412/database.py. Run it after the voter or
+#   marathon imports, or keep it running with --loop.
+#
+#   python manage.py sync_analytics
+#   python manage.py sync_analytics --loop --interval 900
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from cs412 import database
+
+
+class Command(BaseCommand):
+    help = "Copy the voter_analytics and marathon_analytics tables into the read-only analytics snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help="keep running, every --interval seconds")
+        parser.add_argument('--interval', type=float, default=900)
+
+    def handle(self, *args, **options):
+        if not database.get_analytics_alias():
+            raise CommandError("ANALYTICS_DATABASE is not set; the analytics apps read from the primary database.")
+        while True:
+            start = time.perf_counter()
+            tables = database.sync_analytics()
+            for table, rows in tables.items():
+                self.stdout.write(f"{table}: {rows} rows")
+            self.stdout.write(f"snapshot written in {time.perf_counter() - start:.1f}s")
+            # don't hold the primary open between runs
+            connections['default'].close()
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,224 @@
+# File: pagination.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: keyset (cursor) pagination for ListViews, shared by the apps.
+#
+#   Notes:
+#   - Instead of ?page=N (LIMIT ... OFFSET N*size, which reads and throws away
+#     every earlier row), each page link carries an opaque ?cursor= token that
+#     holds the sort key of the last (or first) row shown. The next page is
+#     then "WHERE (sort key) > (that row) ORDER BY sort key LIMIT size", which
+#     an index on the sort columns serves at the same cost on every page.
+#   - The sort columns must be NOT NULL and, taken together, unique; end the
+#     ordering with 'id' if the other columns can tie.
+#   - The total count is optional: count_mode = 'exact' counts on every page
+#     (like Django's Paginator), 'cached' counts once per filter and keeps it
+#     in the cache for count_cache_timeout seconds, and None skips it.
+#   - A cursor that can't be used (tampered with, or from a bookmark made
+#     before the ordering changed) shows the first page, as the mini insta
+#     feed does, rather than a 404.
+#   - The page object mimics Django's Page (number, has_next, has_previous,
+#     paginator.count / num_pages), so list templates keep working; the
+#     Previous / Next links use page_obj.previous_query / next_query.
+
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+CURSOR_PARAM = 'cursor'
+
+
+def encode_cursor(values, direction, number):
+    '''Pack a row's sort key, the paging direction ('n' or 'p') and the page number into a token.'''
+    raw = json.dumps([values, direction, number], separators=(',', ':'), cls=DjangoJSONEncoder)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    '''Return (values, direction, number) from encode_cursor(), or raise ValueError.'''
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values, direction, number = json.loads(raw)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"bad cursor: {e}")
+    if direction not in ('n', 'p') or not isinstance(values, list) or not isinstance(number, int):
+        raise ValueError("bad cursor")
+    return values, direction, number
+
+
+def split_ordering(ordering):
+    '''Return [(field, descending)] for order_by()-style names like '-timestamp'.'''
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def keyset_filter(ordering, values, forward=True):
+    '''
+    Return a Q for the rows that sort strictly after (forward) or before the
+    row whose sort key is values. For columns (a, b, c) ascending, after
+    (x, y, z) this is
+        a >= x AND (a > x OR (a = x AND (b > y OR (b = y AND c > z))))
+    where the leading a >= x gives the index a range to start from.
+    '''
+    columns = split_ordering(ordering)
+
+    def after(field, descending):
+        return f'{field}__lt' if descending == forward else f'{field}__gt'
+
+    q = None
+    for (field, descending), value in reversed(list(zip(columns, values))):
+        step = Q(**{after(field, descending): value})
+        if q is not None:
+            step |= Q(**{field: value}) & q
+        q = step
+
+    field, descending = columns[0]
+    start = f'{field}__lte' if descending == forward else f'{field}__gte'
+    return Q(**{start: values[0]}) & q
+
+
+class KeysetPaginator:
+    '''Counts for a keyset-paginated list; count and num_pages are None when not counted.'''
+
+    def __init__(self, per_page, count=None):
+        self.per_page = per_page
+        self.count = count
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(1, -(-self.count // self.per_page))
+
+
+class KeysetPage:
+    '''One page of a keyset-paginated list, with the links to its neighbours.'''
+
+    def __init__(self, object_list, paginator, number, next_cursor, previous_cursor, params):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def query_for(self, cursor):
+        '''Return the current query string with the cursor replaced.'''
+        params = self.params.copy()
+        params.pop(CURSOR_PARAM, None)
+        params.pop('page', None)
+        if cursor is not None:
+            params[CURSOR_PARAM] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        return self.query_for(self.next_cursor)
+
+    @property
+    def previous_query(self):
+        # the first page is reached without a cursor, so its URL stays canonical
+        if self.number <= 2:
+            return self.query_for(None)
+        return self.query_for(self.previous_cursor)
+
+
+class KeysetPaginationMixin:
+    '''
+    Replace a ListView's OFFSET pagination with keyset pagination.
+
+    keyset_ordering     -- order_by() names that identify a row, e.g. ('last_name', 'first_name', 'id')
+    count_mode          -- 'exact', 'cached' (default) or None, see the module notes
+    count_cache_timeout -- seconds a cached count is reused
+    '''
+    keyset_ordering = ('id',)
+    count_mode = 'cached'
+    count_cache_timeout = 300
+
+    def get_keyset_ordering(self):
+        return list(self.keyset_ordering)
+
+    def get_total_count(self, queryset):
+        '''Return the number of rows in the filtered queryset, per count_mode.'''
+        if self.count_mode is None:
+            return None
+        if self.count_mode == 'exact':
+            return queryset.count()
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.sha1(f'{sql}|{params!r}'.encode()).hexdigest()
+        key = f'keyset_count:{queryset.model._meta.label_lower}:{digest}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout=self.count_cache_timeout)
+        return count
+
+    def paginate_queryset(self, queryset, page_size):
+        '''Return (paginator, page, object_list, is_paginated), like MultipleObjectMixin.'''
+        ordering = self.get_keyset_ordering()
+        fields = [field for field, descending in split_ordering(ordering)]
+        token = self.request.GET.get(CURSOR_PARAM)
+
+        direction, number = 'n', 1
+        page_qs = queryset.order_by(*ordering)
+        if token:
+            try:
+                values, direction, number = decode_cursor(token)
+                if len(values) != len(fields):
+                    raise ValueError("cursor does not match the ordering")
+                page_qs = page_qs.filter(keyset_filter(ordering, values, forward=(direction == 'n')))
+            except (ValueError, TypeError, ValidationError):
+                # start over from the first page
+                token = None
+                direction, number = 'n', 1
+                page_qs = queryset.order_by(*ordering)
+
+        if direction == 'p':
+            # walk backwards from the cursor, then put the rows back in display order
+            reverse = [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+            rows = list(page_qs.order_by(*reverse)[:page_size + 1])
+            more_before = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            more_after = True
+        else:
+            rows = list(page_qs[:page_size + 1])
+            more_after = len(rows) > page_size
+            rows = rows[:page_size]
+            more_before = bool(token)
+
+        def cursor_for(row, row_direction, row_number):
+            return encode_cursor([getattr(row, field) for field in fields], row_direction, row_number)
+
+        next_cursor = cursor_for(rows[-1], 'n', number + 1) if rows and more_after else None
+        previous_cursor = cursor_for(rows[0], 'p', number - 1) if rows and more_before else None
+
+        paginator = KeysetPaginator(page_size, self.get_total_count(queryset))
+        page = KeysetPage(rows, paginator, number, next_cursor, previous_cursor, self.request.GET)
+        return paginator, page, rows, page.has_other_pages()
@@ -0,0 +1,217 @@
+# File: profiling.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: request-level SQL query profiler for all the apps.
+#
+#   Notes:
+#   - QueryProfilerMiddleware wraps every database call made while a request
+#     is handled and records its SQL, its time and where it came from: the
+#     template file and line being rendered, or else the first line of our
+#     own code on the stack (e.g. a model helper called from a view).
+#   - Queries are grouped by fingerprint, the SQL with its parameters left
+#     out and IN (...) lists collapsed, so `get_photos()` called for 24
+#     listings shows up as one fingerprint run 24 times.
+#   - A fingerprint run QUERY_PROFILER_N_PLUS_ONE_THRESHOLD times or more in
+#     one request is flagged as a suspected N+1 for that URL name, logged to
+#     the "cs412.profiling" logger and counted in the report.
+#   - Each response gets Server-Timing headers (browser dev tools show them
+#     under Timing), and the last QUERY_PROFILER_REPORT_SIZE requests of this
+#     process are kept for the JSON report at /profiler/report.json (staff
+#     only).
+#   - Off by default; QUERY_PROFILER=1 in the environment turns it on.
+#   - Finding the source walks the stack on every query. With
+#     QUERY_PROFILER_TRACE_SOURCES = False only counts and times are kept,
+#     which is cheap enough to leave on under load (`manage.py benchmark`).
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, JsonResponse
+
+logger = logging.getLogger('cs412.profiling')
+
+# our own code: anything under the project directory that is not a library
+PROJECT_DIR = str(settings.BASE_DIR)
+LIBRARY_DIRS = tuple({os.path.dirname(os.__file__), sys.prefix, sys.base_prefix})
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_SPACES = re.compile(r'\s+')
+
+# recent request profiles of this process, newest last
+_recent = deque(maxlen=getattr(settings, 'QUERY_PROFILER_REPORT_SIZE', 200))
+_recent_lock = threading.Lock()
+
+
+def fingerprint(sql):
+    '''The SQL with its IN (...) lists collapsed, so repeated lookups compare equal.'''
+    return _SPACES.sub(' ', _IN_LIST.sub('IN (...)', sql)).strip()
+
+
+def query_source():
+    '''
+    Return "template.html:12" for the template node being rendered, or
+    "path/to/file.py:34 in function" for the innermost frame of our own code.
+    '''
+    code_location = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'{origin.template_name}:{token.lineno}'
+        filename = frame.f_code.co_filename
+        if (code_location is None and filename.startswith(PROJECT_DIR)
+                and not filename.startswith(LIBRARY_DIRS) and 'site-packages' not in filename
+                and not filename.endswith('profiling.py')):
+            code_location = f'{os.path.relpath(filename, PROJECT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return code_location or 'unknown'
+
+
+class RequestProfile:
+    '''The queries of one request; its record() is installed as a database execute wrapper.'''
+
+    def __init__(self, trace_sources=True):
+        self.trace_sources = trace_sources
+        self.count = 0
+        self.sql_time = 0.0
+        self.fingerprints = Counter()
+        self.sources = {}
+
+    def record(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.count += 1
+            key = fingerprint(sql)
+            self.fingerprints[key] += 1
+            sources = self.sources.setdefault(key, Counter())
+            if self.trace_sources:
+                sources[query_source()] += 1
+
+    def duplicates(self):
+        '''[(fingerprint, times run, {source: times})] of the queries run more than once.'''
+        return [
+            (key, count, dict(self.sources[key]))
+            for key, count in self.fingerprints.most_common() if count > 1
+        ]
+
+
+class QueryProfilerMiddleware:
+    '''
+    Profiles the SQL queries of each request, see the notes at the top of
+    this file. Enabled by QUERY_PROFILER_ENABLED (default: off).
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'QUERY_PROFILER_ENABLED', False)
+        self.threshold = getattr(settings, 'QUERY_PROFILER_N_PLUS_ONE_THRESHOLD', 5)
+        self.trace_sources = getattr(settings, 'QUERY_PROFILER_TRACE_SOURCES', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        profile = RequestProfile(self.trace_sources)
+        start = time.perf_counter()
+        wrappers = [connection.execute_wrapper(profile.record) for connection in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        total = time.perf_counter() - start
+
+        url_name = self.url_name(request)
+        duplicates = profile.duplicates()
+        suspects = [(key, count, sources) for key, count, sources in duplicates if count >= self.threshold]
+        for key, count, sources in suspects:
+            logger.warning("Possible N+1 on %s: %d x %s (from %s)", url_name, count, key, ', '.join(sources))
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={profile.sql_time * 1000:.1f};desc="{profile.count} queries"',
+            f'dup;desc="{sum(count for key, count, sources in duplicates)} repeated, {len(suspects)} N+1 suspects"',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+        with _recent_lock:
+            _recent.append({
+                'url_name': url_name,
+                'path': request.get_full_path(),
+                'method': request.method,
+                'status': response.status_code,
+                'time': time.time(),
+                'total_ms': round(total * 1000, 2),
+                'sql_ms': round(profile.sql_time * 1000, 2),
+                'queries': profile.count,
+                'duplicates': [
+                    {'sql': key, 'count': count, 'sources': sources}
+                    for key, count, sources in duplicates
+                ],
+                'n_plus_one': [key for key, count, sources in suspects],
+            })
+        return response
+
+    def url_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return request.path
+        return match.view_name or match._func_path
+
+
+def build_report():
+    '''Summarize the recent requests by URL name, worst average query count first.'''
+    with _recent_lock:
+        recent = list(_recent)
+
+    by_url = {}
+    for entry in recent:
+        summary = by_url.setdefault(entry['url_name'], {
+            'requests': 0, 'queries': 0, 'max_queries': 0, 'sql_ms': 0.0, 'total_ms': 0.0, 'n_plus_one': {},
+        })
+        summary['requests'] += 1
+        summary['queries'] += entry['queries']
+        summary['max_queries'] = max(summary['max_queries'], entry['queries'])
+        summary['sql_ms'] += entry['sql_ms']
+        summary['total_ms'] += entry['total_ms']
+        for duplicate in entry['duplicates']:
+            if duplicate['sql'] in entry['n_plus_one']:
+                suspect = summary['n_plus_one'].setdefault(duplicate['sql'], {'requests': 0, 'max_count': 0, 'sources': {}})
+                suspect['requests'] += 1
+                suspect['max_count'] = max(suspect['max_count'], duplicate['count'])
+                suspect['sources'].update(duplicate['sources'])
+
+    urls = []
+    for url_name, summary in by_url.items():
+        n = summary['requests']
+        urls.append({
+            'url_name': url_name,
+            'requests': n,
+            'avg_queries': round(summary['queries'] / n, 1),
+            'max_queries': summary['max_queries'],
+            'avg_sql_ms': round(summary['sql_ms'] / n, 2),
+            'avg_total_ms': round(summary['total_ms'] / n, 2),
+            'n_plus_one': [{'sql': sql, **suspect} for sql, suspect in summary['n_plus_one'].items()],
+        })
+    urls.sort(key=lambda url: url['avg_queries'], reverse=True)
+    return {'pid': os.getpid(), 'requests': len(recent), 'urls': urls, 'recent': recent[-20:]}
+
+
+def report_view(request):
+    '''The rolling JSON report of this process; staff only, since it shows the SQL of other users' requests.'''
+    if not request.user.is_staff:
+        raise Http404
+    return JsonResponse(build_report(), json_dumps_params={'indent': 2})
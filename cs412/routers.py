@@ -0,0 +1,50 @@
+# File: routers.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: database router that sends the reads of the analytics apps to
+#   the read-only snapshot (see cs412/database.py).
+#
+#   Notes:
+#   - Reads of ANALYTICS_APPS models go to ANALYTICS_DATABASE once
+#     `manage.py sync_analytics` has created the snapshot, and to the
+#     primary before that, while the snapshot was synced before the latest
+#     schema change, inside use_primary() and during a transaction on the
+#     primary.
+#   - Writes always go to the primary; the snapshot is never migrated.
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from cs412 import database
+
+
+class AnalyticsRouter:
+
+    def is_analytics(self, model):
+        return model._meta.app_label in getattr(settings, 'ANALYTICS_APPS', [])
+
+    def db_for_read(self, model, **hints):
+        '''The snapshot for the analytics apps when it can be used; no opinion on the others.'''
+        if not self.is_analytics(model):
+            return None
+        if database.analytics_available() and not database.reads_pinned_to_primary():
+            return database.get_analytics_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        '''The primary, even for an instance that was read from the snapshot.'''
+        if self.is_analytics(model):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        '''The snapshot holds copies of primary rows, so objects from either can be related.'''
+        aliases = {DEFAULT_DB_ALIAS, database.get_analytics_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        '''Never migrate the snapshot; sync_analytics copies the schema from the primary.'''
+        if db == database.get_analytics_alias():
+            return False
+        return None
@@ -57,6 +57,7 @@ INSTALLED_APPS = [
     "rest_framework", 
     "dadjokes", 
     "project",
+    "cs412", # shared templates and the model-version signals of cs412/caching.py
 
     # Allauth 
     "django.contrib.sites",
@@ -67,6 +68,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so its timing covers the rest of the stack (see cs412/profiling.py)
+    "cs412.profiling.QueryProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -106,9 +109,75 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # writers take the lock at BEGIN and wait for it (see cs412/database.py)
+            "transaction_mode": "IMMEDIATE",
+            # seconds a statement waits for a lock before "database is locked"
+            "timeout": 5,
+        },
+        # keep connections open between requests instead of reconnecting each time
+        "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# applied to every new SQLite connection by cs412/database.py
+SQLITE_PRAGMAS = {
+    "cache_size": -64000, # KiB, i.e. 64 MB per connection
+    "mmap_size": 268435456, # 256 MB
+    "temp_store": "MEMORY",
+}
+# WAL journaling is stored in the database file itself and leaves -wal/-shm files
+# next to it, so a deployment opts in with SQLITE_WAL=1
+SQLITE_WAL = os.environ.get("SQLITE_WAL") == "1"
+if SQLITE_WAL:
+    SQLITE_PRAGMAS.update({"journal_mode": "WAL", "synchronous": "NORMAL"})
+# retries of a statement still locked after the timeout (outside transactions)
+SQLITE_LOCK_RETRIES = 3
+
+# read-only snapshot of the analytics tables, rebuilt by `manage.py sync_analytics`
+# (see cs412/database.py and cs412/routers.py); None sends everything to "default"
+ANALYTICS_DATABASE = "analytics"
+ANALYTICS_APPS = ["voter_analytics", "marathon_analytics"]
+ANALYTICS_DB_PATH = os.environ.get("ANALYTICS_DB_PATH", BASE_DIR / "analytics.sqlite3")
+DATABASES[ANALYTICS_DATABASE] = {
+    "ENGINE": "django.db.backends.sqlite3",
+    # immutable: the file is replaced by each sync, never written in place, so
+    # readers skip locking and change detection entirely
+    "NAME": f"file:{ANALYTICS_DB_PATH}?mode=ro&immutable=1",
+    "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 600)),
+    "CONN_HEALTH_CHECKS": True,
+    "TEST": {"MIRROR": "default"},
+}
+DATABASE_ROUTERS = ["cs412.routers.AnalyticsRouter"]
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# "default" is per process (graph divs, facet lists, geocoder state...).
+# "views" is on disk, shared by all worker processes: cached page responses
+# and the per-model version numbers that invalidate them (cs412/caching.py).
+
+import tempfile
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "cs412-default",
+    },
+    "views": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CS412_CACHE_DIR", os.path.join(tempfile.gettempdir(), "cs412_cache")),
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+VIEW_CACHE_ALIAS = "views"
+
+# runs the tests with an empty, in-memory "views" cache
+TEST_RUNNER = "cs412.test_runner.IsolatedCacheTestRunner"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -159,6 +228,16 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
 
+# serve the plotly.js bundle that ships with the plotly package as a static
+# file (static/plotly/plotly.min.js), so the voter graphs page loads it once
+# and the browser can cache it instead of inlining it into every graph
+import importlib.util
+_plotly_spec = importlib.util.find_spec("plotly")
+if _plotly_spec is not None:
+    STATICFILES_DIRS.append(
+        ("plotly", os.path.join(os.path.dirname(_plotly_spec.origin), "package_data"))
+    )
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
  
@@ -190,8 +269,23 @@ SOCIALACCOUNT_PROVIDERS = {
 }
 
 GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY")
+
+# photo models whose uploads get resized WebP/JPEG renditions from
+# `manage.py process_images` (see cs412/images.py)
+IMAGE_RENDITION_MODELS = ["mini_insta.Photo", "project.ListingPhoto"]
+
+# TerrierBnB geocoding (project/utils.py): "google" calls the Geocoding API,
+# "stub" answers locally with made-up coordinates near BU (offline / tests)
+GEOCODER_BACKEND = os.environ.get("GEOCODER_BACKEND", "google")
+# requests per second the geocode_listings worker may send
+GEOCODER_RATE_LIMIT = 10
 SOCIALACCOUNT_LOGIN_ON_GET = True
 
+# mini_insta feed: profiles with at least this many followers are not fanned
+# out on write; their posts are pulled into feeds at read time instead
+MINI_INSTA_CELEBRITY_THRESHOLD = 10000
+
+
 
 
 
@@ -200,3 +294,13 @@ SOCIALACCOUNT_LOGIN_ON_GET = True
 
 
 
+# per-request SQL profiling (cs412/profiling.py): Server-Timing headers, N+1
+# warnings on the "cs412.profiling" logger, and /profiler/report.json; it adds
+# overhead to every query and exposes SQL, so it is off unless QUERY_PROFILER=1
+QUERY_PROFILER_ENABLED = os.environ.get("QUERY_PROFILER") == "1"
+# a query run this many times in one request is reported as a possible N+1
+QUERY_PROFILER_N_PLUS_ONE_THRESHOLD = 5
+# requests kept (per process) for the report
+QUERY_PROFILER_REPORT_SIZE = 200
+# record the template line / code line of each query (walks the stack per query)
+QUERY_PROFILER_TRACE_SOURCES = True
@@ -0,0 +1,26 @@
+# File: test_runner.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: test runner that swaps the shared on-disk "views" cache for an
+#   empty in-memory one, so tests never see pages or model versions left
+#   behind by the running site or by an earlier test run. The analytics apps
+#   read from the test database too, not from an analytics snapshot on disk.
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class IsolatedCacheTestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        caches = {**settings.CACHES, settings.VIEW_CACHE_ALIAS: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "cs412-tests",
+        }}
+        self.cache_override = override_settings(CACHES=caches, ANALYTICS_DATABASE=None)
+        self.cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_override.disable()
+        super().teardown_test_environment(**kwargs)
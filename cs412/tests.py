@@ -0,0 +1,176 @@
+# File: tests.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: tests for the code shared by the apps (cs412/...)
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection, router
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from cs412 import benchmarking, caching, database
+from dadjokes.models import Joke
+from voter_analytics.models import Voter
+
+
+class BenchmarkSmokeTest(SimpleTestCase):
+    '''`manage.py benchmark` seeds every app, replays its mix without errors and writes comparable JSON.'''
+
+    def test_tiny_run(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, 'results.json')
+
+        # its own process: the command creates and destroys its own test database,
+        # which would take the in-memory one of this test run with it
+        command = [sys.executable, 'manage.py', 'benchmark', '--scale', '0.001', '--requests', '20',
+                   '--warmup', '2', '--output', output]
+        finished = subprocess.run(command, cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=300)
+        self.assertEqual(finished.returncode, 0, finished.stderr[-2000:])
+        with open(output) as f:
+            results = json.load(f)
+
+        self.assertEqual(set(results['apps']), set(benchmarking.SEEDERS))
+        for app, summary in results['apps'].items():
+            self.assertEqual(summary['overall']['requests'], 20, app)
+            self.assertEqual(summary['overall']['errors'], 0, app)
+            self.assertGreater(summary['overall']['latency_ms']['p50'], 0, app)
+        self.assertEqual(results['meta']['scale'], 0.001)
+
+        # a run compared with itself has no regressions
+        regressions = [row for row in benchmarking.compare_results(results, results, 0.10) if row[-1]]
+        self.assertEqual(regressions, [])
+
+
+class ModelVersionTest(TestCase):
+    '''Saves bump the versions of the models cached views are built from, on commit; other models are left alone.'''
+
+    def test_bumped_on_commit_for_watched_models_only(self):
+        joke_version = caching.get_model_version(Joke)
+        user_version = caching.get_model_version(User)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Joke.objects.create(joke='new one', author='dad')
+            User.objects.create_user(username='someone')
+            # not yet: other connections can't see the new row
+            self.assertEqual(caching.get_model_version(Joke), joke_version)
+
+        self.assertGreater(caching.get_model_version(Joke), joke_version)
+        self.assertEqual(caching.get_model_version(User), user_version)
+
+    def test_watched_without_the_views(self):
+        # a fresh process that never loads the URLconf, like `manage.py shell`,
+        # on a throwaway in-memory database and cache
+        script = '''
+import os, sys
+os.environ['DJANGO_SETTINGS_MODULE'] = 'cs412.settings'
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = ':memory:'
+settings.CACHES[settings.VIEW_CACHE_ALIAS] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+import django
+django.setup()
+from django.db import connection
+from cs412 import caching
+from dadjokes.models import Joke
+with connection.schema_editor() as editor:
+    editor.create_model(Joke)
+before = caching.get_model_version(Joke)
+Joke.objects.create(joke='new one', author='dad')
+print(caching.get_model_version(Joke) > before, 'dadjokes.views' in sys.modules)
+'''
+        finished = subprocess.run([sys.executable, '-c', script], cwd=settings.BASE_DIR,
+                                  capture_output=True, text=True, timeout=60)
+        self.assertEqual(finished.returncode, 0, finished.stderr[-2000:])
+        self.assertEqual(finished.stdout.split(), ['True', 'False'])
+
+
+@override_settings(SQLITE_LOCK_RETRIES=3)
+class SQLiteLockRetryTest(SimpleTestCase):
+    '''Statements refused with "database is locked" are retried, but never inside a transaction.'''
+
+    class Connection:
+        def __init__(self, in_atomic_block):
+            self.in_atomic_block = in_atomic_block
+
+    def setUp(self):
+        self.addCleanup(setattr, database, 'LOCK_RETRY_DELAY', database.LOCK_RETRY_DELAY)
+        database.LOCK_RETRY_DELAY = 0
+        self.calls = 0
+
+    def locked_twice(self, sql, params, many, context):
+        self.calls += 1
+        if self.calls <= 2:
+            raise OperationalError('database is locked')
+        return 'done'
+
+    def test_autocommit_statement_is_retried(self):
+        context = {'connection': self.Connection(in_atomic_block=False)}
+        self.assertEqual(database.retry_when_locked(self.locked_twice, 'BEGIN IMMEDIATE', None, False, context), 'done')
+        self.assertEqual(self.calls, 3)
+
+    def test_statement_in_transaction_is_not_retried(self):
+        context = {'connection': self.Connection(in_atomic_block=True)}
+        with self.assertRaises(OperationalError):
+            database.retry_when_locked(self.locked_twice, 'UPDATE ...', None, False, context)
+        self.assertEqual(self.calls, 1)
+
+    def test_gives_up_after_the_retries(self):
+        context = {'connection': self.Connection(in_atomic_block=False)}
+        with override_settings(SQLITE_LOCK_RETRIES=1), self.assertRaises(OperationalError):
+            database.retry_when_locked(self.locked_twice, 'INSERT ...', None, False, context)
+        self.assertEqual(self.calls, 2)
+
+
+class SQLiteConnectionSetupTest(TestCase):
+    '''New SQLite connections get the pragmas from settings and the lock retry.'''
+
+    def test_pragmas_and_retry_are_installed(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2) # MEMORY
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -64000)
+        self.assertIn(database.retry_when_locked, connection.execute_wrappers)
+
+
+class AnalyticsRouterTest(SimpleTestCase):
+    '''Analytics reads go to the snapshot once it exists; writes and pinned reads go to the primary.'''
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'analytics.sqlite3')
+        settings = override_settings(ANALYTICS_DATABASE='analytics', ANALYTICS_DB_PATH=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write_snapshot(self, stamp):
+        '''Stand in for sync_analytics(): a snapshot file carrying a schema stamp.'''
+        snapshot = sqlite3.connect(self.path)
+        snapshot.execute(f'PRAGMA user_version = {stamp}')
+        snapshot.close()
+
+    def test_reads_use_primary_until_the_first_sync(self):
+        self.assertEqual(router.db_for_read(Voter), 'default')
+        self.write_snapshot(database.get_schema_stamp())
+        self.assertEqual(router.db_for_read(Voter), 'analytics')
+
+    def test_reads_use_primary_while_the_snapshot_has_an_old_schema(self):
+        self.write_snapshot(database.get_schema_stamp() ^ 1)
+        self.assertEqual(router.db_for_read(Voter), 'default')
+        # a snapshot of only some of the apps is not the schema either
+        self.assertNotEqual(database.get_schema_stamp(['voter_analytics']), database.get_schema_stamp())
+
+    def test_pinned_reads_and_writes_use_primary(self):
+        self.write_snapshot(database.get_schema_stamp())
+        with database.use_primary():
+            self.assertEqual(router.db_for_read(Voter), 'default')
+        self.assertEqual(router.db_for_write(Voter), 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+        self.assertFalse(router.allow_migrate('analytics', 'voter_analytics'))
@@ -0,0 +1,197 @@
+# File: uploads.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: streaming, content-addressed handling of multi-file photo
+#   uploads, shared by the apps (mini_insta CreatePostView, project
+#   CreateListingView).
+#
+#   Notes:
+#   - Django's default handlers keep each file in memory or spool it to /tmp,
+#     and the view then copies it again into MEDIA_ROOT. The handler below
+#     writes every chunk straight into a staging directory inside MEDIA_ROOT
+#     as it arrives and hashes it on the way, so each byte is written once
+#     and read zero times.
+#   - Staged files have random names without an extension, so they are never
+#     served as anything but bytes. Only once the view accepts the form does
+#     store_uploads() rename them (same filesystem, so no copy) to
+#     <upload_to>/<sha256[:2]>/<sha256><ext>. If that path already exists the
+#     same image was uploaded before: the staged copy is dropped and the rows
+#     share the stored file. Whatever was not stored is deleted at the end of
+#     the request (CSRF failure, invalid form, exception).
+#   - Anonymous requests are refused before the body is read. The CSRF token
+#     is a form field, so it can only be checked after the body is parsed;
+#     that is why the files are only staged until then.
+#   - Only image extensions and image/* content types are accepted; other
+#     files in the field are skipped without being written.
+#   - Views create the rows with bulk_create from the names store_uploads()
+#     returns; nothing is saved through the storage API again.
+#   - Stored originals are never deleted by the apps, so sharing them between
+#     rows is safe. Like cs412/images.py this assumes FileSystemStorage.
+
+import hashlib
+import os
+import tempfile
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+# incoming files are staged here, inside MEDIA_ROOT so the final rename never copies
+INCOMING_DIR = '.incoming'
+
+# what the upload field accepts
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic'}
+
+
+def is_image_upload(file_name, content_type):
+    '''True for a file with an image extension sent as image/*.'''
+    extension = os.path.splitext(file_name or '')[1].lower()
+    return extension in IMAGE_EXTENSIONS and (content_type or '').lower().startswith('image/')
+
+
+def content_addressed_name(upload_to, sha256, original_name):
+    '''Return the storage name of a file with this digest, e.g. photos/3f/3f9a...e1.jpg'''
+    extension = os.path.splitext(original_name)[1].lower()
+    return f"{upload_to.rstrip('/')}/{sha256[:2]}/{sha256}{extension}"
+
+
+class StagedUploadedFile(UploadedFile):
+    '''
+    An upload hashed and written to the staging directory. storage_name is
+    where store() puts it; deduplicated is True when store() found an
+    identical file already stored.
+    '''
+
+    def __init__(self, staged_path, storage_name, sha256, name, content_type, size, charset, content_type_extra=None):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.staged_path = staged_path
+        self.storage_name = storage_name
+        self.sha256 = sha256
+        self.deduplicated = False
+        self.stored = False
+
+    def open(self, mode='rb'):
+        self.file = open(default_storage.path(self.storage_name) if self.stored else self.staged_path, mode)
+        return self
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def store(self):
+        '''Move the staged file to its content-addressed name (or drop it if that exists); return the name.'''
+        if not self.stored:
+            final_path = default_storage.path(self.storage_name)
+            self.deduplicated = os.path.exists(final_path)
+            if self.deduplicated:
+                os.remove(self.staged_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(self.staged_path, final_path)
+            self.stored = True
+        return self.storage_name
+
+    def discard(self):
+        '''Delete the staged file unless it was stored.'''
+        if not self.stored:
+            try:
+                os.remove(self.staged_path)
+            except FileNotFoundError:
+                pass
+
+
+class ContentAddressedUploadHandler(FileUploadHandler):
+    '''
+    Upload handler that streams the image files of one form field into the
+    staging directory, hashing them. Non-image files of that field are
+    skipped; files of any other field are passed on to the next handler.
+    '''
+
+    def __init__(self, request=None, field_name='image_files', upload_to=''):
+        super().__init__(request)
+        self.field_name = field_name
+        self.upload_to = upload_to
+        self.active = False
+        self.staged = []
+        self.rejected = []
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == self.field_name
+        if not self.active:
+            return
+        if not is_image_upload(self.file_name, self.content_type):
+            self.active = False
+            self.rejected.append(self.file_name)
+            raise SkipFile()
+        incoming = default_storage.path(INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=incoming, delete=False)
+        self.hash = hashlib.sha256()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.file.write(raw_data)
+        self.hash.update(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.active = False
+        self.file.close()
+
+        digest = self.hash.hexdigest()
+        staged = StagedUploadedFile(
+            self.file.name, content_addressed_name(self.upload_to, digest, self.file_name), digest,
+            self.file_name, self.content_type, file_size, self.charset, self.content_type_extra,
+        )
+        self.staged.append(staged)
+        return staged
+
+    def upload_interrupted(self):
+        if self.active:
+            self.file.close()
+            try:
+                os.remove(self.file.name)
+            except FileNotFoundError:
+                pass
+
+    def discard_staged(self):
+        '''Delete every staged file that was not stored.'''
+        for staged in self.staged:
+            staged.discard()
+
+
+class StreamingUploadMixin(LoginRequiredMixin):
+    '''
+    View mixin that installs ContentAddressedUploadHandler for upload_field;
+    it requires login. Put it first in the bases: upload handlers can only
+    be changed before the body is read, and the CSRF middleware reads it, so
+    the login check comes first and the CSRF check is moved inside dispatch,
+    after the handler is in place. Call store_uploads() in form_valid().
+    '''
+    upload_field = 'image_files'
+    upload_to = ''
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        # refuse anonymous uploads before a byte of the body is read
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        self.upload_handler = ContentAddressedUploadHandler(
+            request, field_name=self.upload_field, upload_to=self.upload_to,
+        )
+        request.upload_handlers.insert(0, self.upload_handler)
+        try:
+            return csrf_protect(super().dispatch)(request, *args, **kwargs)
+        finally:
+            self.upload_handler.discard_staged()
+
+    def store_uploads(self):
+        '''Store the files uploaded in upload_field and return their storage names, in upload order.'''
+        return [file.store() for file in self.request.FILES.getlist(self.upload_field)]
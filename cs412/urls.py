@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include 
 from django.conf.urls.static import static
 from django.conf import settings 
+from cs412 import profiling
 
 
 urlpatterns = [
@@ -34,6 +35,9 @@ urlpatterns = [
     path("dadjokes/", include ("dadjokes.urls")),
     path("project/", include("project.urls")),
 
+    # SQL query profile of recent requests (staff only unless DEBUG)
+    path("profiler/report.json", profiling.report_view, name="profiler_report"),
+
 ] 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class DadjokesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dadjokes"
+
+    def ready(self):
+        from cs412 import caching
+        # the cached pages, the list API ETags and sampling.py's id tables follow these versions
+        caching.watch_models([self.get_model("Joke"), self.get_model("Picture")])
@@ -0,0 +1,79 @@
+# File: dadjokes/management/commands/bench_random.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: benchmark of random joke selection as the table grows:
+#   random.choice(Joke.objects.all()) (the old RandomJokeAPIView) against
+#   sampling.sample(). Uses a throwaway test database, so the real
+#   db.sqlite3 is never touched.
+#
+#   python manage.py bench_random --sizes 1000 100000 1000000
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from dadjokes import sampling
+from dadjokes.models import Joke
+
+
+class Command(BaseCommand):
+    help = "Time random joke selection, full table load vs cached ids / id probe, as the table grows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--old-repeat', type=int, default=3,
+                            help="repetitions of the old full-table pick, which is slow on big tables")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write(f"{'rows':>10}{'old ms':>10}{'ids ms':>10}{'weighted ms':>13}{'n=10 ms':>10}{'probe ms':>10}")
+            rows = 0
+            for size in sorted(options['sizes']):
+                rows = self.grow(rows, size)
+                self.run(size, options['repeat'], options['old_repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def grow(self, rows, size):
+        '''Add Jokes in bulk (no signals) until the table has size rows.'''
+        rng = random.Random(412)
+        with transaction.atomic():
+            for start in range(rows, size, 10000):
+                Joke.objects.bulk_create([
+                    Joke(joke=f'Joke number {i}', author='bench', weight=rng.randint(1, 5))
+                    for i in range(start, min(start + 10000, size))
+                ])
+        sampling.invalidate(Joke)
+        return size
+
+    def time_call(self, repeat, fn):
+        '''Return the median wall time of fn() in milliseconds.'''
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def run(self, size, repeat, old_repeat):
+        old = self.time_call(old_repeat, lambda: random.choice(Joke.objects.all()))
+        sampling.sample(Joke) # warm the id cache
+        ids = self.time_call(repeat, lambda: sampling.sample(Joke))
+        weighted = self.time_call(repeat, lambda: sampling.sample(Joke, weighted=True))
+        batch = self.time_call(repeat, lambda: sampling.sample(Joke, n=10))
+
+        # force the uncached path, as on a table above ID_CACHE_LIMIT
+        limit = sampling.ID_CACHE_LIMIT
+        sampling.ID_CACHE_LIMIT = 0
+        sampling.invalidate(Joke)
+        try:
+            probe = self.time_call(repeat, lambda: sampling.sample(Joke))
+        finally:
+            sampling.ID_CACHE_LIMIT = limit
+            sampling.invalidate(Joke)
+        self.stdout.write(f"{size:>10}{old:>10.2f}{ids:>10.3f}{weighted:>13.3f}{batch:>10.3f}{probe:>10.3f}")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dadjokes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joke',
+            name='weight',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='picture',
+            name='weight',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dadjokes', '0002_joke_weight_picture_weight'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='joke',
+            name='published',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='picture',
+            name='published',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
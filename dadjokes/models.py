@@ -8,7 +8,9 @@ from django.urls import reverse
 class Joke(models.Model):
     joke = models.TextField()
     author = models.CharField(max_length=100)
-    published = models.DateTimeField(auto_now_add=True)
+    published = models.DateTimeField(auto_now_add=True, db_index=True) # API ordering and ?since=
+    # relative chance of being picked by the weighted random mode, see sampling.py
+    weight = models.PositiveSmallIntegerField(default=1)
 
     def __str__(self):
         return f"{self.joke[:50]}, added by {self.author}: "
@@ -20,7 +22,9 @@ class Joke(models.Model):
 class Picture(models.Model):
     image_url = models.URLField()
     author = models.CharField(max_length=100)
-    published = models.DateTimeField(auto_now_add=True)
+    published = models.DateTimeField(auto_now_add=True, db_index=True) # API ordering and ?since=
+    # relative chance of being picked by the weighted random mode, see sampling.py
+    weight = models.PositiveSmallIntegerField(default=1)
 
     def __str__(self):
         return f"Picture by {self.author}"
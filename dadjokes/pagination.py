@@ -0,0 +1,22 @@
+# File: dadjokes/pagination.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: cursor pagination for the dadjokes list APIs.
+
+from rest_framework.pagination import CursorPagination
+
+
+class PublishedCursorPagination(CursorPagination):
+    '''
+    Newest first, or oldest first when syncing with ?since=, so a client can
+    follow `next` until it is null and then remember the last `published`
+    it received for its next ?since=.
+    '''
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-published', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        if 'since' in request.query_params:
+            return ('published', 'id')
+        return self.ordering
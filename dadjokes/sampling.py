@@ -0,0 +1,145 @@
+# File: dadjokes/sampling.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: random selection of Jokes and Pictures for RandomView and the
+#   random APIs without loading the tables.
+#
+#   Notes:
+#   - Each process keeps the ids (and cumulative weights) of each table in
+#     memory, so a random pick is an index into that array plus one
+#     primary-key lookup. The table's model version (cs412/caching.py) tells
+#     the processes when to reload.
+#   - Tables with more than ID_CACHE_LIMIT rows only keep their smallest and
+#     largest id; picks there probe a random number in that range and take
+#     the first row at or above it (one indexed query, slightly favoring rows
+#     that follow a gap in the ids).
+#   - weighted=True picks rows in proportion to their `weight` field.
+#   - no_repeat=True remembers what this session was already shown (up to
+#     SESSION_HISTORY rows per table) and avoids showing it again until every
+#     row has been seen.
+
+import bisect
+import random
+from itertools import accumulate
+
+from cs412 import caching
+
+ID_CACHE_LIMIT = 200_000
+SESSION_HISTORY = 1000
+MAX_BATCH = 50
+
+# picks that land on already-seen or deleted rows are retried this many times
+MAX_ATTEMPTS = 20
+
+# label -> (version, table); the arrays live in process memory, only the small
+# model version goes through the cache, so a pick never unpickles the ids
+_tables = {}
+
+
+def invalidate(model):
+    '''Make every process rebuild its ids of model (e.g. after a bulk delete).'''
+    caching.bump_model_version(model)
+
+
+def build_id_table(model):
+    '''
+    Return {'ids': [...], 'cum_weights': [...]} ordered by id, or, for tables
+    above ID_CACHE_LIMIT rows, {'ids': None, 'low': min id, 'high': max id}.
+    '''
+    rows = list(model.objects.order_by('pk').values_list('pk', 'weight')[:ID_CACHE_LIMIT + 1])
+    if len(rows) <= ID_CACHE_LIMIT:
+        return {
+            'ids': [pk for pk, weight in rows],
+            'cum_weights': list(accumulate(weight for pk, weight in rows)),
+        }
+    pks = model.objects.values_list('pk', flat=True)
+    return {'ids': None, 'low': pks.order_by('pk').first(), 'high': pks.order_by('-pk').first()}
+
+
+def get_id_table(model):
+    '''Return this process's id table of model, rebuilt when its version changed.'''
+    version = caching.get_model_version(model)
+    cached = _tables.get(model._meta.label_lower)
+    if cached is None or cached[0] != version:
+        cached = (version, build_id_table(model))
+        _tables[model._meta.label_lower] = cached
+    return cached[1]
+
+
+def draw_id(model, table, weighted):
+    '''Return one random id (or None if the table is empty).'''
+    ids = table['ids']
+    if ids is not None:
+        if not ids:
+            return None
+        if weighted and table['cum_weights'][-1] > 0:
+            # a random point on the cumulative weights, found by binary search
+            point = random.random() * table['cum_weights'][-1]
+            return ids[bisect.bisect_right(table['cum_weights'], point)]
+        return random.choice(ids)
+
+    # too many rows to hold: probe the id range (weights are ignored here)
+    probe = random.randint(table['low'], table['high'])
+    pks = model.objects.values_list('pk', flat=True)
+    pk = pks.filter(pk__gte=probe).order_by('pk').first()
+    if pk is None:
+        # the rows at the top of the range were deleted since the bounds were read
+        pk = pks.filter(pk__lt=probe).order_by('-pk').first()
+    return pk
+
+
+def sample(model, n=1, weighted=False, no_repeat=False, session=None):
+    '''
+    Return up to n distinct random rows of model, in random order, with one
+    query for the rows (plus one for the ids when they are not cached).
+    '''
+    n = max(1, min(n, MAX_BATCH))
+    table = get_id_table(model)
+    total = len(table['ids']) if table['ids'] is not None else None
+
+    seen_key = f'dadjokes_seen:{model._meta.label_lower}'
+    seen = set(session.get(seen_key, [])) if no_repeat and session is not None else set()
+    if total is not None and len(seen) + n > total:
+        seen = set() # every row was shown already: start over
+
+    chosen = []
+    for _ in range(n * MAX_ATTEMPTS):
+        if len(chosen) == n:
+            break
+        pk = draw_id(model, table, weighted)
+        if pk is None:
+            break
+        if pk not in seen and pk not in chosen:
+            chosen.append(pk)
+    if len(chosen) < n and total is not None:
+        # nearly everything was seen or drawn: pick from what is left directly
+        remaining = [pk for pk in table['ids'] if pk not in seen and pk not in chosen]
+        chosen += random.sample(remaining, min(n - len(chosen), len(remaining)))
+
+    rows = model.objects.in_bulk(chosen)
+    if len(rows) < len(chosen):
+        # the cached ids are stale (e.g. after a bulk delete); the next call rebuilds them
+        invalidate(model)
+    result = [rows[pk] for pk in chosen if pk in rows]
+
+    if no_repeat and session is not None:
+        history = [pk for pk in session.get(seen_key, []) if pk in seen] + [obj.pk for obj in result]
+        session[seen_key] = history[-SESSION_HISTORY:]
+    return result
+
+
+def sample_for_request(model, request, default_n=1):
+    '''
+    sample() with the options taken from the query string:
+    ?n=<count>&weighted=1&no_repeat=1
+    '''
+    params = request.GET
+    try:
+        n = int(params.get('n', default_n))
+    except ValueError:
+        n = default_n
+    return sample(
+        model, n=n,
+        weighted=params.get('weighted') in ('1', 'true'),
+        no_repeat=params.get('no_repeat') in ('1', 'true'),
+        session=getattr(request, 'session', None),
+    )
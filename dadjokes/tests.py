@@ -1,3 +1,129 @@
-from django.test import TestCase
+# File: tests.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: tests for dadjokes
 
-# Create your tests here.
+from datetime import timedelta, timezone as dt_timezone
+
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import sampling
+from .models import Joke
+
+
+class SamplingTest(TestCase):
+    '''Random picks come from the cached ids, in every mode, and honour the bounds on n.'''
+
+    def setUp(self):
+        # the id tables live in process memory and would outlive the test's rows
+        sampling._tables.clear()
+        self.jokes = Joke.objects.bulk_create([Joke(joke=f"joke {i}", author="dad") for i in range(60)])
+        sampling.invalidate(Joke)
+        self.ids = {joke.pk for joke in self.jokes}
+
+    def test_uniform(self):
+        picked = sampling.sample(Joke, n=10)
+        self.assertEqual(len(picked), 10)
+        self.assertEqual(len({joke.pk for joke in picked}), 10)
+        self.assertLessEqual({joke.pk for joke in picked}, self.ids)
+
+    def test_bounds_on_n(self):
+        self.assertEqual(len(sampling.sample(Joke, n=0)), 1)
+        self.assertEqual(len(sampling.sample(Joke, n=-5)), 1)
+        self.assertEqual(len(sampling.sample(Joke, n=1000)), sampling.MAX_BATCH)
+
+        Joke.objects.exclude(pk__in=[joke.pk for joke in self.jokes[:3]]).delete()
+        sampling.invalidate(Joke)
+        self.assertEqual(len(sampling.sample(Joke, n=10)), 3)
+
+        Joke.objects.all().delete()
+        sampling.invalidate(Joke)
+        self.assertEqual(sampling.sample(Joke), [])
+
+    def test_weighted(self):
+        favourite = self.jokes[7]
+        Joke.objects.exclude(pk=favourite.pk).update(weight=0)
+        Joke.objects.filter(pk=favourite.pk).update(weight=5)
+        sampling.invalidate(Joke)
+        for _ in range(20):
+            self.assertEqual(sampling.sample(Joke, weighted=True), [favourite])
+
+    def test_no_repeat(self):
+        session = {}
+        shown = [sampling.sample(Joke, no_repeat=True, session=session)[0].pk for _ in range(60)]
+        self.assertEqual(set(shown), self.ids)
+        # everything was seen, so the next pick starts over instead of failing
+        self.assertEqual(len(sampling.sample(Joke, no_repeat=True, session=session)), 1)
+
+    def test_large_table_probes_the_id_range(self):
+        self.addCleanup(setattr, sampling, 'ID_CACHE_LIMIT', sampling.ID_CACHE_LIMIT)
+        sampling.ID_CACHE_LIMIT = 10
+        sampling.invalidate(Joke)
+        Joke.objects.filter(pk__in=[joke.pk for joke in self.jokes[20:40]]).delete()
+
+        table = sampling.get_id_table(Joke)
+        self.assertIsNone(table['ids'])
+        picked = sampling.sample(Joke, n=5)
+        self.assertEqual(len(picked), 5)
+        self.assertLessEqual({joke.pk for joke in picked}, {joke.pk for joke in self.jokes[:20] + self.jokes[40:]})
+
+    def test_query_string_options(self):
+        request = RequestFactory().get('/', {'n': 'abc'})
+        self.assertEqual(len(sampling.sample_for_request(Joke, request)), 1)
+
+        response = self.client.get(reverse('api_random_joke'), {'n': 3, 'no_repeat': 1})
+        self.assertEqual(len(response.json()), 3)
+        response = self.client.get(reverse('api_random_joke'))
+        self.assertIn(response.json()['id'], self.ids)
+
+
+class JokeListAPITest(TestCase):
+    '''The list API pages by cursor, answers 304 while nothing changed and syncs with ?since=.'''
+
+    def setUp(self):
+        start = timezone.now() - timedelta(days=10)
+        for i in range(5):
+            joke = Joke.objects.create(joke=f"joke {i}", author="dad")
+            Joke.objects.filter(pk=joke.pk).update(published=start + timedelta(days=i))
+        self.url = reverse('api_jokes')
+
+    def test_cursor_pages_newest_first(self):
+        data = self.client.get(self.url, {'page_size': 2}).json()
+        self.assertEqual([joke['joke'] for joke in data['results']], ['joke 4', 'joke 3'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([joke['joke'] for joke in data['results']], ['joke 2', 'joke 1'])
+
+    def test_etag_and_304(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        # another query string is another representation
+        self.assertNotEqual(self.client.get(self.url, {'page_size': 2})['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Joke.objects.create(joke="new one", author="dad")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_since(self):
+        since = Joke.objects.get(joke='joke 2').published
+        data = self.client.get(self.url, {'since': since.isoformat()}).json()
+        # oldest first, so a client can remember the last one it received
+        self.assertEqual([joke['joke'] for joke in data['results']], ['joke 3', 'joke 4'])
+
+        # a naive timestamp is taken as UTC
+        naive = since.astimezone(dt_timezone.utc).replace(tzinfo=None).isoformat()
+        data = self.client.get(self.url, {'since': naive}).json()
+        self.assertEqual(len(data['results']), 2)
+
+    def test_bad_since_is_400(self):
+        response = self.client.get(self.url, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.json())
@@ -6,9 +6,18 @@ from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView, TemplateView
 from .models import *
 from .serializers import *
-import random
+from .pagination import PublishedCursorPagination
+from . import sampling
+from cs412 import caching
+from cs412.caching import CachedViewMixin
+import hashlib
+from datetime import timezone as dt_timezone
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import condition
 from rest_framework import generics
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 
 
@@ -17,31 +26,38 @@ class RandomView(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["joke"] = random.choice(Joke.objects.all())
-        context["picture"] = random.choice(Picture.objects.all())
+        # one primary-key lookup each, see sampling.py (?weighted=1, ?no_repeat=1)
+        jokes = sampling.sample_for_request(Joke, self.request)
+        pictures = sampling.sample_for_request(Picture, self.request)
+        context["joke"] = jokes[0] if jokes else None
+        context["picture"] = pictures[0] if pictures else None
         return context
 
 
-class JokeListView(ListView):
+class JokeListView(CachedViewMixin, ListView):
     model = Joke
+    cache_models = [Joke]
     template_name = "dadjokes/show_all_jokes.html"
     context_object_name = "jokes"
 
 
-class JokeDetailView(DetailView):
+class JokeDetailView(CachedViewMixin, DetailView):
     model = Joke
+    cache_models = [Joke]
     template_name = "dadjokes/show_joke.html"
     context_object_name = "joke"
 
 
-class PictureListView(ListView):
+class PictureListView(CachedViewMixin, ListView):
     model = Picture
+    cache_models = [Picture]
     template_name = "dadjokes/show_all_pictures.html"
     context_object_name = "pictures"
 
 
-class PictureDetailView(DetailView):
+class PictureDetailView(CachedViewMixin, DetailView):
     model = Picture
+    cache_models = [Picture]
     template_name = "dadjokes/show_picture.html"
     context_object_name = "picture"
 
@@ -49,18 +65,68 @@ class PictureDetailView(DetailView):
 ############################################################
 #APIs
 
-class RandomJokeAPIView(APIView):
+class RandomAPIView(APIView):
+    '''
+    Return one random object, or a list of ?n= distinct ones.
+    Also takes ?weighted=1 and ?no_repeat=1, see sampling.py.
+    '''
+    model = None
+    serializer_class = None
+    empty_message = "Nothing found."
+
+    def get(self, request, *args, **kwargs):
+        objects = sampling.sample_for_request(self.model, request)
+        if 'n' in request.GET:
+            return Response(self.serializer_class(objects, many=True).data)
+        if not objects:
+            return Response({"error": self.empty_message})
+        return Response(self.serializer_class(objects[0]).data)
+
+
+class RandomJokeAPIView(RandomAPIView):
     '''Return one random joke.'''
+    model = Joke
+    serializer_class = JokeSerializer
+    empty_message = "No jokes found."
+
+
+class ConditionalListMixin:
+    '''
+    Cursor-paginated list that answers 304 Not Modified when the client's
+    If-None-Match still matches, and takes ?since=<ISO timestamp> to return
+    only rows published after it.
+    '''
+    pagination_class = PublishedCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        since = self.request.query_params.get('since')
+        if since:
+            # an unencoded "+00:00" arrives as " 00:00"
+            since = parse_datetime(since.replace(' ', '+'))
+            if since is None:
+                raise ValidationError({"since": "Expected an ISO 8601 timestamp."})
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, dt_timezone.utc)
+            queryset = queryset.filter(published__gt=since)
+        return queryset
+
+    def get_etag(self, request, *args, **kwargs):
+        '''
+        The table's model version (cs412/caching.py) plus the query string,
+        so the ETag changes whenever any row of the table changes.
+        '''
+        model = self.queryset.model
+        query = hashlib.sha1(request.GET.urlencode().encode()).hexdigest()[:12]
+        return f"{model._meta.model_name}-{caching.get_model_version(model)}-{query}"
+
     def get(self, request, *args, **kwargs):
-        jokes = Joke.objects.all()
-        if not jokes:
-            return Response({"error": "No jokes found."})
-        joke = random.choice(jokes)
-        serializer = JokeSerializer(joke)
-        return Response(serializer.data)
+        response = condition(etag_func=self.get_etag)(super().get)(request, *args, **kwargs)
+        response["Cache-Control"] = "no-cache" # always revalidate with the ETag
+        return response
 
 
-class JokeListCreateAPIView(generics.ListCreateAPIView):
+class JokeListCreateAPIView(ConditionalListMixin, generics.ListCreateAPIView):
     '''list all jokes and create a new joke'''
     queryset = Joke.objects.all()
     serializer_class = JokeSerializer
@@ -72,7 +138,7 @@ class JokeDetailAPIView(generics.RetrieveAPIView):
     serializer_class = JokeSerializer
     
 
-class PictureListAPIView(generics.ListAPIView):
+class PictureListAPIView(ConditionalListMixin, generics.ListAPIView):
     '''Return all pictures.'''
     queryset = Picture.objects.all()
     serializer_class = PictureSerializer
@@ -84,12 +150,8 @@ class PictureDetailAPIView(generics.RetrieveAPIView):
     serializer_class = PictureSerializer
 
 
-class RandomPictureAPIView(APIView):
+class RandomPictureAPIView(RandomAPIView):
     '''Return one random picture.'''
-    def get(self, request, *args, **kwargs):
-        pictures = Picture.objects.all()
-        if not pictures:
-            return Response({"error": "No pictures found."})
-        picture = random.choice(pictures)
-        serializer = PictureSerializer(picture)
-        return Response(serializer.data)
\ No newline at end of file
+    model = Picture
+    serializer_class = PictureSerializer
+    empty_message = "No pictures found."
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MarathonAnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'marathon_analytics'
+
+    def ready(self):
+        from cs412 import caching
+        # the cached results pages follow this version
+        caching.watch_models([self.get_model('Result')])
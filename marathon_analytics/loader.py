@@ -0,0 +1,127 @@
+# File: loader.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: parallel bulk loader for marathon Result data.
+#
+#   Notes:
+#   - The CSV is cut into chunks of lines; a process pool parses one chunk per
+#     task (parsing.py) and this process is the single writer that bulk_creates
+#     the parsed rows.
+#   - Rows go into a staging table, never into the live table. Once the load
+#     has finished, the staging table is swapped in with ALTER TABLE ... RENAME
+#     inside one transaction, so readers see either the old results or the new
+#     ones and never an empty or half-loaded table.
+
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.apps.registry import Apps
+from django.db import connection, models, transaction
+
+from cs412 import caching
+
+from .models import Result
+from .parsing import parse_chunk
+
+STAGING_TABLE = f'{Result._meta.db_table}_staging'
+OLD_TABLE = f'{Result._meta.db_table}_old'
+
+
+def get_staging_model():
+    '''
+    Return an unregistered copy of Result stored in the staging table. It lives
+    in its own Apps registry so it never shows up in migrations or the admin.
+    '''
+    attrs = {
+        '__module__': __name__,
+        'Meta': type('Meta', (), {
+            'app_label': Result._meta.app_label,
+            'db_table': STAGING_TABLE,
+            'apps': Apps(),
+        }),
+    }
+    for field in Result._meta.local_fields:
+        attrs[field.name] = field.clone()
+    return type('ResultStaging', (models.Model,), attrs)
+
+
+def read_chunks(f, chunk_size):
+    '''Yield lists of up to chunk_size non-blank lines from an open file.'''
+    lines = (line for line in f if line.strip())
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def swap_in(staging):
+    '''Atomically replace the live Result table with the staging table.'''
+    quote = connection.ops.quote_name
+    live = Result._meta.db_table
+    with connection.schema_editor(atomic=True) as editor:
+        editor.execute(f"ALTER TABLE {quote(live)} RENAME TO {quote(OLD_TABLE)}")
+        editor.execute(f"ALTER TABLE {quote(STAGING_TABLE)} RENAME TO {quote(live)}")
+        editor.execute(f"DROP TABLE {quote(OLD_TABLE)}")
+        # the dropped table took its secondary indexes with it; rebuild them on the new data
+        for index in Result._meta.indexes:
+            editor.add_index(Result, index)
+
+
+def parse_in_pool(pool, chunks, window):
+    '''Yield parse_chunk results in file order, keeping at most window chunks in flight.'''
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(parse_chunk, chunk))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def load_results(path, workers=None, chunk_size=5000, batch_size=5000, rejects=None, progress=None):
+    '''
+    Load a results CSV into a staging table in parallel and swap it in.
+
+    workers    -- parser processes (default: one per CPU)
+    chunk_size -- CSV lines handed to a worker per task
+    batch_size -- rows per bulk_create
+    rejects    -- optional writable text file for lines that failed to parse
+    progress   -- optional callable(rows loaded so far)
+    Returns (rows loaded, rows rejected, seconds).
+    '''
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    staging = get_staging_model()
+    writer = csv.writer(rejects) if rejects is not None else None
+
+    with connection.schema_editor() as editor:
+        editor.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(STAGING_TABLE)}")
+        editor.create_model(staging)
+
+    loaded = 0
+    rejected = 0
+    try:
+        with open(path, newline='', encoding='utf-8') as f, ProcessPoolExecutor(max_workers=workers) as pool:
+            f.readline() # discard the header
+            for rows, bad in parse_in_pool(pool, read_chunks(f, chunk_size), window=workers * 2):
+                with transaction.atomic():
+                    staging.objects.bulk_create([staging(**row) for row in rows], batch_size=batch_size)
+                loaded += len(rows)
+                rejected += len(bad)
+                if writer is not None:
+                    for line, error in bad:
+                        writer.writerow(next(csv.reader([line]), []) + [error])
+                if progress is not None:
+                    progress(loaded)
+        swap_in(staging)
+        caching.bump_model_version(Result) # the cached results pages are stale now
+    except BaseException:
+        with connection.schema_editor() as editor:
+            editor.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(STAGING_TABLE)}")
+        raise
+
+    return loaded, rejected, time.perf_counter() - started
@@ -0,0 +1,53 @@
+# File: import_results.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: management command that reloads the marathon Result table from a
+#   CSV file using the parallel, staging-table loader in loader.py.
+#
+#   python manage.py import_results 2023_chicago_results.csv --workers 4
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marathon_analytics.loader import load_results
+
+
+class Command(BaseCommand):
+    help = "Replace all marathon results with the rows of a CSV file, without an empty-table window."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="results CSV file")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="parser processes (default: one per CPU)")
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help="CSV lines per parser task")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="rows per bulk insert")
+        parser.add_argument('--rejects',
+                            help="where to write rows that fail to parse (default: <path>.rejects.csv)")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        rejects_path = options['rejects'] or f'{path}.rejects.csv'
+
+        def progress(loaded):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  staged {loaded} rows")
+
+        try:
+            with open(rejects_path, 'w', newline='', encoding='utf-8') as rejects:
+                loaded, rejected, seconds = load_results(
+                    path,
+                    workers=options['workers'],
+                    chunk_size=options['chunk_size'],
+                    batch_size=options['batch_size'],
+                    rejects=rejects,
+                    progress=progress,
+                )
+        except FileNotFoundError as e:
+            raise CommandError(f"cannot open {path}: {e}")
+
+        rate = loaded / seconds if seconds else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {loaded} results, rejected {rejected} in {seconds:.1f}s ({rate:.0f} rows/s)"
+        ))
+        if rejected:
+            self.stdout.write(f"rejected rows written to {rejects_path}")
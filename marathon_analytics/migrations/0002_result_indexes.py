@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marathon_analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['place_overall', 'id'], name='result_place_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['city', 'place_overall', 'id'], name='result_city_place_idx'),
+        ),
+    ]
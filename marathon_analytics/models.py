@@ -31,63 +31,26 @@ class Result(models.Model):
     time_finish = models.TimeField()
     time_half1 = models.TimeField()
     time_half2 = models.TimeField()
+
+    class Meta:
+        indexes = [
+            # keyset pagination of ResultsListView, with and without the city filter
+            models.Index(fields=['place_overall', 'id'], name='result_place_idx'),
+            models.Index(fields=['city', 'place_overall', 'id'], name='result_city_place_idx'),
+        ]
  
     def __str__(self):
         '''Return a string representation of this model instance.'''
         return f'{self.first_name} {self.last_name} ({self.city}, {self.state}), {self.time_finish}'
     
-def load_data():
-    '''Function to load data records from CSV file into Django model instances.'''
-
-    ## very dangerous!
-    Result.objects.all().delete()
-
-    filename = '/Users/luisavazquezusabiaga/django/2023_chicago_results.csv'
-    f = open(filename, 'r') # open the file for reading
-
-    # discard headers:
-    f.readline() # do nothing with it
-
-    # read several rows
-    # for i in range(5):
-        # line = f.readline()
-
-    # read entire file, one line at the time
-    for line in f:
-
-        try: 
-            fields = line.strip().split(',')
-            # print(fields)
-            # for j in range(len(fields)):
-            #     print(f'fields[{j}] = {fields[j]}') 
+def load_data(filename='/Users/luisavazquezusabiaga/django/2023_chicago_results.csv'):
+    '''Function to load data records from CSV file into Django model instances.
 
-            # create a new instance of Result object with this record from CSV
-            result = Result(bib=fields[0],
-                first_name=fields[1],
-                last_name=fields[2],
-                ctz = fields[3],
-                city = fields[4],
-                state = fields[5],
-                
-                gender = fields[6],
-                division = fields[7],
+    Kept for the shell; delegates to the parallel loader used by
+    `manage.py import_results`, which swaps the new rows in atomically.'''
+    from cs412 import database
+    from .loader import load_results
 
-                place_overall = fields[8],
-                place_gender = fields[9],
-                place_division = fields[10],
-            
-                start_time_of_day = fields[11],
-                finish_time_of_day = fields[12],
-                time_finish = fields[13],
-                time_half1 = fields[14],
-                time_half2 = fields[15],
-            )
-            
-            result.save() # commit to database
-            #print(f'Created result: {result}.')
-        
-        except: 
-            print("Something went wrong!")
-            print(f"line={line}")
-        
-    print(f"Created {len(Result.objects.all())} Resultss")
\ No newline at end of file
+    loaded, rejected, seconds = load_results(filename)
+    with database.use_primary():
+        print(f"Created {Result.objects.count()} Results ({rejected} rejected) in {seconds:.1f}s")
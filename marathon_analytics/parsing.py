@@ -0,0 +1,68 @@
+# File: parsing.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: CSV row parsing for the Chicago Marathon results file.
+#
+#   These functions run inside worker processes (see loader.py), so this module
+#   deliberately imports nothing from Django: a spawned worker can import it
+#   without setting up the app registry.
+
+import csv
+from datetime import datetime
+
+# field names of Result, in CSV column order:
+# BIB,First Name,Last Name,CTZ,City,State,Gender,Division,
+# Place Overall,Place Gender,Place Division,Start TOD,Finish TOD,Finish,HALF1,HALF2
+FIELDS = [
+    'bib', 'first_name', 'last_name', 'ctz', 'city', 'state',
+    'gender', 'division',
+    'place_overall', 'place_gender', 'place_division',
+    'start_time_of_day', 'finish_time_of_day',
+    'time_finish', 'time_half1', 'time_half2',
+]
+
+INT_FIELDS = {'bib', 'place_overall', 'place_gender', 'place_division'}
+TIME_FIELDS = {'start_time_of_day', 'finish_time_of_day', 'time_finish', 'time_half1', 'time_half2'}
+
+TIME_FORMATS = ('%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p')
+
+
+def parse_time(value):
+    '''Convert an "H:MM:SS" (or "H:MM:SS AM") string to a datetime.time.'''
+    value = value.strip()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).time()
+        except ValueError:
+            pass
+    raise ValueError(f"not a time: {value!r}")
+
+
+def parse_row(row):
+    '''Return a dict of typed Result field values for one CSV row, or raise ValueError.'''
+    if len(row) < len(FIELDS):
+        raise ValueError(f"expected {len(FIELDS)} columns, got {len(row)}")
+    values = {}
+    for field, raw in zip(FIELDS, row):
+        if field in INT_FIELDS:
+            values[field] = int(raw.strip())
+        elif field in TIME_FIELDS:
+            values[field] = parse_time(raw)
+        else:
+            values[field] = raw.strip()
+    return values
+
+
+def parse_chunk(lines):
+    '''
+    Parse a list of raw CSV lines.
+    Returns (rows, rejects): rows is a list of field dicts, rejects a list of
+    (line, error) pairs for lines that could not be converted.
+    '''
+    rows = []
+    rejects = []
+    for line, row in zip(lines, csv.reader(lines)):
+        try:
+            rows.append(parse_row(row))
+        except ValueError as e:
+            rejects.append((line, str(e)))
+    return rows, rejects
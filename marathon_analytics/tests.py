@@ -1,3 +1,127 @@
-from django.test import TestCase
+# File: tests.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: tests for marathon analytics
 
-# Create your tests here.
+import os
+import tempfile
+from datetime import time
+from io import StringIO
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from cs412 import caching
+from cs412.pagination import encode_cursor
+
+from . import loader
+from .models import Result
+
+HEADER = ("BIB,First Name,Last Name,CTZ,City,State,Gender,Division,Place Overall,Place Gender,Place Division,"
+          "Start TOD,Finish TOD,Finish,HALF1,HALF2\n")
+
+
+def make_result(bib, place, city='Chicago'):
+    '''An unsaved Result.'''
+    return Result(
+        bib=bib, first_name='Pat', last_name=f'Runner{bib}', ctz='USA', city=city, state='IL',
+        gender='F', division='F30-34', place_overall=place, place_gender=place, place_division=place,
+        start_time_of_day=time(7, 30), finish_time_of_day=time(11, 30),
+        time_finish=time(4, 0), time_half1=time(2, 0), time_half2=time(2, 0),
+    )
+
+
+class ResultsKeysetPaginationTest(TestCase):
+    '''The results list pages by cursor in place order, with id breaking ties, with or without the city filter.'''
+
+    def setUp(self):
+        cache.clear()
+        # three runners share each place, so pages end inside ties
+        Result.objects.bulk_create([
+            make_result(bib, place=bib // 3, city='Boston' if bib % 2 else 'Chicago') for bib in range(60)
+        ])
+        # bulk_create sends no signals; the loader bumps the version the same way
+        caching.bump_model_version(Result)
+
+    def walk(self, query=''):
+        '''Follow the Next links from the first page; return the pages.'''
+        pages = []
+        while True:
+            response = self.client.get(f"{reverse('results_list')}?{query}")
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.context['page_obj'])
+            if not pages[-1].has_next():
+                return pages
+            query = pages[-1].next_query
+
+    def test_forward_and_back(self):
+        pages = self.walk()
+        self.assertEqual([len(page) for page in pages], [25, 25, 10])
+        expected = list(Result.objects.order_by('place_overall', 'id').values_list('pk', flat=True))
+        self.assertEqual([result.pk for page in pages for result in page], expected)
+
+        response = self.client.get(f"{reverse('results_list')}?{pages[2].previous_query}")
+        self.assertEqual([result.pk for result in response.context['page_obj']], [result.pk for result in pages[1]])
+
+    def test_city_filter_is_kept_across_pages(self):
+        pages = self.walk('city=Boston')
+        self.assertEqual([len(page) for page in pages], [25, 5])
+        self.assertEqual({result.city for page in pages for result in page}, {'Boston'})
+
+    def test_bad_cursor_shows_the_first_page(self):
+        first = self.walk()[0]
+        for cursor in ('not-a-cursor', encode_cursor(['x', 1], 'n', 2)):
+            response = self.client.get(reverse('results_list'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page_obj']
+            self.assertEqual((page.number, [result.pk for result in page]), (1, [result.pk for result in first]))
+            self.assertFalse(page.has_previous())
+
+
+class ResultLoaderTest(TransactionTestCase):
+    '''The loader fills a staging table in parallel and swaps it in with its indexes; a failed load changes nothing.'''
+
+    def setUp(self):
+        Result.objects.bulk_create([make_result(bib, place=bib) for bib in range(3)])
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'results.csv')
+
+    def write_csv(self, rows):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(HEADER)
+            for bib in range(rows):
+                f.write(f"{bib},A{bib},B{bib},USA,Boston,MA,Female,F30-34,{bib + 1},{bib + 1},{bib + 1},"
+                        f"07:30:00,10:45:12,3:15:12,1:35:00,1:40:12\n")
+            f.write("99,Bad,Row,USA,Boston,MA,Female,F30-34,x,1,1,07:30:00,10:45:12,3:15:12,1:35:00,1:40:12\n")
+
+    def table_names(self):
+        with connection.cursor() as cursor:
+            return connection.introspection.table_names(cursor)
+
+    def test_staging_table_is_swapped_in_with_its_indexes(self):
+        self.write_csv(40)
+        rejects = StringIO()
+        loaded, rejected, seconds = loader.load_results(self.path, workers=2, chunk_size=7, batch_size=5,
+                                                        rejects=rejects)
+        self.assertEqual((loaded, rejected), (40, 1))
+        self.assertIn("99,Bad,Row", rejects.getvalue())
+
+        # the old rows were replaced, not appended to
+        self.assertEqual(Result.objects.count(), 40)
+        self.assertEqual(set(Result.objects.values_list('city', flat=True)), {'Boston'})
+        self.assertNotIn(loader.STAGING_TABLE, self.table_names())
+        self.assertNotIn(loader.OLD_TABLE, self.table_names())
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Result._meta.db_table)
+        for index in Result._meta.indexes:
+            self.assertIn(index.name, constraints)
+            self.assertEqual(constraints[index.name]['columns'], index.fields)
+
+    def test_failed_load_keeps_the_live_table(self):
+        with self.assertRaises(FileNotFoundError):
+            loader.load_results(self.path, workers=1)
+        self.assertEqual(Result.objects.count(), 3)
+        self.assertNotIn(loader.STAGING_TABLE, self.table_names())
@@ -2,16 +2,20 @@ from django.shortcuts import render
 from django.db.models.query import QuerySet
 from django.shortcuts import render
 from django.views.generic import ListView
+from cs412.caching import CachedViewMixin
+from cs412.pagination import KeysetPaginationMixin
 from . models import Result
 
 # Create your views here.
-class ResultsListView(ListView):
+class ResultsListView(CachedViewMixin, KeysetPaginationMixin, ListView):
     '''View to display marathon results'''
  
     template_name = 'marathon_analytics/results.html'
     model = Result
     context_object_name = 'results'
     paginate_by = 25 #how many records per page
+    keyset_ordering = ('place_overall', 'id') # pages by cursor, see cs412/pagination.py
+    cache_models = [Result] # cached until the results are reloaded, see cs412/caching.py
  
     def get_queryset(self):
         
@@ -8,7 +8,7 @@ from django.contrib import admin
 #from .models import Article from example, commented it out
 #admin.site.register(Article)
 
-from .models import Profile, Post, Photo, Follow, Comment, Like #registering the comment 
+from .models import Profile, Post, Photo, Follow, Comment, Like, FeedItem #registering the comment 
 admin.site.register(Profile)
 # admin.site.register(Comment)
 admin.site.register(Post)
@@ -16,4 +16,5 @@ admin.site.register(Photo)
 admin.site.register(Follow)
 admin.site.register(Comment)
 admin.site.register(Like)
+admin.site.register(FeedItem)
 
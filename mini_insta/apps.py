@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MiniInstaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mini_insta'
+
+    def ready(self):
+        import mini_insta.signals
+        from cs412 import caching
+        # the cached profiles page follows this version
+        caching.watch_models([self.get_model('Profile')])
@@ -0,0 +1,196 @@
+# File: feed.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: materialized (fan-out-on-write) post feed for mini insta.
+#
+#   Notes:
+#   - When a Profile posts, the Post is copied into the FeedItem inbox of every
+#     follower, so reading a feed is one indexed range scan instead of a join
+#     over every Follow row.
+#   - "Celebrity" Profiles (at least MINI_INSTA_CELEBRITY_THRESHOLD followers)
+#     are not fanned out. Their posts are pulled at read time and merged in.
+#   - The follow/unfollow views call follower_count_changed(), so a Profile that
+#     crosses the threshold has its posts pruned from (going up) or copied into
+#     (going down) its followers' inboxes. Anything that changes num_followers
+#     behind the views' back (reconcile_counters, a new threshold setting) must
+#     be followed by `manage.py rebuild_feeds`.
+#   - Feeds are paginated with a keyset cursor on (timestamp, post id).
+
+import base64
+import heapq
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import Profile, Post, Follow, FeedItem
+
+# default number of posts on one feed page
+FEED_PAGE_SIZE = 50
+
+# how many recent posts are copied into an inbox when a Profile is followed
+FEED_BACKFILL_LIMIT = 200
+
+# rows per INSERT when fanning a post out to followers
+FEED_BATCH_SIZE = 1000
+
+
+def get_celebrity_threshold():
+    '''Return the follower count at which a Profile stops being fanned out.'''
+    return getattr(settings, 'MINI_INSTA_CELEBRITY_THRESHOLD', 10000)
+
+
+def is_celebrity(profile):
+    '''Return True if posts by this Profile are pulled at read time.'''
+    return profile.get_num_followers() >= get_celebrity_threshold()
+
+
+def get_followed_celebrity_ids(profile):
+    '''Return the ids of celebrity Profiles followed by this Profile.'''
+    return list(
+        Follow.objects.filter(follower_profile=profile, profile__num_followers__gte=get_celebrity_threshold())
+        .values_list('profile_id', flat=True)
+    )
+
+
+def fan_out_posts(profile, posts):
+    '''Copy (post id, timestamp) pairs by a Profile into the inbox of each of its followers.'''
+    follower_ids = (
+        Follow.objects.filter(profile=profile)
+        .values_list('follower_profile_id', flat=True)
+        .iterator(chunk_size=FEED_BATCH_SIZE)
+    )
+    created = 0
+    batch = []
+    for follower_id in follower_ids:
+        for post_id, timestamp in posts:
+            batch.append(FeedItem(owner_id=follower_id, post_id=post_id, author_id=profile.pk, timestamp=timestamp))
+        if len(batch) >= FEED_BATCH_SIZE:
+            FeedItem.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+            batch = []
+    if batch:
+        FeedItem.objects.bulk_create(batch, ignore_conflicts=True)
+        created += len(batch)
+    return created
+
+
+def fan_out_post(post):
+    '''Copy a new Post into the inbox of every follower of its author.'''
+    if is_celebrity(post.profile):
+        return 0
+    return fan_out_posts(post.profile, [(post.pk, post.timestamp)])
+
+
+def refresh_post(post):
+    '''Keep the copied sort key in step after a Post is edited.'''
+    FeedItem.objects.filter(post=post).update(timestamp=post.timestamp)
+
+
+def get_recent_posts(profile, limit=FEED_BACKFILL_LIMIT):
+    '''Return (post id, timestamp) for the most recent posts of a Profile.'''
+    return list(
+        Post.objects.filter(profile=profile)
+        .order_by('-timestamp', '-id')
+        .values_list('id', 'timestamp')[:limit]
+    )
+
+
+def backfill_feed(follower, profile, limit=FEED_BACKFILL_LIMIT):
+    '''Copy the most recent posts of a newly followed Profile into an inbox.'''
+    if is_celebrity(profile):
+        return 0
+
+    posts = get_recent_posts(profile, limit)
+    items = [
+        FeedItem(owner=follower, post_id=post_id, author=profile, timestamp=timestamp)
+        for post_id, timestamp in posts
+    ]
+    FeedItem.objects.bulk_create(items, ignore_conflicts=True)
+    return len(items)
+
+
+def prune_feed(follower, profile):
+    '''Remove the posts of an unfollowed Profile from an inbox.'''
+    deleted, _ = FeedItem.objects.filter(owner=follower, author=profile).delete()
+    return deleted
+
+
+def follower_count_changed(profile, change, limit=FEED_BACKFILL_LIMIT):
+    '''
+    Move a Profile between push and pull after its follower count changed by `change`.
+    Going over the threshold prunes its posts from every inbox, since they are now
+    pulled at read time; dropping under it copies its recent posts into the inbox
+    of every remaining follower, since nothing pulls them any more.
+    '''
+    followers = Profile.objects.filter(pk=profile.pk).values_list('num_followers', flat=True).get()
+    profile.num_followers = followers
+    before = followers - change
+    threshold = get_celebrity_threshold()
+
+    if before < threshold <= followers:
+        deleted, _ = FeedItem.objects.filter(author=profile).delete()
+        return -deleted
+    if followers < threshold <= before:
+        return fan_out_posts(profile, get_recent_posts(profile, limit))
+    return 0
+
+
+def rebuild_feed(follower, limit=FEED_BACKFILL_LIMIT):
+    '''Rebuild one inbox from scratch from the Profiles it follows.'''
+    FeedItem.objects.filter(owner=follower).delete()
+    for follow in Follow.objects.filter(follower_profile=follower).select_related('profile'):
+        backfill_feed(follower, follow.profile, limit=limit)
+
+
+def encode_cursor(timestamp, pk):
+    '''Return an opaque cursor pointing just after (timestamp, pk).'''
+    raw = f'{timestamp.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    '''Return (timestamp, pk) from a cursor, or None if it is missing or invalid.'''
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, pk = raw.split('|')
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def get_feed_page(profile, cursor=None, limit=FEED_PAGE_SIZE):
+    '''
+    Return (post ids, next cursor) for one page of a Profile's feed, newest first.
+    Fanned-out inbox rows are merged with posts pulled from followed celebrities.
+    '''
+    position = decode_cursor(cursor)
+
+    inbox = FeedItem.objects.filter(owner=profile)
+    pulled = Post.objects.filter(profile_id__in=get_followed_celebrity_ids(profile))
+    if position:
+        timestamp, pk = position
+        inbox = inbox.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, post_id__lt=pk))
+        pulled = pulled.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+
+    inbox = inbox.order_by('-timestamp', '-post_id').values_list('timestamp', 'post_id')[:limit + 1]
+    pulled = pulled.order_by('-timestamp', '-id').values_list('timestamp', 'id')[:limit + 1]
+
+    # both sources are already sorted newest first, so a heap merge is enough
+    entries = []
+    seen = set()
+    for timestamp, post_id in heapq.merge(inbox, pulled, reverse=True):
+        if post_id in seen:
+            continue
+        seen.add(post_id)
+        entries.append((timestamp, post_id))
+        if len(entries) > limit:
+            break
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(*entries[-1])
+
+    return [post_id for _, post_id in entries], next_cursor
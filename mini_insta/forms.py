@@ -27,6 +27,13 @@ class UpdatePostForm(forms.ModelForm):
         model = Post
         fields = ['caption']
 
+class CreateCommentForm(forms.ModelForm):
+    '''A form to add a comment to a Post'''
+
+    class Meta:
+        model = Comment
+        fields = ['text']
+
 class CreateProfileForm(forms.ModelForm):
     '''A form to create a new Profile'''
 
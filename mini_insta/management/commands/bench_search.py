@@ -0,0 +1,101 @@
+# File: bench_search.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: benchmark comparing the FTS5 search path with the old icontains
+#   scans. Runs against a throwaway test database seeded with synthetic captions,
+#   so the real db.sqlite3 is never touched.
+#
+#   python manage.py bench_search --rows 1000000
+
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from mini_insta import search
+from mini_insta.models import Profile, Post
+
+WORDS = (
+    "sunset beach coffee brunch campus library snow boston charles river "
+    "marathon concert pizza puppy kitten birthday graduation study finals "
+    "fenway kenmore allston travel hiking mountain city lights friends family "
+    "weekend throwback selfie sunrise garden museum art music dance rain"
+).split()
+
+# (label, query) pairs; the first word is common, the others get rarer
+QUERIES = [
+    ("common word", "coffee"),
+    ("two words", "boston marathon"),
+    ("prefix", "grad"),
+    ("no match", "zzzyx"),
+]
+
+
+class Command(BaseCommand):
+    help = "Compare SearchView latency of FTS5 vs icontains on synthetic captions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=20)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(options['rows'])
+            self.run(options['repeat'], options['page_size'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, rows):
+        '''Insert synthetic Posts in bulk (no signals), then build the index once.'''
+        rng = random.Random(412)
+        start = time.perf_counter()
+        user = User.objects.create(username='bench')
+        profiles = Profile.objects.bulk_create(
+            [Profile(user=user, username=f'user{i}', display_name=f'User {i}') for i in range(100)]
+        )
+        batch = []
+        with transaction.atomic():
+            for i in range(rows):
+                caption = ' '.join(rng.choices(WORDS, k=rng.randint(3, 12)))
+                batch.append(Post(profile=rng.choice(profiles), caption=caption))
+                if len(batch) == 10000:
+                    Post.objects.bulk_create(batch)
+                    batch = []
+            Post.objects.bulk_create(batch)
+        seeded = time.perf_counter()
+        search.rebuild_index()
+        indexed = time.perf_counter()
+        self.stdout.write(f"seeded {rows} posts in {seeded - start:.1f}s, indexed in {indexed - seeded:.1f}s")
+
+    def time_call(self, repeat, fn):
+        '''Return the median wall time of fn() in milliseconds.'''
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def run(self, repeat, page_size):
+        '''Time one page of results (count + first page) for each query on both paths.'''
+        self.stdout.write(f"{'query':<14}{'icontains ms':>14}{'fts5 ms':>10}{'matches':>10}")
+        for label, query in QUERIES:
+            def icontains():
+                qs = Post.objects.filter(caption__icontains=query).order_by('-timestamp')
+                qs.count()
+                list(qs[:page_size])
+
+            def fts():
+                results = search.search_posts(query)
+                results.count()
+                results[:page_size]
+
+            old = self.time_call(repeat, icontains)
+            new = self.time_call(repeat, fts)
+            matches = search.search_posts(query).count()
+            self.stdout.write(f"{label:<14}{old:>14.1f}{new:>10.1f}{matches:>10}")
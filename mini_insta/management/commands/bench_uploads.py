@@ -0,0 +1,102 @@
+# File: bench_uploads.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: benchmark of multi-file photo uploads to one post. Compares
+#   Django's default upload handlers + one Photo.objects.create per file (the
+#   old CreatePostView) with the streaming, content-addressed handler +
+#   bulk_create from cs412/uploads.py, then uploads the same files again to
+#   show the deduplication. Uses a throwaway test database and a temporary
+#   MEDIA_ROOT, so neither the real db.sqlite3 nor media/ is touched.
+#
+#   python manage.py bench_uploads --files 20 --size-mb 10
+
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import CaptureQueriesContext
+
+from cs412.uploads import ContentAddressedUploadHandler
+from mini_insta.models import Photo, Post, Profile
+
+
+def legacy_upload(request, post):
+    '''What CreatePostView did before: default handlers, one INSERT (and storage copy) per file.'''
+    for file in request.FILES.getlist('image_files'):
+        Photo.objects.create(post=post, image_file=file)
+
+
+def streaming_upload(request, post):
+    '''What CreatePostView does now, see StreamingUploadMixin.'''
+    upload_to = Photo._meta.get_field('image_file').upload_to
+    request.upload_handlers.insert(0, ContentAddressedUploadHandler(request, upload_to=upload_to))
+    Photo.objects.bulk_create([
+        Photo(post=post, image_file=file.store()) for file in request.FILES.getlist('image_files')
+    ])
+
+
+def directory_size(path):
+    '''Total bytes of the files under path.'''
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, dirs, files in os.walk(path) for name in files
+    )
+
+
+class Command(BaseCommand):
+    help = "Time uploading many large images to one post, default handlers vs streaming handler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=20)
+        parser.add_argument('--size-mb', type=int, default=10)
+        parser.add_argument('--temp-dir', default=None,
+                            help="FILE_UPLOAD_TEMP_DIR for the default handlers, e.g. a tmpfs /tmp on another filesystem")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        # next to the real MEDIA_ROOT, so the disk layout matches the deployed site
+        media_root = tempfile.mkdtemp(prefix='bench_uploads_', dir=settings.BASE_DIR)
+        try:
+            with override_settings(MEDIA_ROOT=media_root, FILE_UPLOAD_TEMP_DIR=options['temp_dir']):
+                self.run(options['files'], options['size_mb'] * 1024 * 1024, media_root)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, files, size, media_root):
+        user = User.objects.create(username='bench')
+        profile = Profile.objects.create(user=user, username='bench')
+
+        # random bytes do not compress and the handlers never decode the image,
+        # so they stand in for camera JPEGs
+        uploads = [SimpleUploadedFile(f'IMG_{i:04d}.jpg', os.urandom(size), content_type='image/jpeg') for i in range(files)]
+        body = encode_multipart(BOUNDARY, {'caption': 'bench', 'image_files': uploads})
+        self.stdout.write(f"request body: {len(body) / 2**20:.0f} MB, {files} files")
+
+        factory = RequestFactory()
+        self.stdout.write(f"{'handler':<26}{'seconds':>9}{'queries':>9}{'new MB on disk':>16}")
+        for label, upload in [
+            ('default + create()', legacy_upload),
+            ('streaming + bulk_create', streaming_upload),
+            ('streaming, same files', streaming_upload),
+        ]:
+            post = Post.objects.create(profile=profile, caption=label)
+            request = factory.generic('POST', '/mini_insta/profile/create_post', body, content_type=MULTIPART_CONTENT)
+            request.user = user
+            before = directory_size(media_root)
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                upload(request, post)
+            elapsed = time.perf_counter() - start
+            request.close()
+            written = (directory_size(media_root) - before) / 2**20
+            self.stdout.write(f"{label:<26}{elapsed:>9.2f}{len(queries):>9}{written:>16.0f}")
+            assert post.photo_set.count() == files
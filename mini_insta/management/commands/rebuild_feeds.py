@@ -0,0 +1,30 @@
+# File: rebuild_feeds.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: management command to (re)build the materialized mini insta feeds,
+#   e.g. after first migrating or after changing MINI_INSTA_CELEBRITY_THRESHOLD.
+
+from django.core.management.base import BaseCommand
+
+from mini_insta import feed
+from mini_insta.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FeedItem inbox of every Profile (or of the given profile ids)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_ids', nargs='*', type=int)
+        parser.add_argument('--limit', type=int, default=feed.FEED_BACKFILL_LIMIT,
+                            help="most recent posts to copy from each followed profile")
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.all()
+        if options['profile_ids']:
+            profiles = profiles.filter(pk__in=options['profile_ids'])
+
+        count = 0
+        for profile in profiles.iterator():
+            feed.rebuild_feed(profile, limit=options['limit'])
+            count += 1
+
+        self.stdout.write(f"Rebuilt {count} feeds")
@@ -0,0 +1,20 @@
+# File: rebuild_search_index.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: management command to repopulate the mini insta full-text search
+#   index, e.g. after bulk imports that bypass the save/delete signals.
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mini_insta import search
+from mini_insta.models import Profile, Post
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 search index for mini_insta Posts and Profiles."
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("The full-text index needs the SQLite database backend.")
+
+        search.rebuild_index()
+        self.stdout.write(f"Indexed {Post.objects.count()} posts and {Profile.objects.count()} profiles")
@@ -0,0 +1,71 @@
+# File: reconcile_counters.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: management command that recomputes the denormalized like, comment,
+#   follower and following counters from the real tables and repairs any drift.
+#   Work is done in short primary-key batches so no statement holds the write
+#   lock for long and the site stays usable while it runs.
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from mini_insta.models import Profile, Post, Follow, Comment, Like
+
+
+def count_of(model, field):
+    '''Return a correlated subquery counting the rows of model whose field points at the outer row.'''
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .values(field).annotate(n=Count('id')).values('n')
+        ),
+        0,
+    )
+
+
+# model -> {counter column: (related model, foreign key field)}
+COUNTERS = {
+    Post: {
+        'num_likes': (Like, 'post'),
+        'num_comments': (Comment, 'post'),
+    },
+    Profile: {
+        'num_followers': (Follow, 'profile'),
+        'num_following': (Follow, 'follower_profile'),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = "Recompute the mini_insta counter columns and fix the rows that have drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help="only report how many rows have drifted")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for model, counters in COUNTERS.items():
+            last_pk = model.objects.aggregate(last=Max('pk'))['last'] or 0
+            for column, (related, field) in counters.items():
+                fixed = 0
+                for start in range(0, last_pk + 1, batch_size):
+                    drifted = (
+                        model.objects.filter(pk__gte=start, pk__lt=start + batch_size)
+                        .annotate(real=count_of(related, field))
+                        .exclude(**{column: F('real')})
+                        .values_list('pk', flat=True)
+                    )
+                    if options['dry_run']:
+                        fixed += drifted.count()
+                        continue
+                    with transaction.atomic():
+                        fixed += model.objects.filter(pk__in=list(drifted)).update(
+                            **{column: count_of(related, field)}
+                        )
+
+                verb = "drifted" if options['dry_run'] else "fixed"
+                self.stdout.write(f"{model.__name__}.{column}: {fixed} rows {verb}")
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_feeds(apps, schema_editor):
+    '''Fill the new inboxes from the existing Follow rows.'''
+    Follow = apps.get_model('mini_insta', 'Follow')
+    Post = apps.get_model('mini_insta', 'Post')
+    FeedItem = apps.get_model('mini_insta', 'FeedItem')
+
+    for follow in Follow.objects.all().iterator():
+        posts = (
+            Post.objects.filter(profile_id=follow.profile_id)
+            .order_by('-timestamp', '-id')
+            .values_list('id', 'timestamp')[:200]
+        )
+        FeedItem.objects.bulk_create(
+            [FeedItem(owner_id=follow.follower_profile_id, post_id=post_id,
+                      author_id=follow.profile_id, timestamp=timestamp)
+             for post_id, timestamp in posts],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0015_profile_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='mini_insta.profile')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to='mini_insta.profile')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='mini_insta.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', '-timestamp', '-post'], name='feed_item_owner_ts_idx'), models.Index(fields=['owner', 'author'], name='feed_item_owner_author_idx')],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'post'), name='unique_feed_item')],
+            },
+        ),
+        migrations.RunPython(backfill_feeds, migrations.RunPython.noop),
+    ]
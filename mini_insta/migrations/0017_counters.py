@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    '''Populate the new counter columns from the existing rows.'''
+    Profile = apps.get_model('mini_insta', 'Profile')
+    Post = apps.get_model('mini_insta', 'Post')
+    Follow = apps.get_model('mini_insta', 'Follow')
+    Comment = apps.get_model('mini_insta', 'Comment')
+    Like = apps.get_model('mini_insta', 'Like')
+
+    def count_of(model, field):
+        return Coalesce(Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .values(field).annotate(n=Count('id')).values('n')
+        ), 0)
+
+    Post.objects.update(num_likes=count_of(Like, 'post'), num_comments=count_of(Comment, 'post'))
+    Profile.objects.update(num_followers=count_of(Follow, 'profile'),
+                           num_following=count_of(Follow, 'follower_profile'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0016_feeditem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='num_comments',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='num_likes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='num_followers',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='num_following',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:40
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    '''Create and fill the FTS5 tables used by mini_insta/search.py (SQLite only).'''
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS mini_insta_post_fts "
+        "USING fts5(caption, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS mini_insta_profile_fts "
+        "USING fts5(username, display_name, bio_text, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO mini_insta_post_fts(rowid, caption) SELECT id, caption FROM mini_insta_post"
+    )
+    schema_editor.execute(
+        "INSERT INTO mini_insta_profile_fts(rowid, username, display_name, bio_text) "
+        "SELECT id, username, display_name, bio_text FROM mini_insta_profile"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS mini_insta_post_fts")
+    schema_editor.execute("DROP TABLE IF EXISTS mini_insta_profile_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mini_insta', '0017_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
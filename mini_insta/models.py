@@ -4,8 +4,10 @@
 # Description: this file is my models for mini insta, assigment 4
 
 from django.db import models
+from django.db.models import Prefetch
 from django.urls import reverse
 from django.contrib.auth.models import User     # for authentication 
+from cs412.images import ImageRenditionsMixin
 
 # Create your models here.
     
@@ -22,6 +24,11 @@ class Profile(models.Model):
     profile_image_url = models.URLField(blank = True) #url as a string
     user = models.ForeignKey(User, on_delete=models.CASCADE) #Gave a value of 1 for profiles not associated with a user
 
+    # denormalized counters, kept current with F() updates in the views
+    # (manage.py reconcile_counters repairs any drift)
+    num_followers = models.IntegerField(default=0)
+    num_following = models.IntegerField(default=0)
+
     def __str__(self): 
         '''return a string representation of the model instance.'''
         return f'{self.username} joined {self.join_date}'
@@ -46,8 +53,7 @@ class Profile(models.Model):
 
     def get_num_followers(self):
         '''return the count of followers.'''
-        from .models import Follow
-        return Follow.objects.filter(profile=self).count()
+        return self.num_followers
 
     def get_following(self):
         '''return a list of Profiles this Profile follows.'''
@@ -58,8 +64,7 @@ class Profile(models.Model):
 
     def get_num_following(self):
         '''return the count of Profiles this Profile follows.'''
-        from .models import Follow
-        return Follow.objects.filter(follower_profile=self).count()
+        return self.num_following
     
     def get_post_feed(self):
         '''  return a list/QuerySet of Posts, specifically for the profiles being followed'''
@@ -77,6 +82,26 @@ class Profile(models.Model):
             return False
         return Follow.objects.filter(profile=self, follower_profile=follower_profile).exists()
 
+
+class PostQuerySet(models.QuerySet):
+    '''QuerySet helpers for rendering lists of Posts without one query per Post'''
+
+    def for_feed(self):
+        '''
+        Return Posts ready for the feed cards: the Profile joined in and only the
+        newest photo of each Post prefetched, into post.feed_photos (a list of 0
+        or 1), since a card shows just that one. Like/comment counts are the
+        num_likes and num_comments counter columns.
+        '''
+        return (
+            self.select_related('profile')
+            .prefetch_related(Prefetch(
+                'photo_set',
+                queryset=Photo.objects.order_by('-timestamp')[:1],
+                to_attr='feed_photos',
+            ))
+        )
+
     
 class Post(models.Model): 
     '''Encapsulate the idea of a comment in an Article'''
@@ -86,6 +111,12 @@ class Post(models.Model):
     caption = models.TextField(blank=False)
     timestamp = models.DateTimeField(auto_now=True) #tells when comment was written 
 
+    # denormalized counters, kept current with F() updates in the views
+    num_likes = models.IntegerField(default=0)
+    num_comments = models.IntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         '''Return a string representation of this comment'''
         return f'{self.caption}'
@@ -109,8 +140,7 @@ class Post(models.Model):
     
     def get_num_likes(self):
         '''return the number of likes for this Post.'''
-        from .models import Like
-        return Like.objects.filter(post=self).count()
+        return self.num_likes
     
     def is_liked_by(self, user):
         '''if post is liked by a certain user'''
@@ -120,7 +150,7 @@ class Post(models.Model):
         return Like.objects.filter(post=self, profile=liker_profile).exists()
     
 
-class Photo(models.Model): 
+class Photo(ImageRenditionsMixin): 
     '''Encapsulate the idea of a comment in an Article'''
 
     # data atributes for the Photo:
@@ -174,6 +204,28 @@ class Like(models.Model):
         return f'{self.profile.username}'
 
 
+class FeedItem(models.Model):
+    '''One Post delivered into the materialized feed (inbox) of a follower Profile.'''
+
+    owner = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="feed_items")
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    author = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name="+") # copy of post.profile, so unfollow can prune without a join
+    timestamp = models.DateTimeField() # copy of post.timestamp, used as the feed sort key
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'post'], name='unique_feed_item'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-timestamp', '-post'], name='feed_item_owner_ts_idx'),
+            models.Index(fields=['owner', 'author'], name='feed_item_owner_author_idx'),
+        ]
+
+    def __str__(self):
+        '''Return a string representation of this feed item'''
+        return f'{self.post} in the feed of {self.owner.username}'
+
+
 
 
 
@@ -0,0 +1,165 @@
+# File: search.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: full-text search for mini insta, backed by SQLite FTS5.
+#
+#   Notes:
+#   - mini_insta_post_fts and mini_insta_profile_fts are FTS5 virtual tables
+#     whose rowid is the Post / Profile primary key (created in migration 0018).
+#   - signals.py keeps them in sync on save/delete; rebuild_index() (and
+#     manage.py rebuild_search_index) repopulates them from scratch.
+#   - Every word in a query is prefix matched, results are ranked by bm25.
+#   - On a database without FTS5 we fall back to the old icontains scans.
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Profile, Post
+
+POST_TABLE = 'mini_insta_post_fts'
+PROFILE_TABLE = 'mini_insta_profile_fts'
+
+# bm25 column weights for (username, display_name, bio_text)
+PROFILE_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def is_available():
+    '''Return True if the FTS5 index can be used on this database.'''
+    return connection.vendor == 'sqlite'
+
+
+def build_match(query):
+    '''
+    Turn free text into an FTS5 MATCH expression: every word is quoted (so
+    FTS5 operators typed by users are taken literally) and prefix matched.
+    Returns '' if the query has no searchable words.
+    '''
+    words = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def index_post(post):
+    '''Add or replace one Post in the index.'''
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {POST_TABLE} WHERE rowid = %s", [post.pk])
+        cursor.execute(f"INSERT INTO {POST_TABLE}(rowid, caption) VALUES (%s, %s)", [post.pk, post.caption])
+
+
+def unindex_post(pk):
+    '''Remove one Post from the index.'''
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {POST_TABLE} WHERE rowid = %s", [pk])
+
+
+def index_profile(profile):
+    '''Add or replace one Profile in the index.'''
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {PROFILE_TABLE} WHERE rowid = %s", [profile.pk])
+        cursor.execute(
+            f"INSERT INTO {PROFILE_TABLE}(rowid, username, display_name, bio_text) VALUES (%s, %s, %s, %s)",
+            [profile.pk, profile.username, profile.display_name, profile.bio_text],
+        )
+
+
+def unindex_profile(pk):
+    '''Remove one Profile from the index.'''
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {PROFILE_TABLE} WHERE rowid = %s", [pk])
+
+
+def rebuild_index():
+    '''Repopulate both FTS tables from the Post and Profile tables.'''
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {POST_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {POST_TABLE}(rowid, caption) "
+            f"SELECT id, caption FROM {Post._meta.db_table}"
+        )
+        cursor.execute(f"DELETE FROM {PROFILE_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {PROFILE_TABLE}(rowid, username, display_name, bio_text) "
+            f"SELECT id, username, display_name, bio_text FROM {Profile._meta.db_table}"
+        )
+        cursor.execute(f"INSERT INTO {POST_TABLE}({POST_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"INSERT INTO {PROFILE_TABLE}({PROFILE_TABLE}) VALUES ('optimize')")
+
+
+class SearchResults:
+    '''
+    Lazy, ranked result list for one FTS5 query. It only implements count()
+    and slicing, which is all Django's Paginator needs, so each page runs one
+    LIMIT/OFFSET query against the index plus one lookup by primary key.
+    '''
+
+    def __init__(self, model, table, match, rank='rank', queryset=None):
+        self.model = model
+        self.table = table
+        self.match = match
+        self.rank = rank
+        self.queryset = queryset if queryset is not None else model.objects.all()
+        self._count = None
+
+    def count(self):
+        '''Return the number of matching rows.'''
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT count(*) FROM {self.table} WHERE {self.table} MATCH %s", [self.match])
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def ids(self, offset=0, limit=None):
+        '''Return matching primary keys, best match first.'''
+        if not self.match:
+            return []
+        sql = f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s ORDER BY {self.rank}, rowid DESC"
+        params = [self.match]
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params += [limit, offset]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start = index.start or 0
+            limit = None if index.stop is None else max(index.stop - start, 0)
+            ids = self.ids(start, limit)
+            objects = self.queryset.in_bulk(ids)
+            return [objects[pk] for pk in ids if pk in objects]
+        return self[index:index + 1][0]
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+def search_posts(query):
+    '''Return the Posts whose caption matches query, best match first.'''
+    if not is_available():
+        return Post.objects.for_feed().filter(caption__icontains=query).order_by('-timestamp')
+    return SearchResults(Post, POST_TABLE, build_match(query), queryset=Post.objects.for_feed())
+
+
+def search_profiles(query):
+    '''Return the Profiles whose username, display name or bio matches query, best match first.'''
+    if not is_available():
+        return Profile.objects.filter(
+            Q(username__icontains=query) | Q(display_name__icontains=query) | Q(bio_text__icontains=query)
+        ).order_by('username')
+    weights = ', '.join(str(weight) for weight in PROFILE_WEIGHTS)
+    return SearchResults(Profile, PROFILE_TABLE, build_match(query), rank=f'bm25({PROFILE_TABLE}, {weights})')
@@ -0,0 +1,35 @@
+# File: signals.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description:
+#   Keeps the full-text search index (search.py) in sync whenever a Post or
+#   Profile is saved or deleted.
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import search
+from .models import Profile, Post
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    '''Add or refresh a Post in the search index.'''
+    search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    '''Drop a deleted Post from the search index.'''
+    search.unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def index_profile(sender, instance, **kwargs):
+    '''Add or refresh a Profile in the search index.'''
+    search.index_profile(instance)
+
+
+@receiver(post_delete, sender=Profile)
+def unindex_profile(sender, instance, **kwargs):
+    '''Drop a deleted Profile from the search index.'''
+    search.unindex_profile(instance.pk)
@@ -1,3 +1,474 @@
-from django.test import TestCase
+# File: tests.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: tests for mini insta
 
-# Create your tests here.
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from PIL import Image
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.db.models.signals import pre_save
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from cs412 import images, profiling
+
+from . import feed, search
+from .models import Profile, Post, Photo, Follow, Comment, Like, FeedItem
+
+
+class PostFeedQueryCountTest(TestCase):
+    '''The feed page must take the same number of queries however many posts it shows.'''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='secret')
+        self.reader = Profile.objects.create(user=self.user, username='reader')
+        self.author = Profile.objects.create(user=User.objects.create_user(username='author'), username='author')
+        self.fan = Profile.objects.create(user=User.objects.create_user(username='fan'), username='fan')
+        Follow.objects.create(profile=self.author, follower_profile=self.reader)
+        Follow.objects.create(profile=self.author, follower_profile=self.fan)
+        self.client.force_login(self.user)
+
+    def create_posts(self, n):
+        '''Create n posts by the author, each with photos, likes and comments.'''
+        for i in range(n):
+            post = Post.objects.create(profile=self.author, caption=f'post {i}')
+            Photo.objects.create(post=post, image_url=f'https://example.com/{i}-a.jpg')
+            Photo.objects.create(post=post, image_url=f'https://example.com/{i}-b.jpg')
+            self.client.post(reverse('like_post', kwargs={'pk': post.pk}))
+            self.client.post(reverse('create_comment', kwargs={'pk': post.pk}), {'text': 'nice'})
+            self.client.post(reverse('create_comment', kwargs={'pk': post.pk}), {'text': 'wow'})
+            feed.fan_out_post(post)
+
+    def count_feed_queries(self):
+        '''Render the feed once and return the number of queries it ran.'''
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('show_feed'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_feed_query_count_is_constant(self):
+        self.create_posts(1)
+        small, _ = self.count_feed_queries()
+
+        self.create_posts(feed.FEED_PAGE_SIZE)
+        large, response = self.count_feed_queries()
+
+        self.assertEqual(len(response.context['posts']), feed.FEED_PAGE_SIZE)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 10)
+
+    def test_feed_cards_use_counter_columns(self):
+        self.create_posts(1)
+        _, response = self.count_feed_queries()
+
+        post = response.context['posts'][0]
+        self.assertEqual(post.num_likes, 1)
+        self.assertEqual(post.num_comments, 2)
+        # only the photo the card shows is loaded
+        self.assertEqual(len(post.feed_photos), 1)
+        self.assertContains(response, '<strong>2</strong> comments', html=False)
+
+
+class CounterTest(TestCase):
+    '''The denormalized counters follow likes, comments and follows.'''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='me')
+        self.me = Profile.objects.create(user=self.user, username='me')
+        self.other = Profile.objects.create(user=User.objects.create_user(username='other'), username='other')
+        self.post = Post.objects.create(profile=self.other, caption='hello')
+        self.client.force_login(self.user)
+
+    def test_like_and_unlike(self):
+        self.client.post(reverse('like_post', kwargs={'pk': self.post.pk}))
+        self.client.post(reverse('like_post', kwargs={'pk': self.post.pk}))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.get_num_likes(), 1)
+
+        self.client.post(reverse('unlike_post', kwargs={'pk': self.post.pk}))
+        self.client.post(reverse('unlike_post', kwargs={'pk': self.post.pk}))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.get_num_likes(), 0)
+
+    def test_follow_and_unfollow(self):
+        self.client.post(reverse('follow_profile', kwargs={'pk': self.other.pk}))
+        self.client.post(reverse('follow_profile', kwargs={'pk': self.other.pk}))
+        self.other.refresh_from_db()
+        self.me.refresh_from_db()
+        self.assertEqual(self.other.get_num_followers(), 1)
+        self.assertEqual(self.me.get_num_following(), 1)
+
+        self.client.post(reverse('unfollow_profile', kwargs={'pk': self.other.pk}))
+        self.other.refresh_from_db()
+        self.me.refresh_from_db()
+        self.assertEqual(self.other.get_num_followers(), 0)
+        self.assertEqual(self.me.get_num_following(), 0)
+
+    def test_edits_keep_counter_updates_made_meanwhile(self):
+        post = Post.objects.create(profile=self.me, caption='before')
+
+        def concurrent_follow_and_like(sender, instance, **kwargs):
+            '''Another request commits between the edit loading its row and saving it.'''
+            Profile.objects.filter(pk=self.me.pk).update(num_followers=F('num_followers') + 1)
+            Post.objects.filter(pk=post.pk).update(num_likes=F('num_likes') + 1)
+        pre_save.connect(concurrent_follow_and_like, sender=Profile)
+        pre_save.connect(concurrent_follow_and_like, sender=Post)
+        self.addCleanup(pre_save.disconnect, concurrent_follow_and_like, sender=Profile)
+        self.addCleanup(pre_save.disconnect, concurrent_follow_and_like, sender=Post)
+
+        # reverse('update_profile') is the project app's view of the same name
+        self.client.post('/mini_insta/profile/update/', {'display_name': 'Me', 'bio_text': 'hi', 'profile_image_url': ''})
+        self.client.post(reverse('update_post', kwargs={'pk': post.pk}), {'caption': 'after'})
+
+        self.me.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual((self.me.display_name, self.me.num_followers), ('Me', 2))
+        self.assertEqual((post.caption, post.num_likes), ('after', 2))
+
+    def test_reconcile_counters_repairs_drift(self):
+        Like.objects.create(post=self.post, profile=self.me)
+        Comment.objects.create(post=self.post, profile=self.me, text='hi')
+        Follow.objects.create(profile=self.other, follower_profile=self.me)
+
+        call_command('reconcile_counters', batch_size=1, stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.me.refresh_from_db()
+        self.assertEqual((self.post.num_likes, self.post.num_comments), (1, 1))
+        self.assertEqual((self.other.num_followers, self.me.num_following), (1, 1))
+
+
+@override_settings(MINI_INSTA_CELEBRITY_THRESHOLD=3)
+class FeedTest(TestCase):
+    '''Posts are pushed into followers' inboxes, or pulled from celebrities, and read back in pages.'''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader')
+        self.reader = Profile.objects.create(user=self.user, username='reader')
+        self.author = self.make_profile('author')
+        self.star = self.make_profile('star')
+        self.start = timezone.now() - timedelta(days=30)
+        self.client.force_login(self.user)
+
+    def make_profile(self, username):
+        return Profile.objects.create(user=User.objects.create_user(username=username), username=username)
+
+    def follow(self, profile, follower):
+        '''Follow the way the view does, counter and all.'''
+        Follow.objects.create(profile=profile, follower_profile=follower)
+        Profile.objects.filter(pk=profile.pk).update(num_followers=F('num_followers') + 1)
+        profile.refresh_from_db()
+
+    def post(self, profile, day):
+        '''A Post by profile dated `day` days after the start, fanned out like a new one.'''
+        post = Post.objects.create(profile=profile, caption=f'{profile.username} {day}')
+        Post.objects.filter(pk=post.pk).update(timestamp=self.start + timedelta(days=day))
+        post.refresh_from_db()
+        feed.fan_out_post(post)
+        return post
+
+    def inbox(self, profile):
+        return set(FeedItem.objects.filter(owner=profile).values_list('post_id', flat=True))
+
+    def make_star(self):
+        '''Give the star enough followers to be pulled instead of pushed.'''
+        self.follow(self.star, self.reader)
+        for name in ('fan1', 'fan2'):
+            self.follow(self.star, self.make_profile(name))
+        self.assertTrue(feed.is_celebrity(self.star))
+
+    def test_fan_out_on_write(self):
+        fan = self.make_profile('fan')
+        self.follow(self.author, self.reader)
+        self.follow(self.author, fan)
+        post = self.post(self.author, 1)
+        self.assertEqual(self.inbox(self.reader), {post.pk})
+        self.assertEqual(self.inbox(fan), {post.pk})
+
+        self.make_star()
+        self.post(self.star, 2)
+        self.assertEqual(FeedItem.objects.filter(author=self.star).count(), 0)
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        posts = [self.post(self.author, day) for day in range(3)]
+        self.client.post(reverse('follow_profile', kwargs={'pk': self.author.pk}))
+        self.assertEqual(self.inbox(self.reader), {post.pk for post in posts})
+
+        self.client.post(reverse('unfollow_profile', kwargs={'pk': self.author.pk}))
+        self.assertEqual(self.inbox(self.reader), set())
+
+    def test_celebrity_posts_are_merged_in(self):
+        self.follow(self.author, self.reader)
+        self.make_star()
+        posts = [self.post(self.author if day % 2 else self.star, day) for day in range(6)]
+
+        post_ids, next_cursor = feed.get_feed_page(self.reader)
+        self.assertEqual(post_ids, [post.pk for post in reversed(posts)])
+        self.assertIsNone(next_cursor)
+        self.assertEqual(self.inbox(self.reader), {post.pk for post in posts[1::2]})
+
+    def test_cursor_pages(self):
+        self.follow(self.author, self.reader)
+        self.make_star()
+        posts = [self.post(self.author if day % 3 else self.star, day) for day in range(7)]
+        # two posts on the same timestamp: the post id breaks the tie
+        Post.objects.filter(pk=posts[4].pk).update(timestamp=posts[3].timestamp)
+        feed.refresh_post(Post.objects.get(pk=posts[4].pk))
+        expected = list(Post.objects.filter(pk__in=[post.pk for post in posts])
+                        .order_by('-timestamp', '-id').values_list('pk', flat=True))
+
+        pages = []
+        cursor = None
+        while True:
+            post_ids, cursor = feed.get_feed_page(self.reader, cursor=cursor, limit=3)
+            pages.append(post_ids)
+            if not cursor:
+                break
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([post_id for page in pages for post_id in page], expected)
+
+    def test_bad_cursor_shows_the_first_page(self):
+        self.follow(self.author, self.reader)
+        posts = [self.post(self.author, day) for day in range(3)]
+        first = feed.get_feed_page(self.reader, limit=2)[0]
+        self.assertEqual(first, [posts[2].pk, posts[1].pk])
+        for cursor in ('not-a-cursor', feed.encode_cursor(self.start, 'x')):
+            self.assertEqual(feed.get_feed_page(self.reader, cursor=cursor, limit=2)[0], first)
+        response = self.client.get(reverse('show_feed'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post.pk for post in response.context['posts']], [post.pk for post in reversed(posts)])
+
+    def test_crossing_the_threshold(self):
+        fans = [self.make_profile(name) for name in ('fan1', 'fan2')]
+        for fan in fans:
+            self.follow(self.author, fan)
+        posts = {self.post(self.author, day).pk for day in range(3)}
+        self.assertEqual(self.inbox(fans[0]), posts)
+
+        # the third follower makes the author a celebrity: the copies go, the posts are pulled
+        self.client.post(reverse('follow_profile', kwargs={'pk': self.author.pk}))
+        self.assertEqual(FeedItem.objects.filter(author=self.author).count(), 0)
+        self.assertEqual(set(feed.get_feed_page(fans[0])[0]), posts)
+        self.assertEqual(set(feed.get_feed_page(self.reader)[0]), posts)
+
+        # dropping back under it pushes the posts into the remaining inboxes again
+        self.client.post(reverse('unfollow_profile', kwargs={'pk': self.author.pk}))
+        self.assertEqual(self.inbox(fans[0]), posts)
+        self.assertEqual(self.inbox(fans[1]), posts)
+        self.assertEqual(set(feed.get_feed_page(fans[1])[0]), posts)
+        self.assertEqual(self.inbox(self.reader), set())
+
+
+class SearchTest(TestCase):
+    '''The FTS5 index follows saves/deletes and supports prefix matching.'''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher')
+        self.profile = Profile.objects.create(user=self.user, username='searcher', bio_text='loves boston')
+        self.client.force_login(self.user)
+
+    def test_prefix_match_and_delete(self):
+        post = Post.objects.create(profile=self.profile, caption='Graduation day at Boston University')
+        Post.objects.create(profile=self.profile, caption='coffee break')
+
+        response = self.client.get(reverse('search'), {'q': 'grad bost'})
+        self.assertEqual([p.pk for p in response.context['posts']], [post.pk])
+        self.assertEqual(list(response.context['profiles']), [])
+
+        post.delete()
+        response = self.client.get(reverse('search'), {'q': 'grad'})
+        self.assertEqual(list(response.context['posts']), [])
+
+    def test_profiles_ranked_and_updated(self):
+        other = Profile.objects.create(user=self.user, username='bostonfan')
+        self.assertEqual(list(search.search_profiles('boston')[:10]), [other, self.profile])
+
+        other.username = 'renamed'
+        other.save()
+        self.assertEqual(list(search.search_profiles('boston')[:10]), [self.profile])
+
+    def test_posts_ranked_and_paged(self):
+        best = Post.objects.create(profile=self.profile, caption='boston boston')
+        for i in range(24):
+            Post.objects.create(profile=self.profile, caption=f'day {i} of a long trip that ended in boston again')
+
+        response = self.client.get(reverse('search'), {'q': 'boston'})
+        self.assertEqual(response.context['paginator'].count, 25)
+        posts = list(response.context['posts'])
+        self.assertEqual(len(posts), 20)
+        self.assertEqual(posts[0], best)
+
+        response = self.client.get(reverse('search'), {'q': 'boston', 'page': 2})
+        self.assertEqual(len(response.context['posts']), 5)
+        self.assertEqual(len({p.pk for p in posts} | {p.pk for p in response.context['posts']}), 25)
+
+    def test_fallback_without_fts(self):
+        self.addCleanup(setattr, search, 'is_available', search.is_available)
+        search.is_available = lambda: False
+        post = Post.objects.create(profile=self.profile, caption='Graduation day at Boston University')
+        Post.objects.create(profile=self.profile, caption='coffee break')
+
+        response = self.client.get(reverse('search'), {'q': 'boston'})
+        self.assertEqual([p.pk for p in response.context['posts']], [post.pk])
+        self.assertEqual(list(response.context['profiles']), [self.profile])
+
+
+class ImageRenditionsTest(TestCase):
+    '''Uploaded photos are queued, then rendered upright and without EXIF by the worker.'''
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        author = Profile.objects.create(user=User.objects.create_user(username='author'), username='author')
+        self.post = Post.objects.create(profile=author, caption='photos')
+
+    def upload(self, name, content):
+        return Photo.objects.create(post=self.post, image_file=SimpleUploadedFile(name, content))
+
+    def test_renditions(self):
+        # a landscape camera JPEG whose EXIF says "rotate 90 degrees"
+        image = Image.new('RGB', (2400, 1800), 'red')
+        exif = image.getexif()
+        exif[0x0112] = 6
+        buffer = BytesIO()
+        image.save(buffer, 'JPEG', exif=exif)
+        photo = self.upload('camera.jpg', buffer.getvalue())
+        broken = self.upload('broken.jpg', b'not an image')
+        linked = Photo.objects.create(post=self.post, image_url='https://example.com/a.jpg')
+        self.assertEqual(photo.rendition_status, 'pending')
+        self.assertEqual(photo.display_url, photo.image_file.url)
+
+        # threads instead of processes keep the test in the test database's connection
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(images.process_batch(Photo, pool), (1, 1, 1))
+
+        photo.refresh_from_db()
+        self.assertEqual((photo.width, photo.height), (1800, 2400))
+        self.assertEqual(photo.renditions['thumb'], {'width': 240, 'height': 320, 'webp': 'thumb.webp', 'jpeg': 'thumb.jpg'})
+        self.assertTrue(photo.display_url.endswith('/card.jpg'))
+        self.assertEqual(photo.webp_srcset.count('webp'), 3)
+        with Image.open(f'{self.media_root}/{photo.renditions_dir()}/full.jpg') as full:
+            self.assertEqual(full.size, (1440, 1920))
+            self.assertNotIn(0x0112, full.getexif())
+
+        self.assertEqual(Photo.objects.get(pk=broken.pk).rendition_status, 'failed')
+        self.assertEqual(Photo.objects.get(pk=linked.pk).rendition_status, 'skipped')
+
+
+class StreamingUploadTest(TestCase):
+    '''Post photos are streamed into storage by content hash and created in one INSERT.'''
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='author')
+        Profile.objects.create(user=self.user, username='author')
+        self.client.force_login(self.user)
+
+    def image(self, name, content):
+        return SimpleUploadedFile(name, content, content_type='image/jpeg')
+
+    def media_files(self):
+        return [name for root, dirs, found in os.walk(self.media_root) for name in found]
+
+    def test_identical_uploads_are_stored_once(self):
+        files = [
+            self.image('a.jpg', b'same bytes'),
+            self.image('copy of a.JPG', b'same bytes'),
+            self.image('b.jpg', b'other bytes'),
+        ]
+        response = self.client.post(reverse('create_post'), {'caption': 'trip', 'image_files': files})
+        self.assertEqual(response.status_code, 302)
+
+        names = [photo.image_file.name for photo in Photo.objects.order_by('pk')]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(names[0], names[1])
+        self.assertRegex(names[0], r'^photos/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertNotEqual(names[0], names[2])
+        with Photo.objects.first().image_file.open() as stored:
+            self.assertEqual(stored.read(), b'same bytes')
+        stored_files = [name for root, dirs, found in os.walk(f'{self.media_root}/photos') for name in found]
+        self.assertEqual(len(stored_files), 2)
+        # nothing left behind in the staging directory
+        self.assertEqual(len(self.media_files()), 2)
+
+    def test_csrf_is_still_checked(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(reverse('create_post'), {'caption': 'x', 'image_files': [self.image('a.jpg', b'x')]})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(self.media_files(), [])
+
+    def test_anonymous_upload_is_refused_before_reading_the_body(self):
+        self.client.logout()
+        response = self.client.post(reverse('create_post'), {'caption': 'x', 'image_files': [self.image('a.jpg', b'x')]})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(self.media_files(), [])
+
+    def test_only_images_are_accepted(self):
+        files = [
+            SimpleUploadedFile('page.html', b'<script>', content_type='text/html'),
+            SimpleUploadedFile('page.jpg', b'<script>', content_type='text/html'),
+            self.image('a.jpg', b'jpeg bytes'),
+        ]
+        response = self.client.post(reverse('create_post'), {'caption': 'x', 'image_files': files})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Photo.objects.count(), 1)
+        self.assertEqual(len(self.media_files()), 1)
+
+    def test_invalid_form_leaves_no_files(self):
+        response = self.client.post(reverse('create_post'), {'image_files': [self.image('a.jpg', b'x')]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.media_files(), [])
+
+
+@override_settings(QUERY_PROFILER_ENABLED=True, QUERY_PROFILER_N_PLUS_ONE_THRESHOLD=5)
+class QueryProfilerTest(TestCase):
+    '''The query profiler middleware reports timings and flags repeated per-post queries.'''
+
+    def setUp(self):
+        self.author = Profile.objects.create(user=User.objects.create_user(username='author'), username='author')
+        for i in range(6):
+            post = Post.objects.create(profile=self.author, caption=f'post {i}')
+            Photo.objects.create(post=post, image_url=f'https://example.com/{i}.jpg')
+        profiling._recent.clear()
+
+    def test_profile_page_photo_lookups_are_flagged(self):
+        with self.assertLogs('cs412.profiling', 'WARNING') as logs:
+            response = self.client.get(reverse('profile', kwargs={'pk': self.author.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('Possible N+1 on profile', logs.output[0])
+
+        # the report is staff only, in DEBUG too
+        self.assertEqual(self.client.get(reverse('profiler_report')).status_code, 404)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse('profiler_report')).status_code, 404)
+        self.client.force_login(User.objects.create_user(username='admin', is_staff=True))
+        report = self.client.get(reverse('profiler_report')).json()
+        page = next(url for url in report['urls'] if url['url_name'] == 'profile')
+        suspect = next(s for s in page['n_plus_one'] if 'mini_insta_photo' in s['sql'])
+        self.assertGreaterEqual(suspect['max_count'], 6)
+        # traced back to the template line that called post.get_all_photos
+        self.assertTrue(any(source.startswith('mini_insta/show_profile.html:') for source in suspect['sources']))
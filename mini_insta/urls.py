@@ -34,6 +34,7 @@ urlpatterns = [
     path('profile/<int:pk>/delete_follow/', UnfollowProfileView.as_view(), name='unfollow_profile'),
     path('post/<int:pk>/like/', AddLikeView.as_view(), name='like_post'),
     path('post/<int:pk>/delete_like/', RemoveLikeView.as_view(), name='unlike_post'),
+    path('post/<int:pk>/comment/', CreateCommentView.as_view(), name='create_comment'),
 
     #############################
     #API Views: 
@@ -17,10 +17,16 @@ from .forms import *      #CreateArticleForm, CreateCommentForm    from example
 from django.urls import reverse
 from django.http import HttpResponseRedirect
 from django.contrib.auth import login
+from django.db import transaction
+from django.db.models import F
+from cs412.caching import CachedViewMixin
+from cs412.uploads import StreamingUploadMixin
+from . import feed, search
 
-class ProfileListView(ListView): 
+class ProfileListView(CachedViewMixin, ListView): 
     ''' Define a view class to display all users'''
     model = Profile
+    cache_models = [Profile] # cached until a profile changes, see cs412/caching.py
     template_name = "mini_insta/show_all_profiles.html"
     context_object_name = "profiles"
 
@@ -74,11 +80,13 @@ class PostDetailView(DetailView):
         return context
 
 
-class CreatePostView(LoginRequiredMixin, CreateView):
+class CreatePostView(StreamingUploadMixin, CreateView):
     '''A view to handle creation of a new Post on a Profile'''
 
     form_class = CreatePostForm
     template_name = "mini_insta/create_post_form.html"
+    # uploaded images are streamed into storage by content hash, see cs412/uploads.py
+    upload_to = Photo._meta.get_field('image_file').upload_to
 
     def get_login_url(self):
         '''Return the URL for the login page.'''
@@ -106,10 +114,13 @@ class CreatePostView(LoginRequiredMixin, CreateView):
         # delegate the saving of Post to the superclass
         response = super().form_valid(form)
 
-        # handle image files 
-        image_files = self.request.FILES.getlist('image_files')
-        for file in image_files:
-            Photo.objects.create(post=self.object, image_file=file)
+        # handle image files: staged by the upload handler, stored now, one INSERT for all of them
+        Photo.objects.bulk_create([
+            Photo(post=self.object, image_file=name) for name in self.store_uploads()
+        ])
+
+        # deliver the new Post into the followers' feeds
+        feed.fan_out_post(self.object)
 
         return response
     
@@ -140,6 +151,12 @@ class UpdateProfileView(LoginRequiredMixin, UpdateView):
         ''' Get the object to be updated. find the profile associated with the logged-in user'''
         return Profile.objects.get(user=self.request.user)
 
+    def form_valid(self, form):
+        '''Save only the form's fields, so a follow committed meanwhile keeps its counter update'''
+        self.object = form.save(commit=False)
+        self.object.save(update_fields=form.Meta.fields)
+        return HttpResponseRedirect(self.get_success_url())
+
     def get_success_url(self):
         return reverse('profile', kwargs={'pk': self.object.pk})
 
@@ -153,6 +170,17 @@ class UpdatePostView(LoginRequiredMixin, UpdateView):
         '''Return the URL for the login page.'''
         return reverse('login')
 
+    def form_valid(self, form):
+        '''
+        Save the Post and move it to its new place in the followers' feeds.
+        Only the form's fields (and the auto_now timestamp) are written, so a
+        like or comment committed meanwhile keeps its counter update.
+        '''
+        self.object = form.save(commit=False)
+        self.object.save(update_fields=[*form.Meta.fields, 'timestamp'])
+        feed.refresh_post(self.object)
+        return HttpResponseRedirect(self.get_success_url())
+
     def get_success_url(self):
         return reverse("post", kwargs={"pk": self.object.pk})
 
@@ -218,21 +246,27 @@ class PostFeedListView(LoginRequiredMixin, ListView):
     context_object_name = "posts"
 
     def get_queryset(self):
-        '''Return the posts made by the profiles this user follows.'''
-        profile = Profile.objects.get(user=self.request.user)
-        return profile.get_post_feed()
+        '''Return one page of posts made by the profiles this user follows, read from the materialized feed.'''
+        self.profile = Profile.objects.get(user=self.request.user)
+        post_ids, self.next_cursor = feed.get_feed_page(self.profile, cursor=self.request.GET.get('cursor'))
+        posts = Post.objects.for_feed().in_bulk(post_ids)
+        return [posts[pk] for pk in post_ids if pk in posts]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        profile = Profile.objects.get(user=self.request.user)
-        context['profile'] = profile
+        context['profile'] = self.profile
+        context['next_cursor'] = self.next_cursor
         return context
     
 
 class SearchView(LoginRequiredMixin, ListView):
-    '''search across Profiles and Posts.'''
+    '''search across Profiles and Posts, using the full-text index in search.py.'''
     template_name = 'mini_insta/search_results.html'
     context_object_name = 'posts'
+    paginate_by = 20
+
+    # how many of the best matching profiles to show above the posts
+    max_profiles = 20
 
     def dispatch(self, request, *args, **kwargs):
         query = self.request.GET.get('q', None)
@@ -242,10 +276,10 @@ class SearchView(LoginRequiredMixin, ListView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        '''Return Posts that match the query in their caption text.'''
+        '''Return Posts that match the query in their caption text, best match first.'''
         query = self.request.GET.get('q', '')
         if query:
-            return Post.objects.filter(caption__icontains=query)
+            return search.search_posts(query)
         return Post.objects.none()
 
     def get_context_data(self, **kwargs):
@@ -256,10 +290,7 @@ class SearchView(LoginRequiredMixin, ListView):
         context['query'] = query
 
         if query:
-            username_matches = Profile.objects.filter(username__icontains=query)
-            display_matches = Profile.objects.filter(display_name__icontains=query)
-            bio_matches = Profile.objects.filter(bio_text__icontains=query)
-            context['profiles'] = (username_matches | display_matches | bio_matches).distinct()
+            context['profiles'] = search.search_profiles(query)[:self.max_profiles]
         else:
             context['profiles'] = Profile.objects.none()
 
@@ -310,7 +341,10 @@ class AddLikeView(LoginRequiredMixin, View):
     def post(self, request, pk):
         post = Post.objects.get(pk=pk)
         liker_profile = request.user.profile_set.first()
-        Like.objects.get_or_create(post=post, profile=liker_profile)
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(post=post, profile=liker_profile)
+            if created:
+                Post.objects.filter(pk=post.pk).update(num_likes=F('num_likes') + 1)
 
         return redirect('post', pk=post.pk)
 
@@ -319,7 +353,10 @@ class RemoveLikeView(LoginRequiredMixin, View):
     def post(self, request, pk):
         post = Post.objects.get(pk=pk)
         liker_profile = request.user.profile_set.first()
-        Like.objects.filter(post=post, profile=liker_profile).delete()
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(post=post, profile=liker_profile).delete()
+            if deleted:
+                Post.objects.filter(pk=post.pk).update(num_likes=F('num_likes') - deleted)
 
         return redirect('post', pk=post.pk)
 
@@ -328,7 +365,13 @@ class FollowProfileView(LoginRequiredMixin, View):
     def post(self, request, pk):
         profile_to_follow = Profile.objects.get(pk=pk)
         follower_profile = request.user.profile_set.first()
-        Follow.objects.get_or_create(profile=profile_to_follow, follower_profile=follower_profile)
+        with transaction.atomic():
+            follow, created = Follow.objects.get_or_create(profile=profile_to_follow, follower_profile=follower_profile)
+            if created:
+                Profile.objects.filter(pk=profile_to_follow.pk).update(num_followers=F('num_followers') + 1)
+                Profile.objects.filter(pk=follower_profile.pk).update(num_following=F('num_following') + 1)
+                feed.follower_count_changed(profile_to_follow, 1)
+                feed.backfill_feed(follower_profile, profile_to_follow)
         
         return redirect('profile', pk=profile_to_follow.pk)
 
@@ -337,10 +380,44 @@ class UnfollowProfileView(LoginRequiredMixin, View):
     def post(self, request, pk):
         profile_to_unfollow = Profile.objects.get(pk=pk)
         follower_profile = request.user.profile_set.first()
-        Follow.objects.filter(profile=profile_to_unfollow, follower_profile=follower_profile).delete()
+        with transaction.atomic():
+            deleted, _ = Follow.objects.filter(profile=profile_to_unfollow, follower_profile=follower_profile).delete()
+            if deleted:
+                Profile.objects.filter(pk=profile_to_unfollow.pk).update(num_followers=F('num_followers') - deleted)
+                Profile.objects.filter(pk=follower_profile.pk).update(num_following=F('num_following') - deleted)
+                feed.follower_count_changed(profile_to_unfollow, -deleted)
+            feed.prune_feed(follower_profile, profile_to_unfollow)
         
         return redirect('profile', pk=profile_to_unfollow.pk)
 
+class CreateCommentView(LoginRequiredMixin, CreateView):
+    """add a comment to a Post"""
+
+    form_class = CreateCommentForm
+    template_name = "mini_insta/create_comment_form.html"
+
+    def get_login_url(self):
+        '''Return the URL for the login page.'''
+        return reverse('login')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = Post.objects.get(pk=self.kwargs['pk'])
+        return context
+
+    def form_valid(self, form):
+        '''attach the Post and the commenter, then bump the Post's comment counter'''
+        post = Post.objects.get(pk=self.kwargs['pk'])
+        form.instance.post = post
+        form.instance.profile = self.request.user.profile_set.first()
+        with transaction.atomic():
+            response = super().form_valid(form)
+            Post.objects.filter(pk=post.pk).update(num_comments=F('num_comments') + 1)
+        return response
+
+    def get_success_url(self):
+        return reverse('post', kwargs={'pk': self.kwargs['pk']})
+
 #####################################################################
 
 #Rest API:
@@ -3,10 +3,12 @@
 # Description: Registers all project models in the Django admin interface.
 
 from django.contrib import admin
-from .models import UserProfile, Listing, ListingPhoto, InterestRequest
+from .models import UserProfile, Listing, ListingPhoto, InterestRequest, GeocodeCache, Notification
 
 # Registering the main models for the subletting marketplace
 admin.site.register(UserProfile)
 admin.site.register(Listing)
 admin.site.register(ListingPhoto)
 admin.site.register(InterestRequest)
+admin.site.register(GeocodeCache)
+admin.site.register(Notification)
@@ -6,4 +6,7 @@ class ProjectConfig(AppConfig):
 
     def ready(self):
         import project.signals
+        from cs412 import caching
+        # the cached listings page follows these versions
+        caching.watch_models([self.get_model("Listing"), self.get_model("ListingPhoto")])
 
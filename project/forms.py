@@ -96,3 +96,10 @@ class InterestRequestStatusForm(forms.ModelForm):
         model = InterestRequest
         fields = ["status"]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # "closed" is only ever set by accepting another request
+        self.fields["status"].choices = [
+            choice for choice in self.fields["status"].choices if choice[0] != "closed"
+        ]
+
@@ -0,0 +1,139 @@
+# File: geo.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: geohash spatial index for listing coordinates, used by the
+#   map's bounding-box endpoint.
+#
+#   Notes:
+#   - Each Listing stores the geohash of its coordinates (kept current by a
+#     pre_save signal). A geohash prefix names a rectangle of the map, and
+#     every point inside it has a geohash starting with that prefix, so the
+#     listings in a viewport are a handful of B-tree range scans
+#     (geohash >= 'drt2' AND geohash < 'drt2~') over the indexed column.
+#   - The cells only approximate the viewport; the exact latitude/longitude
+#     bounds are applied on top.
+#   - At low zoom the listings are grouped by a shorter geohash prefix into
+#     clusters, so the browser gets one marker per cell instead of one per listing.
+#   - Viewports crossing the antimeridian are not supported (the marketplace
+#     covers Boston).
+
+from django.db.models import Avg, Count, Min, Q
+from django.db.models.functions import Substr
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# stored precision: 9 characters is a cell of about 5m x 5m
+GEOHASH_PRECISION = 9
+
+# upper bound on the number of range scans used to cover one viewport
+MAX_COVER_CELLS = 32
+
+# at this zoom and above every listing is its own marker
+CLUSTER_MAX_ZOOM = 15
+
+# clusters are cells at least this many screen pixels wide
+CLUSTER_CELL_PIXELS = 64
+
+# at most this many markers (listings or clusters) are returned per request
+MAX_MARKERS = 500
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    '''Return the geohash of a point.'''
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    use_lng = True
+    while len(chars) < precision:
+        rng, value = (lng_range, longitude) if use_lng else (lat_range, latitude)
+        middle = (rng[0] + rng[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            rng[0] = middle
+        else:
+            bits <<= 1
+            rng[1] = middle
+        use_lng = not use_lng
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    '''Return (height, width) in degrees of a geohash cell of this precision.'''
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def cover(south, west, north, east, precision):
+    '''Return the set of geohash cells of this precision that overlap the box.'''
+    height, width = cell_size(precision)
+    cells = set()
+    lat = south
+    while True:
+        lng = west
+        while True:
+            cells.add(encode(lat, lng, precision))
+            if lng >= east:
+                break
+            lng = min(lng + width, east)
+        if lat >= north:
+            break
+        lat = min(lat + height, north)
+    return cells
+
+
+def cover_prefixes(south, west, north, east, max_cells=MAX_COVER_CELLS):
+    '''Return the longest-prefix cover of the box that needs at most max_cells cells.'''
+    best = cover(south, west, north, east, 1)
+    for precision in range(2, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        # cheap estimate first, so a big box never enumerates millions of cells
+        if ((north - south) / height + 2) * ((east - west) / width + 2) > max_cells * 4:
+            break
+        cells = cover(south, west, north, east, precision)
+        if len(cells) > max_cells:
+            break
+        best = cells
+    return best
+
+
+def in_box(queryset, south, west, north, east):
+    '''Return the listings of queryset whose coordinates fall inside the box.'''
+    ranges = Q()
+    for prefix in sorted(cover_prefixes(south, west, north, east)):
+        # '~' sorts after every geohash character, so this is "starts with prefix"
+        # written as a range the B-tree index can serve
+        ranges |= Q(geohash__gte=prefix, geohash__lt=prefix + '~')
+    return queryset.filter(ranges).filter(
+        latitude__gte=south, latitude__lte=north,
+        longitude__gte=west, longitude__lte=east,
+    )
+
+
+def cluster_precision(zoom):
+    '''Return the geohash prefix length that groups listings at a map zoom level.'''
+    # a web map tile is 256px wide and spans 360 / 2**zoom degrees of longitude
+    degrees_per_pixel = 360.0 / (256 * 2 ** zoom)
+    precision = 1
+    while precision < GEOHASH_PRECISION and cell_size(precision + 1)[1] / degrees_per_pixel >= CLUSTER_CELL_PIXELS:
+        precision += 1
+    return precision
+
+
+def clusters(queryset, zoom):
+    '''Group listings by geohash cell; return [{'cell', 'count', 'lat', 'lng', 'first_id'}].'''
+    precision = cluster_precision(zoom)
+    return list(
+        queryset.order_by()
+        .annotate(cell=Substr('geohash', 1, precision))
+        .values('cell')
+        .annotate(count=Count('id'), lat=Avg('latitude'), lng=Avg('longitude'), first_id=Min('id'))
+        .order_by('-count')[:MAX_MARKERS]
+    )
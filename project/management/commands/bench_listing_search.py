@@ -0,0 +1,121 @@
+# File: bench_listing_search.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: benchmark of the TerrierBnB listing search. Seeds synthetic
+#   listings into a throwaway test database (the real db.sqlite3 is never
+#   touched), times the common filter combinations with the Listing indexes,
+#   then drops them and times the same searches again for comparison.
+#
+#   python manage.py bench_listing_search --rows 500000
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from project.models import Listing
+from project.views import filter_listings, listing_ordering
+
+AREAS = [value for value, label in Listing.AREA_CHOICES]
+
+# (label, query string) in the form ListingListView receives it
+COMBINATIONS = [
+    ("newest", ""),
+    ("area", "area=fenway"),
+    ("price range", "min_price=1000&max_price=1400&sort=price"),
+    ("area + price", "area=allston&min_price=900&max_price=1500&sort=price"),
+    ("dates", "start_date=2026-06-01&end_date=2026-08-15"),
+    ("area + dates", "area=west&start_date=2026-06-01&end_date=2026-08-15"),
+    ("everything", "area=brighton&min_price=800&max_price=2000&start_date=2026-06-01&end_date=2026-08-15&sort=price"),
+]
+
+
+class Command(BaseCommand):
+    help = "Time the listing search filter combinations on synthetic listings, with and without the indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=24)
+        parser.add_argument('--plans', action='store_true', help="also print the query plan of each combination")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(options['rows'])
+            indexed = self.run(options['repeat'], options['page_size'], options['plans'])
+            self.drop_indexes()
+            unindexed = self.run(options['repeat'], options['page_size'], False)
+            self.report(indexed, unindexed)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, rows):
+        '''Insert synthetic Listings in bulk (no signals); about 10% are already taken.'''
+        rng = random.Random(412)
+        start = time.perf_counter()
+        host = User.objects.create_user(username='bench_host').userprofile
+        first_day = date(2026, 1, 1)
+        batch = []
+        with transaction.atomic():
+            for i in range(rows):
+                start_date = first_day + timedelta(days=rng.randrange(365))
+                batch.append(Listing(
+                    lister=host,
+                    title=f'Sublet {i}',
+                    description='Furnished room near campus',
+                    price_per_month=Decimal(rng.randrange(600, 4000)),
+                    address=f'{rng.randrange(1, 999)} Commonwealth Ave',
+                    start_date=start_date,
+                    end_date=start_date + timedelta(days=rng.choice([30, 60, 90, 120, 180, 365])),
+                    area=rng.choice(AREAS),
+                    number_of_roommates=rng.randrange(5),
+                    is_available=rng.random() > 0.1,
+                ))
+                if len(batch) == 10000:
+                    Listing.objects.bulk_create(batch)
+                    batch = []
+            Listing.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.stdout.write(f"seeded {rows} listings in {time.perf_counter() - start:.1f}s")
+
+    def drop_indexes(self):
+        '''Remove the search indexes declared on Listing.Meta.'''
+        with connection.schema_editor() as editor:
+            for index in Listing._meta.indexes:
+                editor.remove_index(Listing, index)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def time_call(self, repeat, fn):
+        '''Return the median wall time of fn() in milliseconds.'''
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def run(self, repeat, page_size, plans):
+        '''Return {label: (ms, matches)} for the first results page of each combination.'''
+        results = {}
+        for label, query in COMBINATIONS:
+            params = QueryDict(query)
+            qs = filter_listings(Listing.objects.all(), params).order_by(*listing_ordering(params))
+            results[label] = (self.time_call(repeat, lambda: list(qs[:page_size])), qs.count())
+            if plans:
+                self.stdout.write(f"{label}: {qs[:page_size].explain()}")
+        return results
+
+    def report(self, indexed, unindexed):
+        self.stdout.write(f"{'search':<16}{'no index ms':>13}{'indexed ms':>12}{'matches':>10}")
+        for label, query in COMBINATIONS:
+            ms, matches = indexed[label]
+            self.stdout.write(f"{label:<16}{unindexed[label][0]:>13.1f}{ms:>12.1f}{matches:>10}")
@@ -0,0 +1,54 @@
+# File: geocode_listings.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: background worker that geocodes listings with no coordinates,
+#   outside the request path. Run once (e.g. from cron) or with --loop as a
+#   long-running process. Uses the geocode cache and the rate limit from
+#   project/utils.py; set GEOCODER_BACKEND=stub to run it offline.
+#
+#   python manage.py geocode_listings --loop --interval 60
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from project import utils
+
+# longest wait between retries after the geocoder keeps failing
+MAX_BACKOFF = 15 * 60
+
+
+class Command(BaseCommand):
+    help = "Geocode listings that have an address but no latitude/longitude."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="listings to geocode per batch")
+        parser.add_argument('--rate', type=float, default=None,
+                            help="API requests per second (default: settings.GEOCODER_RATE_LIMIT)")
+        parser.add_argument('--loop', action='store_true',
+                            help="keep running, checking for new listings every --interval seconds")
+        parser.add_argument('--interval', type=float, default=60)
+
+    def handle(self, *args, **options):
+        backoff = options['interval']
+        while True:
+            geocoded, unmatched, error = utils.geocode_missing_listings(
+                batch_size=options['batch_size'], rate_limit=options['rate'], log=self.stderr.write,
+            )
+            self.stdout.write(f"Geocoded {geocoded} listings, {unmatched} with no match")
+
+            if error is not None:
+                # the API is failing or over quota: wait longer after each failure
+                self.stderr.write(f"Geocoder error: {error}; retrying in {backoff:.0f}s")
+                if not options['loop']:
+                    return
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+            backoff = options['interval']
+
+            if not options['loop']:
+                return
+            # a full batch means there may be more waiting; go again right away
+            if geocoded + unmatched < options['batch_size']:
+                time.sleep(options['interval'])
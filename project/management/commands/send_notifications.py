@@ -0,0 +1,72 @@
+# File: send_notifications.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: delivers the queued Notification rows by email, outside the
+#   request path. Run once (e.g. from cron) or with --loop as a long-running
+#   worker. Messages that fail to send stay queued and are retried next time.
+#
+#   python manage.py send_notifications --loop --interval 30
+
+import time
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from project.models import Notification
+
+
+class Command(BaseCommand):
+    help = "Email queued TerrierBnB notifications."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true',
+                            help="keep running, checking the queue every --interval seconds")
+        parser.add_argument('--interval', type=float, default=30)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = self.send_batch(options['batch_size'])
+            if sent:
+                self.stdout.write(f"Sent {sent} notifications")
+            if not options['loop']:
+                return
+            if sent < options['batch_size']:
+                time.sleep(options['interval'])
+
+    def send_batch(self, batch_size):
+        '''Email up to batch_size unsent notifications over one SMTP connection.'''
+        queued = list(
+            Notification.objects.filter(sent_at__isnull=True)
+            .select_related('recipient').order_by('id')[:batch_size]
+        )
+        if not queued:
+            return 0
+
+        sent_ids = []
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # mail server unreachable: leave everything queued for the next run
+            self.stderr.write(f"Could not connect to the mail server: {e}")
+            return 0
+        with connection:
+            for notification in queued:
+                if not notification.recipient.email:
+                    # nowhere to deliver it; mark it done so it does not block the queue
+                    sent_ids.append(notification.pk)
+                    continue
+                message = EmailMessage(
+                    notification.subject, notification.message,
+                    to=[notification.recipient.email], connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as e:
+                    self.stderr.write(f"Could not send notification {notification.pk}: {e}")
+                    continue
+                sent_ids.append(notification.pk)
+
+        Notification.objects.filter(pk__in=sent_ids).update(sent_at=timezone.now())
+        return len(sent_ids)
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+from project.geo import encode
+
+
+def fill_geohashes(apps, schema_editor):
+    '''Compute the geohash of every listing that already has coordinates.'''
+    Listing = apps.get_model('project', 'Listing')
+    listings = list(Listing.objects.filter(latitude__isnull=False, longitude__isnull=False).only('latitude', 'longitude'))
+    for listing in listings:
+        listing.geohash = encode(listing.latitude, listing.longitude)
+    Listing.objects.bulk_update(listings, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(fill_geohashes, migrations.RunPython.noop),
+    ]
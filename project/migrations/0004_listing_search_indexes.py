@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0003_geocodecache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['area', 'price_per_month', 'id'], name='listing_avail_area_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['price_per_month', 'id'], name='listing_avail_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['start_date', 'end_date'], name='listing_avail_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['area', 'start_date', 'end_date'], name='listing_avail_area_window_idx'),
+        ),
+    ]
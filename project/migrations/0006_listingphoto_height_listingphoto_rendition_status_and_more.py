@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0005_interest_request_closed_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingphoto',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='rendition_status',
+            field=models.CharField(choices=[('pending', 'Waiting to be processed'), ('done', 'Renditions ready'), ('failed', 'Could not be processed'), ('skipped', 'No uploaded file')], default='pending', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='listingphoto',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -10,8 +10,10 @@
 #   - Interest Requests allow subletters to message hosts and express interest.
 
 from django.db import models
+from django.db.models import Prefetch
 from django.contrib.auth.models import User
 from django.urls import reverse
+from cs412.images import ImageRenditionsMixin
 
 
 class UserProfile(models.Model):
@@ -62,6 +64,22 @@ class UserProfile(models.Model):
         return None
 
 
+class ListingQuerySet(models.QuerySet):
+    """QuerySet helpers for rendering lists of Listings without one query per Listing"""
+
+    def with_cover_photo(self):
+        """
+        Returns Listings with their first photo (lowest id) fetched for all of
+        them in one extra query, into listing.cover_photos (a list of 0 or 1).
+        Read it through listing.cover_photo.
+        """
+        return self.prefetch_related(Prefetch(
+            'listingphoto_set',
+            queryset=ListingPhoto.objects.order_by('pk')[:1],
+            to_attr='cover_photos',
+        ))
+
+
 class Listing(models.Model):
     """
     Represents a sublet posted by a host.
@@ -142,9 +160,33 @@ class Listing(models.Model):
     latitude = models.FloatField(blank=True, null=True)
     longitude = models.FloatField(blank=True, null=True)
 
+    # Geohash of (latitude, longitude), the spatial index for the map (see geo.py).
+    # Set by a pre_save signal; blank when the listing has no coordinates.
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False, db_index=True)
+
     # Automatically set to False when the listing is accepted by someone
     is_available = models.BooleanField(default=True)
 
+    objects = ListingQuerySet.as_manager()
+
+    class Meta:
+        # Listing search only ever looks at available listings, so these are
+        # partial indexes over is_available = true: accepted listings cost
+        # nothing to skip and the indexes stay small.
+        indexes = [
+            # area + price range, ordered by price
+            models.Index(fields=['area', 'price_per_month', 'id'], name='listing_avail_area_price_idx',
+                         condition=models.Q(is_available=True)),
+            # price range / price ordering across all areas
+            models.Index(fields=['price_per_month', 'id'], name='listing_avail_price_idx',
+                         condition=models.Q(is_available=True)),
+            # availability window: start_date <= move-in, end_date >= move-out
+            models.Index(fields=['start_date', 'end_date'], name='listing_avail_window_idx',
+                         condition=models.Q(is_available=True)),
+            models.Index(fields=['area', 'start_date', 'end_date'], name='listing_avail_area_window_idx',
+                         condition=models.Q(is_available=True)),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -152,6 +194,14 @@ class Listing(models.Model):
     def get_photos(self):
         return ListingPhoto.objects.filter(listing=self)
 
+    # Helper: the photo shown on the listing's card (its first photo), or None.
+    # Free when the listing came from Listing.objects.with_cover_photo().
+    @property
+    def cover_photo(self):
+        if hasattr(self, 'cover_photos'):
+            return self.cover_photos[0] if self.cover_photos else None
+        return self.get_photos().order_by('pk').first()
+
     # Helper: all interest requests for this listing
     def get_interest_requests(self):
         return InterestRequest.objects.filter(listing=self)
@@ -161,12 +211,13 @@ class Listing(models.Model):
 
 
 
-class ListingPhoto(models.Model):
+class ListingPhoto(ImageRenditionsMixin):
     """
     Stores photos for a listing.
 
     Supports:
-    - Uploaded images (image_file)
+    - Uploaded images (image_file), resized in the background into
+      thumb/card/full renditions (see cs412/images.py)
     - External URLs (e.g., links to images)
     """
 
@@ -191,13 +242,15 @@ class InterestRequest(models.Model):
     - requester: user sending the request
     - message: message content
     - timestamp: automatically added
-    - status: pending, accepted, declined
+    - status: pending, accepted, declined, or closed once another request
+      for the listing was accepted
     """
 
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('accepted', 'Accepted'),
         ('declined', 'Declined'),
+        ('closed', 'Closed'),  # the listing went to someone else
     ]
 
     listing = models.ForeignKey(Listing, on_delete=models.CASCADE)
@@ -214,4 +267,50 @@ class InterestRequest(models.Model):
         return f"{self.requester} {self.listing} ({self.status})"
 
 
+class GeocodeCache(models.Model):
+    """
+    Remembers the result of geocoding an address, so the same address is never
+    sent to the Geocoding API twice (see utils.geocode_address).
+
+    - address_key: sha1 of the normalized address (lowercase, no punctuation,
+      single spaces), so "10 Buick St." and "10  buick st" share one row
+    - latitude/longitude: None when the API found no match for the address
+    """
+
+    address_key = models.CharField(max_length=40, unique=True)
+    address = models.TextField()
+
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.address} -> ({self.latitude}, {self.longitude})"
+
+
+class Notification(models.Model):
+    """
+    A message queued for a user, e.g. "your interest request was accepted".
+    Views only insert a row (inside their own transaction), and
+    `manage.py send_notifications` emails the queued ones afterwards, so no
+    request waits on the mail server.
+    """
+
+    recipient = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    subject = models.CharField(max_length=200)
+    message = models.TextField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # None until the message has been delivered
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # the delivery queue: unsent notifications, oldest first
+            models.Index(fields=['id'], name='notification_unsent_idx',
+                         condition=models.Q(sent_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
@@ -3,13 +3,14 @@
 # Last updated: 12/09/2025
 # Description:
 #   Automatically creates a corresponding UserProfile whenever a new Django User 
-#   is registered. 
+#   is registered. Keeps each Listing's geohash in step with its coordinates.
 
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import UserProfile
+from . import geo
+from .models import Listing, UserProfile
 
 @receiver(post_save, sender=User)
 def create_profile_for_new_user(sender, instance, created, **kwargs):
@@ -24,3 +25,15 @@ def create_profile_for_new_user(sender, instance, created, **kwargs):
             display_name=instance.username,
             email=instance.email
         )
+
+
+@receiver(pre_save, sender=Listing)
+def set_listing_geohash(sender, instance, **kwargs):
+    """
+    Recomputes the listing's geohash from its latitude/longitude before every
+    save, so the map's spatial index never points at old coordinates.
+    """
+    if instance.latitude is not None and instance.longitude is not None:
+        instance.geohash = geo.encode(instance.latitude, instance.longitude)
+    else:
+        instance.geohash = ""
@@ -1,3 +1,340 @@
+# File: tests.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: tests for the TerrierBnB project app
+
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cs412.pagination import encode_cursor
+
+from . import geo, utils
+from .models import GeocodeCache, InterestRequest, Listing, ListingPhoto, Notification
+
+
+class FailingGeocoder:
+    """A geocoder whose API is always down."""
+
+    def lookup(self, address):
+        raise utils.GeocodingError("UNKNOWN_ERROR")
+
+
+class GeocodeTest(TestCase):
+    """Geocoding goes through the cache and the batch worker, offline with the stub geocoder."""
+
+    def setUp(self):
+        self.geocoder = utils.StubGeocoder()
+        self.host = User.objects.create_user(username="host").userprofile
+
+    def create_listing(self, address):
+        return Listing.objects.create(
+            lister=self.host, title=address, description="room", price_per_month=1200,
+            address=address, start_date=date(2026, 1, 1), end_date=date(2026, 6, 1), area="west",
+        )
+
+    def test_same_address_is_looked_up_once(self):
+        first = utils.geocode_address("10 Buick St., Boston MA", geocoder=self.geocoder)
+        second = utils.geocode_address("10  buick st boston, ma", geocoder=self.geocoder)
+        self.assertEqual(first, second)
+        self.assertIsNotNone(first[0])
+        self.assertEqual(self.geocoder.calls, 1)
+        self.assertEqual(GeocodeCache.objects.count(), 1)
+
+    def test_no_match_is_cached_but_errors_are_not(self):
+        self.assertEqual(utils.geocode_address("1 Nowhere Rd", geocoder=self.geocoder), (None, None))
+        self.assertEqual(utils.geocode_address("1 Nowhere Rd", geocoder=self.geocoder), (None, None))
+        self.assertEqual(self.geocoder.calls, 1)
+
+        self.assertEqual(utils.geocode_address("2 Bay State Rd", geocoder=FailingGeocoder()), (None, None))
+        self.assertFalse(GeocodeCache.objects.filter(address_key=utils.address_key("2 Bay State Rd")).exists())
+
+    def test_worker_fills_missing_coordinates(self):
+        found = self.create_listing("700 Commonwealth Ave")
+        missing = self.create_listing("1 Nowhere Rd")
+
+        geocoded, unmatched, error = utils.geocode_missing_listings(rate_limit=1000, geocoder=self.geocoder)
+        self.assertEqual((geocoded, unmatched, error), (1, 1, None))
+
+        found.refresh_from_db()
+        self.assertIsNotNone(found.latitude)
+        self.assertEqual(found.geohash, geo.encode(found.latitude, found.longitude))
+
+        # the unmatched address is remembered, so a second run sends nothing
+        calls = self.geocoder.calls
+        self.assertEqual(utils.geocode_missing_listings(rate_limit=1000, geocoder=self.geocoder), (0, 0, None))
+        self.assertEqual(self.geocoder.calls, calls)
+        missing.refresh_from_db()
+        self.assertIsNone(missing.latitude)
+
+    def test_worker_stops_on_geocoder_error(self):
+        self.create_listing("700 Commonwealth Ave")
+        geocoded, unmatched, error = utils.geocode_missing_listings(geocoder=FailingGeocoder())
+        self.assertEqual((geocoded, unmatched), (0, 0))
+        self.assertIsInstance(error, utils.GeocodingError)
+
+
+class ListingGridQueryCountTest(TestCase):
+    """The listings page must take the same number of queries however many cards it shows."""
+
+    def setUp(self):
+        self.host = User.objects.create_user(username="host").userprofile
+
+    def create_listings(self, n):
+        """Create n listings, each with two photos, and commit them (the page cache sees commits only)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(n):
+                listing = Listing.objects.create(
+                    lister=self.host, title=f"listing {i}", description="room", price_per_month=1000 + i,
+                    address=f"{i} Bay State Rd", start_date=date(2026, 1, 1), end_date=date(2026, 6, 1), area="west",
+                )
+                ListingPhoto.objects.create(listing=listing, image_url=f"https://example.com/{i}-a.jpg")
+                ListingPhoto.objects.create(listing=listing, image_url=f"https://example.com/{i}-b.jpg")
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("show_all_listings"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_is_constant(self):
+        self.create_listings(1)
+        one, _ = self.count_queries()
+
+        self.create_listings(30)
+        many, response = self.count_queries()
+
+        self.assertEqual(one, many)
+        # each card shows its listing's first photo
+        self.assertContains(response, "https://example.com/29-a.jpg")
+        self.assertNotContains(response, "https://example.com/29-b.jpg")
+
+
+class ListingMapTest(TestCase):
+    """Viewport queries use geohash prefix ranges; the map endpoint returns listings or clusters."""
+
+    def setUp(self):
+        self.host = User.objects.create_user(username="host").userprofile
+
+    def create_listing(self, title, latitude, longitude):
+        return Listing.objects.create(
+            lister=self.host, title=title, description="room", price_per_month=1200, address=title,
+            start_date=date(2026, 1, 1), end_date=date(2026, 6, 1), area="west",
+            latitude=latitude, longitude=longitude,
+        )
+
+    def test_encode(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744), "u4pruydqq")
+
+    def test_cover_contains_every_point_of_the_viewport(self):
+        south, west, north, east = 42.33, -71.13, 42.37, -71.05
+        prefixes = geo.cover_prefixes(south, west, north, east)
+        self.assertLessEqual(len(prefixes), geo.MAX_COVER_CELLS)
+        self.assertGreater(min(len(prefix) for prefix in prefixes), 2)
+        for i in range(11):
+            for j in range(11):
+                point = geo.encode(south + (north - south) * i / 10, west + (east - west) * j / 10)
+                self.assertTrue(any(point.startswith(prefix) for prefix in prefixes), point)
+
+    def test_in_box(self):
+        inside = self.create_listing("BU", 42.3505, -71.1054)
+        self.create_listing("Cambridge", 42.3736, -71.1097)
+        self.create_listing("Providence", 41.824, -71.4128)
+        self.assertEqual(inside.geohash, geo.encode(42.3505, -71.1054))
+        found = geo.in_box(Listing.objects.all(), 42.34, -71.12, 42.36, -71.09)
+        self.assertEqual(list(found), [inside])
+
+    def test_map_endpoint(self):
+        for i in range(3):
+            self.create_listing(f"BU {i}", 42.3505 + i * 0.0001, -71.1054)
+        self.create_listing("Fenway", 42.3467, -71.0972)
+        self.create_listing("Providence", 41.824, -71.4128)
+        box = {"south": 42.34, "west": -71.12, "north": 42.36, "east": -71.09}
+
+        data = self.client.get(reverse("listing_map_data"), {**box, "zoom": 16}).json()
+        self.assertEqual(sorted(listing["title"] for listing in data["listings"]), ["BU 0", "BU 1", "BU 2", "Fenway"])
+        self.assertEqual(data["clusters"], [])
+
+        # zoomed out, the three BU listings share a cell and become one cluster
+        data = self.client.get(reverse("listing_map_data"), {**box, "zoom": 13}).json()
+        self.assertEqual([cluster["count"] for cluster in data["clusters"]], [3])
+        self.assertEqual([listing["title"] for listing in data["listings"]], ["Fenway"])
+
+    def test_map_endpoint_rejects_a_bad_viewport(self):
+        url = reverse("listing_map_data")
+        self.assertEqual(self.client.get(url, {"south": 42}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"south": "x", "west": 0, "north": 1, "east": 1}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"south": 43, "west": 0, "north": 42, "east": 1}).status_code, 400)
+
+
+class ListingSearchTest(TestCase):
+    """Listing search hides taken listings, sorts by price or relevance and pages by cursor."""
+
+    def setUp(self):
+        self.host = User.objects.create_user(username="host").userprofile
+
+    def create_listing(self, title, price, start, area="west", is_available=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Listing.objects.create(
+                lister=self.host, title=title, description="room", price_per_month=price, address=title,
+                start_date=start, end_date=date(2026, 12, 1), area=area, is_available=is_available,
+            )
+
+    def titles(self, params):
+        response = self.client.get(reverse("show_all_listings"), params)
+        self.assertEqual(response.status_code, 200)
+        return [listing.title for listing in response.context["listings"]]
+
+    def test_sorting_and_filters(self):
+        self.create_listing("cheap", 900, date(2026, 1, 1))
+        self.create_listing("middle", 1200, date(2026, 3, 1))
+        self.create_listing("pricey", 2000, date(2026, 2, 1))
+        self.create_listing("late", 1100, date(2026, 8, 1))
+        self.create_listing("taken", 800, date(2026, 1, 1), is_available=False)
+
+        self.assertEqual(self.titles({"sort": "price"}), ["cheap", "late", "middle", "pricey"])
+        self.assertEqual(self.titles({"sort": "price_desc", "max_price": 1500}), ["middle", "late", "cheap"])
+        # newest first without a date
+        self.assertEqual(self.titles({}), ["late", "pricey", "middle", "cheap"])
+        # with a "Start Before" date, the closest start on or before it first
+        self.assertEqual(self.titles({"start_date": "2026-04-01"}), ["middle", "pricey", "cheap"])
+
+    def test_pages(self):
+        for i in range(30):
+            self.create_listing(f"listing {i:02d}", 1000 + i, date(2026, 1, 1))
+
+        response = self.client.get(reverse("show_all_listings"), {"sort": "price"})
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 24)
+        self.assertIsNone(page.paginator.count) # no COUNT(*) for Previous / Next only
+        self.assertIn("sort=price", page.next_query)
+
+        response = self.client.get(f"{reverse('show_all_listings')}?{page.next_query}")
+        self.assertEqual([listing.title for listing in response.context["listings"]],
+                         [f"listing {i:02d}" for i in range(24, 30)])
+        self.assertFalse(response.context["page_obj"].has_next())
+
+    def test_bad_cursor_shows_the_first_page(self):
+        for i in range(30):
+            self.create_listing(f"listing {i:02d}", 1000 + i, date(2026, 1, 1))
+        first = self.titles({"sort": "price"})
+        for cursor in ("not-a-cursor", encode_cursor(["not-a-price", 1], "n", 2)):
+            response = self.client.get(reverse("show_all_listings"), {"sort": "price", "cursor": cursor})
+            self.assertEqual([listing.title for listing in response.context["listings"]], first)
+            self.assertFalse(response.context["page_obj"].has_previous())
+
+
+class InterestRequestDecisionTest(TestCase):
+    """Accepting a request closes the listing and its other requests in one transaction."""
+
+    def setUp(self):
+        self.host_user = User.objects.create_user(username="host")
+        self.listing = Listing.objects.create(
+            lister=self.host_user.userprofile, title="Bay State room", description="room", price_per_month=1200,
+            address="1 Bay State Rd", start_date=date(2026, 1, 1), end_date=date(2026, 6, 1), area="east",
+        )
+        self.requests = [
+            InterestRequest.objects.create(
+                listing=self.listing, requester=User.objects.create_user(username=f"sub{i}").userprofile,
+                message="interested",
+            )
+            for i in range(3)
+        ]
+        self.client.force_login(self.host_user)
+
+    def decide(self, req, status):
+        url = reverse("update_interest_request_status", kwargs={"pk": req.pk})
+        return self.client.post(url, {"status": status})
+
+    def test_accept(self):
+        chosen = self.requests[1]
+        with self.assertNumQueries(9):
+            self.decide(chosen, "accepted")
+
+        self.listing.refresh_from_db()
+        self.assertFalse(self.listing.is_available)
+        statuses = dict(InterestRequest.objects.values_list("pk", "status"))
+        self.assertEqual(statuses, {
+            self.requests[0].pk: "closed", chosen.pk: "accepted", self.requests[2].pk: "closed",
+        })
+        self.assertEqual(Notification.objects.get().recipient, chosen.requester)
+
+        # a second accept does nothing
+        self.decide(self.requests[0], "accepted")
+        self.assertEqual(InterestRequest.objects.get(pk=self.requests[0].pk).status, "closed")
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_taken_listing_takes_no_requests(self):
+        self.decide(self.requests[1], "accepted")
+        latecomer = User.objects.create_user(username="late")
+        self.client.force_login(latecomer)
+
+        response = self.client.get(reverse("listing", kwargs={"pk": self.listing.pk}))
+        self.assertContains(response, "No Longer Available")
+        self.assertNotContains(response, "Submit Interest")
+
+        url = reverse("create_interest_request", kwargs={"pk": self.listing.pk})
+        self.assertEqual(self.client.post(url, {"message": "still free?"}).status_code, 404)
+        self.assertFalse(InterestRequest.objects.filter(requester=latecomer.userprofile).exists())
+
+    def test_accepting_after_the_listing_was_taken_declines(self):
+        self.decide(self.requests[1], "accepted")
+        # e.g. sent from a page loaded before the listing was taken
+        late = InterestRequest.objects.create(
+            listing=self.listing, requester=User.objects.create_user(username="late").userprofile, message="me too",
+        )
+        self.decide(late, "accepted")
+
+        self.assertEqual(InterestRequest.objects.get(pk=late.pk).status, "declined")
+        notification = Notification.objects.get(recipient=late.requester)
+        self.assertIn("no longer available", notification.subject)
+
+    def test_decline(self):
+        self.decide(self.requests[0], "declined")
+        self.assertEqual(InterestRequest.objects.get(pk=self.requests[0].pk).status, "declined")
+        self.assertTrue(Listing.objects.get(pk=self.listing.pk).is_available)
+
+    def test_only_the_host_decides(self):
+        self.client.force_login(User.objects.get(username="sub0"))
+        response = self.decide(self.requests[0], "accepted")
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Listing.objects.get(pk=self.listing.pk).is_available)
+
+
+class ListingPageCacheTest(TestCase):
+    """The listings page is served from the view cache until a Listing or ListingPhoto changes."""
+
+    def setUp(self):
+        self.host_user = User.objects.create_user(username="host")
+        self.url = reverse("show_all_listings")
+
+    def create_listing(self, title):
+        # the listing version is bumped when the change commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return Listing.objects.create(
+                lister=self.host_user.userprofile, title=title, description="room", price_per_month=1200,
+                address="1 Bay State Rd", start_date=date(2026, 1, 1), end_date=date(2026, 6, 1), area="east",
+            )
+
+    def test_cached_until_a_listing_changes(self):
+        self.create_listing("First room")
+        self.assertEqual(self.client.get(self.url)["X-View-Cache"], "miss")
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-View-Cache"], "hit")
+
+        self.create_listing("Second room")
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-View-Cache"], "miss")
+        self.assertContains(response, "Second room")
 
-# Create your tests here.
+    def test_logged_in_users_get_their_own_entries(self):
+        self.create_listing("First room")
+        self.client.get(self.url)
+        self.client.force_login(self.host_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-View-Cache"], "miss")
+        self.assertContains(response, "Logout")
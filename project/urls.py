@@ -23,6 +23,7 @@ urlpatterns = [
 
     # Listings
     path('listings/', ListingListView.as_view(), name='show_all_listings'),
+    path('listings/map/', listing_map_data, name='listing_map_data'),
     path('listing/<int:pk>/', ListingDetailView.as_view(), name='listing'),
     path('listing/create/', CreateListingView.as_view(), name='create_listing'),
     path('listing/<int:pk>/update/', UpdateListingView.as_view(), name='update_listing'),
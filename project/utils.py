@@ -1,36 +1,251 @@
 # File: utils.py
 # Author: Luisa Vazquez Usabiaga. 12/08/2025
 # Description: Utility functions for geocoding addresses using Google Maps.
+#
+#   Notes:
+#   - Every result (including "no match") is stored in GeocodeCache under the
+#     normalized address, so an address is only ever looked up once.
+#   - Requests go through one pooled requests.Session with connect/read
+#     timeouts and retries with exponential backoff on 429/5xx responses.
+#   - settings.GEOCODER_BACKEND = "stub" swaps the API for StubGeocoder, which
+#     answers locally, so geocoding can run offline and in tests.
+#   - Listings are geocoded in bulk outside the request path by
+#     `manage.py geocode_listings` (geocode_missing_listings below).
+
+import hashlib
+import re
+import time
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .models import GeocodeCache, Listing
+
+GOOGLE_GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+# (connect, read) timeouts in seconds
+GEOCODE_TIMEOUT = (3.05, 10)
+
+
+class GeocodingError(Exception):
+    """
+    The geocoder could not answer right now (network error, quota, server
+    error). Unlike "no match", this is not cached and the address is retried later.
+    """
+
+
+def normalize_address(address):
+    """
+    Returns the address in the form used as its cache key: lowercase, with
+    punctuation dropped and runs of whitespace collapsed.
+    """
+    address = re.sub(r"[^\w\s]", " ", address.casefold())
+    return " ".join(address.split())
+
+
+def address_key(address):
+    """Returns the GeocodeCache key for an address."""
+    return hashlib.sha1(normalize_address(address).encode()).hexdigest()
+
+
+def make_session(pool_size=10, retries=3, backoff_factor=0.5):
+    """
+    Returns a requests.Session that reuses connections and retries idempotent
+    requests on connection errors and 429/5xx responses, waiting
+    backoff_factor * 2**n seconds between attempts.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class GoogleGeocoder:
+    """Looks addresses up with the Google Geocoding API."""
+
+    def __init__(self, api_key, session=None, url=GOOGLE_GEOCODE_URL):
+        self.api_key = api_key
+        self.session = session or make_session()
+        self.url = url
+
+    def lookup(self, address):
+        """
+        Returns (latitude, longitude), or None if the API has no match.
+        Raises GeocodingError when the API cannot answer right now.
+        """
+        try:
+            response = self.session.get(
+                self.url, params={"address": address, "key": self.api_key}, timeout=GEOCODE_TIMEOUT
+            )
+        except requests.RequestException as e:
+            raise GeocodingError(str(e)) from e
+
+        if response.status_code != 200:
+            raise GeocodingError(f"HTTP {response.status_code}")
+
+        data = response.json()
+        if data["status"] == "ZERO_RESULTS":
+            return None
+        if data["status"] != "OK":
+            # OVER_QUERY_LIMIT, REQUEST_DENIED, UNKNOWN_ERROR, ...
+            raise GeocodingError(data["status"])
+
+        location = data["results"][0]["geometry"]["location"]
+        return location["lat"], location["lng"]
+
+
+class StubGeocoder:
+    """
+    Offline stand-in for the Geocoding API: every address gets a stable,
+    made-up point within a few kilometers of BU. Addresses containing
+    "nowhere" have no match, to exercise that path.
+    """
+
+    center = (42.3505, -71.1054)
+    spread = 0.05
+
+    def __init__(self):
+        self.calls = 0
+
+    def lookup(self, address):
+        self.calls += 1
+        normalized = normalize_address(address)
+        if "nowhere" in normalized:
+            return None
+        digest = hashlib.sha1(normalized.encode()).digest()
+        lat_offset = int.from_bytes(digest[:4], "big") / 0xFFFFFFFF - 0.5
+        lng_offset = int.from_bytes(digest[4:8], "big") / 0xFFFFFFFF - 0.5
+        return self.center[0] + lat_offset * self.spread, self.center[1] + lng_offset * self.spread
+
+
+_geocoder = None
 
-def geocode_address(address):
+
+def get_geocoder():
+    """Returns the process-wide geocoder chosen by settings.GEOCODER_BACKEND."""
+    global _geocoder
+    backend = getattr(settings, "GEOCODER_BACKEND", "google")
+    expected = StubGeocoder if backend == "stub" else GoogleGeocoder
+    if not isinstance(_geocoder, expected):
+        _geocoder = StubGeocoder() if backend == "stub" else GoogleGeocoder(settings.GOOGLE_MAPS_API_KEY)
+    return _geocoder
+
+
+def cached_lookup(address, geocoder=None, before_request=None):
+    """
+    Returns (latitude, longitude) or None for an address, from GeocodeCache
+    when possible and otherwise from the geocoder (the result is then cached).
+    before_request, if given, is called just before the geocoder is asked.
+    Raises GeocodingError on a transient failure.
+    """
+    key = address_key(address)
+    cached = GeocodeCache.objects.filter(address_key=key).first()
+    if cached is not None:
+        return (cached.latitude, cached.longitude) if cached.latitude is not None else None
+
+    if before_request is not None:
+        before_request()
+    point = (geocoder or get_geocoder()).lookup(address)
+    GeocodeCache.objects.update_or_create(
+        address_key=key,
+        defaults={
+            "address": normalize_address(address),
+            "latitude": point[0] if point else None,
+            "longitude": point[1] if point else None,
+        },
+    )
+    return point
+
+
+def geocode_address(address, geocoder=None):
     """
     Takes a human-readable street address and returns (latitude, longitude).
     Returns (None, None) if the API fails or no result is found.
+    Answers from GeocodeCache when the address has been looked up before.
     """
+    if not address or not address.strip():
+        return None, None
 
-    if not address:
+    try:
+        point = cached_lookup(address, geocoder)
+    except GeocodingError:
         return None, None
 
-    api_key = settings.GOOGLE_MAPS_API_KEY
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
+    return point if point else (None, None)
 
-    params = {
-        "address": address,
-        "key": api_key
-    }
 
-    response = requests.get(url, params=params)
+class RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart."""
 
-    if response.status_code != 200:
-        return None, None
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.last = None
 
-    data = response.json()
+    def wait(self):
+        now = time.monotonic()
+        if self.last is not None and now < self.last + self.interval:
+            time.sleep(self.last + self.interval - now)
+        self.last = time.monotonic()
 
-    if data["status"] != "OK":
-        return None, None
 
-    location = data["results"][0]["geometry"]["location"]
-    return location["lat"], location["lng"]
+def geocode_missing_listings(batch_size=100, rate_limit=None, geocoder=None, log=None):
+    """
+    Fills in latitude/longitude for up to batch_size listings that have an
+    address but no coordinates, sending at most rate_limit API requests per
+    second (cache hits are free). Addresses with no match are cached as such
+    and skipped on later runs; a transient error stops the batch so the
+    worker can back off.
+
+    Returns (geocoded, unmatched, error) where error is the GeocodingError
+    that stopped the batch, or None.
+    """
+    geocoder = geocoder or get_geocoder()
+    limiter = RateLimiter(rate_limit or getattr(settings, "GEOCODER_RATE_LIMIT", 10))
+
+    # listings whose address is known to have no match keep null coordinates; skip them
+    unmatched_keys = set(GeocodeCache.objects.filter(latitude__isnull=True).values_list("address_key", flat=True))
+
+    pending = Listing.objects.filter(latitude__isnull=True).exclude(address="").only("pk", "address").order_by("pk")
+    geocoded = 0
+    unmatched = 0
+    last_pk = 0
+    while geocoded + unmatched < batch_size:
+        # read a page at a time instead of iterating while writing the same rows
+        page = list(pending.filter(pk__gt=last_pk)[:batch_size])
+        if not page:
+            break
+        for listing in page:
+            last_pk = listing.pk
+            if geocoded + unmatched >= batch_size:
+                break
+            if address_key(listing.address) in unmatched_keys:
+                continue
+
+            try:
+                point = cached_lookup(listing.address, geocoder, before_request=limiter.wait)
+            except GeocodingError as e:
+                return geocoded, unmatched, e
+
+            if point is None:
+                unmatched += 1
+                unmatched_keys.add(address_key(listing.address))
+                if log:
+                    log(f"no match for listing {listing.pk}: {listing.address}")
+                continue
+
+            listing.latitude, listing.longitude = point
+            # the pre_save signal recomputes the geohash from the new coordinates
+            listing.save(update_fields=["latitude", "longitude", "geohash"])
+            geocoded += 1
+
+    return geocoded, unmatched, None
@@ -4,12 +4,20 @@
 # profile creation, listings, interest requests, and main application workflows.
 
 from django.contrib.auth import login
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import JsonResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse_lazy
 from django.views.generic import *
+from cs412 import caching
+from cs412.caching import CachedViewMixin
+from cs412.pagination import KeysetPaginationMixin
+from cs412.uploads import StreamingUploadMixin
 from .models import *
 from .forms import *
+from . import geo
 
 
 
@@ -126,42 +134,85 @@ class UserProfileDetailView(DetailView):
 
 
 
-class ListingListView(ListView):
+def filter_listings(qs, params):
     """
-    Shows every listing in the marketplace. The map template reads latitude and
-    longitude from each listing and places pins accordingly.
+    Applies the listing search filters (price range, dates, area) from a
+    querystring. Shared by the listings page and its map endpoint so the map
+    always shows the same listings as the grid. Accepted listings are hidden;
+    the listing indexes only cover available ones.
     """
-    model = Listing
-    template_name = "project/show_all_listings.html"
-    context_object_name = "listings"
+    qs = qs.filter(is_available=True)
 
-    def get_queryset(self):
-        qs = Listing.objects.all()
+    min_price = params.get("min_price")
+    max_price = params.get("max_price")
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+    area = params.get("area")
+
+    if min_price:
+        qs = qs.filter(price_per_month__gte=min_price)
+
+    if max_price:
+        qs = qs.filter(price_per_month__lte=max_price)
+
+    if start_date:
+        qs = qs.filter(start_date__lte=start_date)
 
-        # Filters 
-        min_price = self.request.GET.get("min_price")
-        max_price = self.request.GET.get("max_price")
-        start_date = self.request.GET.get("start_date")
-        end_date = self.request.GET.get("end_date")
-        area = self.request.GET.get("area")
+    if end_date:
+        qs = qs.filter(end_date__gte=end_date)
 
-        # Apply filters 
-        if min_price:
-            qs = qs.filter(price_per_month__gte=min_price)
+    if area:
+        qs = qs.filter(area=area)
 
-        if max_price:
-            qs = qs.filter(price_per_month__lte=max_price)
+    return qs
+
+
+# ?sort= choices for the listings page
+LISTING_SORT_CHOICES = [
+    ("relevance", "Best match"),
+    ("price", "Price: low to high"),
+    ("price_desc", "Price: high to low"),
+]
+
+
+def listing_ordering(params):
+    """
+    Returns the order_by() columns for a listing search; each ends in a unique
+    column so it can drive keyset pagination.
+    - price / price_desc: by monthly price
+    - relevance: with a "Start Before" date, the listings whose availability
+      starts closest to (on or before) that date come first; otherwise the
+      newest listings come first
+    """
+    sort = params.get("sort")
+    if sort == "price":
+        return ["price_per_month", "id"]
+    if sort == "price_desc":
+        return ["-price_per_month", "-id"]
+    if params.get("start_date"):
+        return ["-start_date", "-id"]
+    return ["-id"]
 
-        if start_date:
-            qs = qs.filter(start_date__lte=start_date)
 
-        if end_date:
-            qs = qs.filter(end_date__gte=end_date)
+class ListingListView(CachedViewMixin, KeysetPaginationMixin, ListView):
+    """
+    Shows the available listings in the marketplace, 24 cards per page. The
+    map fetches the listings in its current viewport from listing_map_data
+    and places pins accordingly.
+    """
+    model = Listing
+    template_name = "project/show_all_listings.html"
+    context_object_name = "listings"
+    paginate_by = 24
+    count_mode = None # the page shows Previous / Next only, so skip the COUNT(*)
+    cache_models = [Listing, ListingPhoto] # see cs412/caching.py
 
-        if area:
-            qs = qs.filter(area=area)
+    def get_keyset_ordering(self):
+        return listing_ordering(self.request.GET)
 
-        return qs
+    def get_queryset(self):
+        # the card grid shows one photo per listing, fetched for all cards at once
+        return filter_listings(Listing.objects.with_cover_photo(), self.request.GET)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -171,6 +222,8 @@ class ListingListView(ListView):
         context["start_date"] = self.request.GET.get("start_date", "")
         context["end_date"] = self.request.GET.get("end_date", "")
         context["area_selected"] = self.request.GET.get("area", "")
+        context["sort_selected"] = self.request.GET.get("sort", "relevance")
+        context["sort_choices"] = LISTING_SORT_CHOICES
 
         # Send grouped area choices
         context["area_choices_grouped"] = Listing.AREA_GROUPED_CHOICES
@@ -179,6 +232,54 @@ class ListingListView(ListView):
 
 
 
+def listing_map_data(request):
+    """
+    JSON for the listings map: the listings inside the viewport given by
+    ?south=&west=&north=&east= (degrees) and ?zoom=, with the same filters as
+    the listings page. Below geo.CLUSTER_MAX_ZOOM nearby listings are merged
+    into clusters ({lat, lng, count}); a cluster of one is sent as a listing.
+    """
+    try:
+        south, west, north, east = (float(request.GET[key]) for key in ("south", "west", "north", "east"))
+        zoom = int(request.GET.get("zoom", geo.CLUSTER_MAX_ZOOM))
+    except (KeyError, ValueError):
+        return JsonResponse({"error": "south, west, north and east are required numbers"}, status=400)
+
+    if south > north or west > east:
+        return JsonResponse({"error": "expected south <= north and west <= east"}, status=400)
+
+    qs = geo.in_box(filter_listings(Listing.objects.exclude(geohash=""), request.GET), south, west, north, east)
+
+    clusters = []
+    listing_ids = []
+    if zoom < geo.CLUSTER_MAX_ZOOM:
+        for cell in geo.clusters(qs, zoom):
+            if cell["count"] == 1:
+                listing_ids.append(cell["first_id"])
+            else:
+                clusters.append({"lat": cell["lat"], "lng": cell["lng"], "count": cell["count"]})
+        listings = Listing.objects.filter(pk__in=listing_ids)
+    else:
+        listings = qs.order_by("pk")[:geo.MAX_MARKERS]
+
+    listings = [
+        {
+            "id": listing.pk,
+            "title": listing.title,
+            "lat": listing.latitude,
+            "lng": listing.longitude,
+            "price": str(listing.price_per_month),
+            "url": listing.get_absolute_url(),
+        }
+        for listing in listings.only("pk", "title", "latitude", "longitude", "price_per_month")
+    ]
+    return JsonResponse({
+        "clusters": clusters,
+        "listings": listings,
+        "truncated": len(clusters) + len(listings) >= geo.MAX_MARKERS,
+    })
+
+
 class ListingDetailView(DetailView):
     """
     Displays a specific listing with full details and shows interest request
@@ -198,7 +299,7 @@ class ListingDetailView(DetailView):
 
 
 
-class CreateListingView(LoginRequiredMixin, CreateView):
+class CreateListingView(StreamingUploadMixin, CreateView):
     """
     Allows a host to create a new listing. The current user is automatically
     assigned as the owner of the listing. Coordinates may be generated from
@@ -207,6 +308,8 @@ class CreateListingView(LoginRequiredMixin, CreateView):
     model = Listing
     form_class = ListingForm
     template_name = "project/create_listing.html"
+    # uploaded photos are streamed into storage by content hash, see cs412/uploads.py
+    upload_to = ListingPhoto._meta.get_field("image_file").upload_to
 
     def form_valid(self, form):
         listing = form.save(commit=False)
@@ -217,9 +320,11 @@ class CreateListingView(LoginRequiredMixin, CreateView):
         # Save with the assigned lister
         listing.save()
 
-        # Save uploaded photos
-        for file in self.request.FILES.getlist("image_files"):
-            ListingPhoto.objects.create(listing=listing, image_file=file)
+        # Store the uploaded photos (staged by the upload handler) and save them in one INSERT
+        ListingPhoto.objects.bulk_create([
+            ListingPhoto(listing=listing, image_file=name) for name in self.store_uploads()
+        ])
+        caching.bump_model_version(ListingPhoto) # bulk_create sends no signals
 
         return super().form_valid(form)
 
@@ -236,6 +341,15 @@ class UpdateListingView(LoginRequiredMixin, UpdateView):
     def get_queryset(self):
         return Listing.objects.filter(lister=self.request.user.userprofile)
 
+    def form_valid(self, form):
+        # A new address typed without picking an autocomplete suggestion keeps
+        # the old coordinates; clear them so the geocode_listings worker
+        # geocodes the new address instead of leaving a misplaced pin.
+        if "address" in form.changed_data and not {"latitude", "longitude"} & set(form.changed_data):
+            form.instance.latitude = None
+            form.instance.longitude = None
+        return super().form_valid(form)
+
 
 
 class DeleteListingView(LoginRequiredMixin, DeleteView):
@@ -262,7 +376,8 @@ class CreateInterestRequestView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         request_obj = form.save(commit=False)
-        request_obj.listing = Listing.objects.get(pk=self.kwargs["pk"])
+        # a listing that is already taken takes no more requests
+        request_obj.listing = get_object_or_404(Listing, pk=self.kwargs["pk"], is_available=True)
         request_obj.requester = self.request.user.userprofile
         request_obj.save()
         return redirect("my_interest_requests")
@@ -290,10 +405,12 @@ class ManageInterestRequestsView(LoginRequiredMixin, ListView):
     context_object_name = "interest_requests"
 
     def get_queryset(self):
-        # Only requests for listings owned by the logged-in host
+        # Only requests for this listing, if it is owned by the logged-in host;
+        # requests closed by accepting someone else need no decision
         return InterestRequest.objects.filter(
+            listing__pk=self.kwargs.get("pk"),
             listing__lister=self.request.user.userprofile
-        )
+        ).exclude(status="closed").select_related("requester")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -337,29 +454,63 @@ class SubletterListView(ListView):
 
 
 
+@login_required
 def update_interest_request_status(request, pk):
     """
-    Updates host decision on an interest request.
-    - If accepter: delete listing + all its interest requests
-    - If declined: delete only this request
+    Updates host decision on an interest request, as one transaction.
+    - If accepted: the request is marked accepted, the listing is taken off
+      the market (is_available = False) and every other pending request for
+      it is closed with a single UPDATE. Nothing is deleted, so there is no
+      cascade collector loading rows into Python. The requester gets a
+      queued Notification, emailed later by `manage.py send_notifications`.
+      If the listing was already taken (another tab, a request sent before
+      it was), this request is declined instead and its requester notified.
+    - If declined: only this request is marked declined.
+    Only the listing's host may decide.
     """
-    req = get_object_or_404(InterestRequest, pk=pk)
+    req = get_object_or_404(
+        InterestRequest.objects.select_related("listing__lister", "requester"),
+        pk=pk, listing__lister__user=request.user,
+    )
     listing = req.listing
 
     if request.method == "POST":
         status = request.POST.get("status")
 
         if status == "accepted":
-            # Delete all requests for this listing
-            InterestRequest.objects.filter(listing=listing).delete()
-            # Delete the listing
-            listing.delete()
+            with transaction.atomic():
+                # the conditional UPDATE makes a second accept (double submit,
+                # two tabs) a no-op instead of accepting two requests
+                taken = Listing.objects.filter(pk=listing.pk, is_available=True).update(is_available=False)
+                if taken:
+                    InterestRequest.objects.filter(pk=req.pk).update(status="accepted")
+                    InterestRequest.objects.filter(listing=listing, status="pending").exclude(pk=req.pk).update(status="closed")
+                    Notification.objects.create(
+                        recipient=req.requester,
+                        subject=f"Your request for {listing.title} was accepted",
+                        message=(
+                            f"Good news! {listing.lister.display_name} accepted your interest request "
+                            f"for {listing.title} ({listing.address}). Reach out to them at "
+                            f"{listing.lister.email} to arrange the details."
+                        ),
+                    )
+                elif InterestRequest.objects.filter(pk=req.pk, status="pending").update(status="declined"):
+                    Notification.objects.create(
+                        recipient=req.requester,
+                        subject=f"{listing.title} is no longer available",
+                        message=(
+                            f"Sorry, {listing.lister.display_name} has already accepted another request "
+                            f"for {listing.title} ({listing.address})."
+                        ),
+                    )
+            if taken:
+                # the UPDATE skips the signals; the listing is off the market now
+                caching.bump_model_version(Listing)
             return redirect("show_all_listings")
 
         elif status == "declined":
-            # delete only this request
-            req.delete()
+            InterestRequest.objects.filter(pk=req.pk, status="pending").update(status="declined")
             return redirect("manage_interest_requests", pk=listing.pk)
 
     # fallback
-    return redirect("manage_interest_requests", pk=listing.pk)
\ No newline at end of file
+    return redirect("manage_interest_requests", pk=listing.pk)
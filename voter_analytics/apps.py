@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class VoterAnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'voter_analytics'
+
+    def ready(self):
+        import voter_analytics.signals
+        from cs412 import caching
+        # the cached voter pages and facets.py follow these versions
+        caching.watch_models([self.get_model('Voter'), self.get_model('VoterRollup')])
@@ -0,0 +1,61 @@
+# File: facets.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: the choices (with counts) offered by the voter list filter form.
+#
+#   Notes:
+#   - The party, birth year and voter score lists are read from the rollup
+#     table (one small query) instead of three DISTINCT scans over Voter, and
+#     the result is kept in each process's cache.
+#   - The entry is keyed on the VoterRollup model version, which lives in the
+#     shared "views" cache (cs412/caching.py). rollups.apply() and
+#     rollups.rebuild() bump it through invalidate() once their transaction
+#     commits, and sync_analytics() bumps it for the new snapshot, so every
+#     worker process follows every single-voter edit, import, rebuild and
+#     sync; the timeout only bounds writes that bypass the rollups.
+
+from django.core.cache import cache
+
+from cs412 import caching
+
+from .models import VoterRollup
+
+CACHE_KEY = 'voter_facets'
+CACHE_TIMEOUT = 60 * 60
+
+
+def compute_facets():
+    '''Return {'party': [(code, count)], 'year': [...], 'score': [...]}, each sorted by value.'''
+    party = {}
+    year = {}
+    score = {}
+    rows = VoterRollup.objects.filter(kind__in=['party', 'birth_year', 'voter_score'], count__gt=0)
+    for kind, key, count in rows.values_list('kind', 'key', 'count'):
+        if kind == 'party':
+            # the list filters on the normalized party_code, so merge e.g. 'l' into 'L'
+            code = key.strip().upper()
+            if code:
+                party[code] = party.get(code, 0) + count
+        elif kind == 'birth_year':
+            year[int(key)] = count
+        elif key not in ('', 'None'):
+            score[int(key)] = count
+    return {
+        'party': sorted(party.items()),
+        'year': sorted(year.items()),
+        'score': sorted(score.items()),
+    }
+
+
+def get_facets():
+    '''Return the cached facet lists for the current rollup version, computing them on a miss.'''
+    key = f'{CACHE_KEY}:{caching.get_model_version(VoterRollup)}'
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets()
+        cache.set(key, facets, timeout=CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate():
+    '''Bump the rollup version, so every process recomputes its facet lists (and cached voter pages).'''
+    caching.bump_model_version(VoterRollup)
@@ -0,0 +1,59 @@
+# File: filters.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: turns the voter list's GET parameters into index-friendly
+#   (sargable) filters.
+#
+#   Notes:
+#   - party is matched with plain equality on the normalized party_code column
+#     instead of party__iexact (which wraps the column in UPPER()).
+#   - birth year bounds are a range on the stored birth_year column instead of
+#     date_birth__year (which wraps the column in a date function).
+#   - Malformed values (e.g. ?min_year=abc) are ignored rather than raising,
+#     and only known election flags are accepted.
+#   - The indexes these predicates use are declared on Voter.Meta.
+
+from .models import Voter
+from .rollups import ELECTION_FIELDS
+
+
+def to_int(value):
+    '''Return value as an int, or None if it is blank or not a number.'''
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+class VoterFilter:
+    '''The validated filter choices from one voter list request.'''
+
+    def __init__(self, params):
+        '''params is a QueryDict (request.GET) or any mapping with getlist().'''
+        self.party = (params.get('party') or '').strip().upper() or None
+        self.min_year = to_int(params.get('min_year'))
+        self.max_year = to_int(params.get('max_year'))
+        self.voter_score = to_int(params.get('voter_score'))
+        # checkbox values are e.g. "20state"; keep the order of ELECTION_FIELDS
+        chosen = {f"v{election}" for election in params.getlist('elections')}
+        self.elections = [field for field in ELECTION_FIELDS if field in chosen]
+
+    def get_filters(self):
+        '''Return the keyword filters for Voter.objects.filter().'''
+        filters = {}
+        if self.party:
+            filters['party_code'] = self.party
+        if self.min_year is not None:
+            filters['birth_year__gte'] = self.min_year
+        if self.max_year is not None:
+            filters['birth_year__lte'] = self.max_year
+        if self.voter_score is not None:
+            filters['voter_score'] = self.voter_score
+        for field in self.elections:
+            filters[field] = 1
+        return filters
+
+    def apply(self, queryset=None):
+        '''Return queryset (all voters by default) narrowed by these filters.'''
+        if queryset is None:
+            queryset = Voter.objects.all()
+        return queryset.filter(**self.get_filters())
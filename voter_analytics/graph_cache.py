@@ -0,0 +1,128 @@
+# File: graph_cache.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: server-side cache for the rendered Plotly graph divs on the
+#   voter graphs page.
+#
+#   Notes:
+#   - The divs are cached under a data version stamp: a hash of the rollup
+#     rows they are drawn from. Any import or edit that changes the rollups
+#     changes the stamp, so stale graphs are never served and nothing has to
+#     be invalidated by hand.
+#   - The divs are rendered without the plotly.js bundle (include_plotlyjs=False);
+#     graphs.html loads it once as a static file instead.
+#   - Hits and misses are counted in the cache and logged.
+
+import hashlib
+import logging
+
+import plotly
+import plotly.graph_objs as go
+from django.core.cache import cache
+
+from . import rollups
+from .models import VoterRollup
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'voter_graphs'
+
+# rendered divs are kept for a day; a new stamp makes them unreachable sooner
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_version():
+    '''Return a short stamp that changes whenever the graphed voter data changes.'''
+    rows = VoterRollup.objects.filter(count__gt=0).order_by('kind', 'key').values_list('kind', 'key', 'count')
+    return hashlib.sha1(repr(list(rows)).encode()).hexdigest()[:16]
+
+
+def plot_div(data, layout):
+    '''Render one figure to an HTML div that relies on a separately loaded plotly.js.'''
+    return plotly.offline.plot(
+        {"data": data, "layout": layout},
+        auto_open=False,
+        output_type="div",
+        include_plotlyjs=False,
+    )
+
+
+def render_graph_divs():
+    '''Build the three graph divs from the rollups.'''
+    divs = {}
+
+    ## for the histogram
+    voters_by_year = sorted((int(year), count) for year, count in rollups.get_counts('birth_year').items())
+    years = [year for year, count in voters_by_year]
+    counts = [count for year, count in voters_by_year]
+
+    divs['graph_div_birth'] = plot_div(
+        [go.Bar(x=years, y=counts, marker_color='blue')],
+        go.Layout(
+            title=f"Voter distribution by Year of Birth (n={sum(counts)})",
+            xaxis_title="Year of Birth",
+            yaxis_title="Number of Voters"
+        ),
+    )
+
+    ## for the pie chart
+    party_counts = sorted(rollups.get_counts('party').items())
+    party_labels = [party for party, count in party_counts]
+    party_values = [count for party, count in party_counts]
+
+    divs['graph_div_party'] = plot_div(
+        [go.Pie(labels=party_labels, values=party_values, hole=0)],
+        go.Layout(title=f"Voter distribution by Party Affiliation (n={sum(party_values)})"),
+    )
+
+    ## for the bar chart
+    election_fields = rollups.ELECTION_FIELDS
+    election_rollup = rollups.get_counts('election')
+    election_counts = [election_rollup.get(field, 0) for field in election_fields]
+
+    divs['graph_div_elections'] = plot_div(
+        [go.Bar(x=election_fields, y=election_counts, marker_color='purple')],
+        go.Layout(
+            title=f"Vote Count by Election (n={rollups.get_total()})",
+            xaxis_title="Election",
+            yaxis_title="Voters Who Participated"
+        ),
+    )
+
+    return divs
+
+
+def record(outcome):
+    '''Count a cache hit or miss.'''
+    key = f'{CACHE_PREFIX}:{outcome}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # the counter was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    '''Return {'hits': n, 'misses': n} since the cache was last cleared.'''
+    return {
+        'hits': cache.get(f'{CACHE_PREFIX}:hit', 0),
+        'misses': cache.get(f'{CACHE_PREFIX}:miss', 0),
+    }
+
+
+def get_graph_divs():
+    '''Return (divs, hit): the graph divs for the current data, rendering them only on a miss.'''
+    version = get_version()
+    key = f'{CACHE_PREFIX}:divs:{version}'
+
+    divs = cache.get(key)
+    if divs is not None:
+        record('hit')
+        logger.debug("voter graphs cache hit (version %s)", version)
+        return divs, True
+
+    record('miss')
+    logger.info("voter graphs cache miss (version %s), rendering", version)
+    divs = render_graph_divs()
+    cache.set(key, divs, timeout=CACHE_TIMEOUT)
+    return divs, False
@@ -0,0 +1,230 @@
+# File: importer.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: streaming, batched CSV importer for the Newton voter file.
+#
+#   Rows are read with the csv module, converted with typed converters and
+#   inserted with bulk_create, one transaction per batch. Rows that fail to
+#   convert are written to a sidecar "rejects" CSV with the reason instead of
+#   being printed. Rows are keyed on voter_id: in the default insert mode rows
+#   whose voter_id already exists are skipped, in upsert mode they update the
+#   existing voter, so re-importing the same file is idempotent either way.
+#   Voters stored before voter_id existed (migration 0004 left it NULL) are
+#   matched on NATURAL_KEY and given their id on the first import, so they
+#   are updated or skipped like the others instead of inserted twice.
+#   Each batch also applies its change to the graph rollups (rollups.py).
+
+import csv
+import time
+from datetime import date
+
+from django.db import transaction
+
+from cs412 import caching
+
+from . import rollups
+from .models import Voter
+
+
+def to_int(value):
+    '''Convert a required integer column.'''
+    return int(value.strip())
+
+
+def to_optional_int(value):
+    '''Convert an optional integer column; blank becomes None.'''
+    value = value.strip()
+    return int(value) if value else None
+
+
+def to_date(value):
+    '''Convert a required YYYY-MM-DD date column.'''
+    return date.fromisoformat(value.strip())
+
+
+def to_optional_date(value):
+    '''Convert an optional YYYY-MM-DD date column; blank becomes None.'''
+    value = value.strip()
+    return date.fromisoformat(value) if value else None
+
+
+def to_text(value):
+    '''Strip surrounding whitespace from a text column.'''
+    return value.strip()
+
+
+def to_party(value):
+    '''Convert the two letter party code; blank becomes None.'''
+    value = value.strip()
+    if len(value) > 2:
+        raise ValueError(f"party code too long: {value!r}")
+    return value or None
+
+
+def to_flag(value):
+    '''Convert a TRUE/FALSE election participation column to 1/0.'''
+    value = value.strip().upper()
+    if value not in ('TRUE', 'FALSE', ''):
+        raise ValueError(f"not a TRUE/FALSE flag: {value!r}")
+    return 1 if value == 'TRUE' else 0
+
+
+# (model field, converter) for each CSV column, in file order
+COLUMNS = [
+    ('voter_id', to_text),
+    ('last_name', to_text),
+    ('first_name', to_text),
+    ('address_street_number', to_int),
+    ('address_street_name', to_text),
+    ('address_apartment_number', to_optional_int),
+    ('address_zip_code', to_int),
+    ('date_birth', to_date),
+    ('date_registration', to_optional_date),
+    ('party', to_party),
+    ('precinct_number', to_text),
+    ('v20state', to_flag),
+    ('v21town', to_flag),
+    ('v21primary', to_flag),
+    ('v22general', to_flag),
+    ('v23town', to_flag),
+    ('voter_score', to_int),
+]
+
+# what identified a voter before voter_id was stored
+NATURAL_KEY = ['last_name', 'first_name', 'date_birth', 'address_street_number',
+               'address_street_name', 'address_apartment_number', 'address_zip_code']
+
+# fields refreshed on an existing voter in upsert mode
+UPDATE_FIELDS = [field for field, _ in COLUMNS if field != 'voter_id'] + ['party_code', 'birth_year']
+
+
+def parse_row(row):
+    '''Return a dict of typed field values for one CSV row, or raise ValueError.'''
+    if len(row) < len(COLUMNS):
+        raise ValueError(f"expected {len(COLUMNS)} columns, got {len(row)}")
+    values = {field: convert(raw) for (field, convert), raw in zip(COLUMNS, row)}
+    if not values['voter_id']:
+        raise ValueError("missing voter id")
+    return values
+
+
+def natural_key(voter):
+    return tuple(getattr(voter, field) for field in NATURAL_KEY)
+
+
+def claim_unkeyed_voters(voters):
+    '''
+    Give stored voters without a voter_id the id of the incoming voter with
+    the same NATURAL_KEY. Return {voter_id: stored voter} for the ones claimed.
+    '''
+    wanted = {}
+    for voter in voters:
+        wanted.setdefault(natural_key(voter), voter.voter_id)
+    if not wanted:
+        return {}
+
+    claimed = {}
+    candidates = Voter.objects.filter(
+        voter_id__isnull=True, last_name__in={voter.last_name for voter in voters},
+    ).only(*NATURAL_KEY, *rollups.ROLLUP_FIELDS)
+    for stored in candidates:
+        voter_id = wanted.pop(natural_key(stored), None)
+        if voter_id is not None:
+            stored.voter_id = voter_id
+            claimed[voter_id] = stored
+    Voter.objects.bulk_update(claimed.values(), ['voter_id'])
+    return claimed
+
+
+class ImportStats:
+    '''Counters reported at the end of an import.'''
+
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"read {self.read} rows, wrote {self.written}, rejected {self.rejected} "
+                f"in {self.seconds:.1f}s ({self.rows_per_second:.0f} rows/s)")
+
+
+def import_voters(lines, batch_size=5000, upsert=False, rejects=None, has_header=True, progress=None):
+    '''
+    Import voters from an iterable of CSV text lines (an open file or stdin).
+
+    batch_size -- rows per bulk_create / transaction
+    upsert     -- update existing voters with the same voter_id (otherwise they are skipped)
+    rejects    -- optional writable text file that receives rejected rows plus an error column
+    progress   -- optional callable(stats) called after every batch
+    Returns an ImportStats.
+    '''
+    reader = csv.reader(lines)
+    writer = csv.writer(rejects) if rejects is not None else None
+    stats = ImportStats()
+
+    if has_header:
+        header = next(reader, None)
+        if writer is not None and header is not None:
+            writer.writerow(header + ['error'])
+
+    def flush(batch):
+        # one voter per id; in upsert mode the last row wins, like the database would
+        by_id = {}
+        for voter in batch:
+            if upsert or voter.voter_id not in by_id:
+                by_id[voter.voter_id] = voter
+
+        with transaction.atomic():
+            existing = {
+                voter.voter_id: voter
+                for voter in Voter.objects.filter(voter_id__in=list(by_id)).only('voter_id', *rollups.ROLLUP_FIELDS)
+            }
+            existing.update(claim_unkeyed_voters([
+                voter for voter_id, voter in by_id.items() if voter_id not in existing
+            ]))
+            if upsert:
+                voters = list(by_id.values())
+                Voter.objects.bulk_create(voters, update_conflicts=True,
+                                          unique_fields=['voter_id'], update_fields=UPDATE_FIELDS)
+                rollups.apply(rollups.diff(existing.values(), voters))
+            else:
+                voters = [voter for voter_id, voter in by_id.items() if voter_id not in existing]
+                Voter.objects.bulk_create(voters)
+                rollups.apply(rollups.diff([], voters))
+        # bulk_create sends no signals, so invalidate the cached voter pages here
+        caching.bump_model_version(Voter)
+        stats.written += len(voters)
+        if progress is not None:
+            progress(stats)
+
+    batch = []
+    for row in reader:
+        if not row:
+            continue
+        stats.read += 1
+        try:
+            voter = Voter(**parse_row(row))
+        except ValueError as e:
+            stats.rejected += 1
+            if writer is not None:
+                writer.writerow(row + [str(e)])
+            continue
+        # bulk_create skips Voter.save(), so fill the derived filter columns here
+        voter.set_derived_fields()
+        batch.append(voter)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    return stats
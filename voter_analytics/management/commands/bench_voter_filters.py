@@ -0,0 +1,135 @@
+# File: bench_voter_filters.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: benchmark of the voter list filters. Times the common filter
+#   combinations with the old predicates (party__iexact, date_birth__year) and
+#   with the sargable ones from filters.py, and prints the query plan of each.
+#   Runs against a throwaway test database seeded with synthetic voters, so the
+#   real db.sqlite3 is never touched.
+#
+#   python manage.py bench_voter_filters --rows 1000000
+
+import random
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+
+from cs412 import database
+from voter_analytics.filters import VoterFilter
+from voter_analytics.models import Voter
+
+PARTIES = ['D', 'R', 'U', 'L', 'J', 'CC', 'G', 'Q']
+PARTY_WEIGHTS = [40, 15, 40, 1, 1, 1, 1, 1]
+LAST_NAMES = [f'Name{i}' for i in range(5000)]
+
+# (label, query string) in the form VoterListView receives it
+COMBINATIONS = [
+    ("no filter", ""),
+    ("party", "party=r"),
+    ("year range", "min_year=1980&max_year=1989"),
+    ("party + years", "party=d&min_year=1960&max_year=1970"),
+    ("score", "voter_score=5"),
+    ("one election", "elections=22general"),
+    ("party + score + 2 elections", "party=u&voter_score=3&elections=21town&elections=23town"),
+    ("everything", "party=d&min_year=1950&max_year=1990&voter_score=4&elections=20state&elections=22general"),
+]
+
+
+def old_filter(params):
+    '''The filter VoterListView used before filters.py, for comparison.'''
+    voters = Voter.objects.all()
+    if params.get('party'):
+        voters = voters.filter(party__iexact=params['party'])
+    if params.get('min_year'):
+        voters = voters.filter(date_birth__year__gte=params['min_year'])
+    if params.get('max_year'):
+        voters = voters.filter(date_birth__year__lte=params['max_year'])
+    if params.get('voter_score'):
+        voters = voters.filter(voter_score=params['voter_score'])
+    for election in params.getlist('elections'):
+        voters = voters.filter(**{f"v{election}": 1})
+    return voters
+
+
+class Command(BaseCommand):
+    help = "Time the voter list filter combinations, old predicates vs indexed ones, on synthetic voters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--plans', action='store_true', help="also print the query plan of each combination")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # the seeded test database, not the analytics snapshot
+            with database.use_primary():
+                self.seed(options['rows'])
+                self.run(options['repeat'], options['page_size'], options['plans'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, rows):
+        '''Insert synthetic Voters in bulk (no signals), with their derived columns set.'''
+        rng = random.Random(412)
+        start = time.perf_counter()
+        batch = []
+        with transaction.atomic():
+            for i in range(rows):
+                flags = [1 if rng.random() < p else 0 for p in (0.7, 0.3, 0.2, 0.5, 0.25)]
+                voter = Voter(
+                    voter_id=f'B{i:09d}',
+                    last_name=rng.choice(LAST_NAMES),
+                    first_name=f'First{rng.randrange(2000)}',
+                    address_street_number=rng.randrange(1, 400),
+                    address_street_name='Commonwealth Ave',
+                    address_zip_code=2459,
+                    date_birth=date(rng.randint(1925, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+                    party=rng.choices(PARTIES, PARTY_WEIGHTS)[0],
+                    v20state=flags[0], v21town=flags[1], v21primary=flags[2], v22general=flags[3], v23town=flags[4],
+                    voter_score=sum(flags),
+                )
+                voter.set_derived_fields()
+                batch.append(voter)
+                if len(batch) == 10000:
+                    Voter.objects.bulk_create(batch)
+                    batch = []
+            Voter.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.stdout.write(f"seeded {rows} voters in {time.perf_counter() - start:.1f}s")
+
+    def time_call(self, repeat, fn):
+        '''Return the median wall time of fn() in milliseconds.'''
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def run(self, repeat, page_size, plans):
+        '''Time one list page (count + first page, in name order) for each combination.'''
+        self.stdout.write(f"{'filter':<30}{'old ms':>10}{'new ms':>10}{'matches':>10}")
+        for label, query in COMBINATIONS:
+            params = QueryDict(query)
+            old_qs = old_filter(params).order_by('last_name', 'first_name', 'id')
+            new_qs = VoterFilter(params).apply().order_by('last_name', 'first_name', 'id')
+
+            def page(qs):
+                def fn():
+                    qs.count()
+                    list(qs[:page_size])
+                return fn
+
+            old = self.time_call(repeat, page(old_qs))
+            new = self.time_call(repeat, page(new_qs))
+            self.stdout.write(f"{label:<30}{old:>10.1f}{new:>10.1f}{new_qs.count():>10}")
+            if plans:
+                self.stdout.write(f"    old: {old_qs[:page_size].explain()}")
+                self.stdout.write(f"    new: {new_qs[:page_size].explain()}")
@@ -0,0 +1,58 @@
+# File: import_voters.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: management command that streams a voter CSV into the Voter table.
+#
+#   python manage.py import_voters newton_voters.csv --batch-size 5000 --upsert
+#   cat newton_voters.csv | python manage.py import_voters -
+
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voter_analytics.importer import import_voters
+
+
+class Command(BaseCommand):
+    help = "Import voters from a CSV file (or '-' for stdin) in batched transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file to import, or '-' to read stdin")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="rows per bulk insert / transaction")
+        parser.add_argument('--upsert', action='store_true',
+                            help="update voters whose voter id already exists instead of skipping them")
+        parser.add_argument('--rejects',
+                            help="where to write rejected rows (default: <path>.rejects.csv, or voter_rejects.csv for stdin)")
+        parser.add_argument('--no-header', action='store_true',
+                            help="the first row is data, not a header")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        rejects_path = options['rejects'] or ('voter_rejects.csv' if path == '-' else f'{path}.rejects.csv')
+
+        def progress(stats):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {stats}")
+
+        try:
+            source = nullcontext(sys.stdin) if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f"cannot open {path}: {e}")
+
+        with source as lines, open(rejects_path, 'w', newline='', encoding='utf-8') as rejects:
+            stats = import_voters(
+                lines,
+                batch_size=options['batch_size'],
+                upsert=options['upsert'],
+                rejects=rejects,
+                has_header=not options['no_header'],
+                progress=progress,
+            )
+
+        self.stdout.write(self.style.SUCCESS(str(stats)))
+        if stats.rejected:
+            self.stdout.write(f"rejected rows written to {rejects_path}")
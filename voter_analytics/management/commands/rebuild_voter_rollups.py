@@ -0,0 +1,19 @@
+# File: rebuild_voter_rollups.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: management command that recomputes the voter graph rollups from
+#   scratch, e.g. after editing voters with raw SQL or queryset.update().
+
+from django.core.management.base import BaseCommand
+
+from cs412 import database
+from voter_analytics import rollups
+from voter_analytics.models import VoterRollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the pre-aggregated voter counts used by the graphs page."
+
+    def handle(self, *args, **options):
+        rollups.rebuild()
+        with database.use_primary():
+            self.stdout.write(f"Rebuilt {VoterRollup.objects.count()} rollup rows for {rollups.get_total()} voters")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0003_auto_20251029_2032'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voter',
+            name='voter_id',
+            field=models.CharField(blank=True, max_length=20, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:37
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import ExtractYear
+
+ELECTION_FIELDS = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
+
+
+def fill_rollups(apps, schema_editor):
+    '''Compute the initial rollups from the existing voters.'''
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    VoterRollup = apps.get_model('voter_analytics', 'VoterRollup')
+
+    rows = [VoterRollup(kind='total', key='', count=Voter.objects.count())]
+    by_year = (Voter.objects.annotate(year=ExtractYear('date_birth')).exclude(year__isnull=True)
+               .values('year').annotate(n=Count('id')))
+    rows += [VoterRollup(kind='birth_year', key=str(r['year']), count=r['n']) for r in by_year]
+    by_party = Voter.objects.exclude(party__isnull=True).exclude(party='').values('party').annotate(n=Count('id'))
+    rows += [VoterRollup(kind='party', key=r['party'], count=r['n']) for r in by_party]
+    by_score = Voter.objects.values('voter_score').annotate(n=Count('id'))
+    rows += [VoterRollup(kind='voter_score', key=str(r['voter_score']), count=r['n']) for r in by_score]
+    elections = Voter.objects.aggregate(**{f: Count('id', filter=Q(**{f: 1})) for f in ELECTION_FIELDS})
+    rows += [VoterRollup(kind='election', key=f, count=n) for f, n in elections.items()]
+    VoterRollup.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0004_voter_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('total', 'All voters'), ('birth_year', 'Year of birth'), ('party', 'Party affiliation'), ('election', 'Voted in election'), ('voter_score', 'Voter score')], max_length=20)),
+                ('key', models.CharField(blank=True, max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='unique_voter_rollup')],
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:39
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import ExtractYear, NullIf, Trim, Upper
+
+
+def fill_derived_fields(apps, schema_editor):
+    '''Set party_code and birth_year on the existing voters in one UPDATE.'''
+    Voter = apps.get_model('voter_analytics', 'Voter')
+    Voter.objects.update(
+        party_code=NullIf(Upper(Trim('party')), Value('')),
+        birth_year=ExtractYear('date_birth'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voter_analytics', '0005_voterrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voter',
+            name='birth_year',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='party_code',
+            field=models.CharField(blank=True, editable=False, max_length=2, null=True),
+        ),
+        migrations.RunPython(fill_derived_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='voter_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['party_code', 'last_name', 'first_name'], name='voter_party_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['voter_score', 'last_name', 'first_name'], name='voter_score_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['birth_year'], name='voter_birth_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['party_code', 'birth_year'], name='voter_party_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['voter_score', 'party_code', 'birth_year'], name='voter_score_party_year_idx'),
+        ),
+    ]
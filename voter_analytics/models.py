@@ -3,6 +3,7 @@ from django.db import models
 # Create your models here.
 
 class Voter (models.Model):
+    voter_id = models.CharField(max_length=20, unique=True, blank=True, null=True) # "Voter ID Number" from the CSV, used as the import key
     first_name = models.TextField(blank = True)
     last_name = models.TextField(blank = True)
     address_street_number = models.IntegerField(blank= True)
@@ -20,6 +21,38 @@ class Voter (models.Model):
     v23town = models.IntegerField(blank=True, null=True)
     voter_score = models.IntegerField(default=0)
 
+    # derived columns kept in step with party / date_birth by set_derived_fields(),
+    # so VoterListView can filter on plain indexed equality and range predicates
+    # instead of party__iexact and date_birth__year, which no index can serve
+    party_code = models.CharField(max_length=2, blank=True, null=True, editable=False) # party, trimmed and upper-cased
+    birth_year = models.SmallIntegerField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # default ordering of the voter list, also the tiebreak for keyset paging
+            models.Index(fields=['last_name', 'first_name', 'id'], name='voter_name_idx'),
+            # equality filter + ordering: the page can be read straight off the index
+            models.Index(fields=['party_code', 'last_name', 'first_name'], name='voter_party_name_idx'),
+            models.Index(fields=['voter_score', 'last_name', 'first_name'], name='voter_score_name_idx'),
+            # birth year ranges, alone or after a party filter
+            models.Index(fields=['birth_year'], name='voter_birth_year_idx'),
+            models.Index(fields=['party_code', 'birth_year'], name='voter_party_year_idx'),
+            # score is the most selective filter; combined with party and/or years
+            models.Index(fields=['voter_score', 'party_code', 'birth_year'], name='voter_score_party_year_idx'),
+        ]
+
+    def set_derived_fields(self):
+        '''Recompute party_code and birth_year; bulk_create callers must call this themselves.'''
+        self.party_code = (self.party or '').strip().upper() or None
+        self.birth_year = self.date_birth.year if self.date_birth else None
+
+    def save(self, *args, **kwargs):
+        self.set_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'party', 'date_birth'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'party_code', 'birth_year'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return (
             f"Full name: {self.first_name} {self.last_name}, "
@@ -30,58 +63,40 @@ class Voter (models.Model):
 
 
 
-def load_data():
-    '''Function to load data records from CSV file into Django model instances.'''
-
-    ## very dangerous!
-    #Voter.objects.all().delete()
-
-    filename = '/Users/luisavazquezusabiaga/django/newton_voters.csv'
-    f = open(filename, 'r') # open the file for reading
-
-    # discard headers:
-    f.readline() # do nothing with it
-
-    # read several rows
-    # for i in range(5):
-        # line = f.readline()
-
-    # read entire file, one line at the time
-    for line in f:
-
-        try: 
-
-            fields = line.strip().split(',')
-            # print(fields)
-            # for j in range(len(fields)):
-            #     print(f'fields[{j}] = {fields[j]}') 
-
-            # create a new instance of Result object with this record from CSV
-            voter = Voter(
-                last_name = fields[1],
-                first_name = fields[2],
-                address_street_number = fields[3],
-                address_street_name = fields[4],
-                address_apartment_number = fields[5] or None,
-                address_zip_code = fields[6],
-                date_birth = fields[7],
-                date_registration = fields[8],
-                party = fields[9],
-                precinct_number = fields[10],
-                v20state = 1 if fields[11].upper() == 'TRUE' else 0,
-                v21town = 1 if fields[12].upper() == 'TRUE' else 0,
-                v21primary = 1 if fields[13].upper() == 'TRUE' else 0,
-                v22general = 1 if fields[14].upper() == 'TRUE' else 0,
-                v23town = 1 if fields[15].upper() == 'TRUE' else 0,
-                voter_score = fields[16],
-            )
-            
-            voter.save() # commit to database
-            #print(f'Created result: {result}.')
-        
-        except Exception as e: 
-            print("Something went wrong!", e)
-            print(f"line={line}")
-        
-    print(f"Created {len(Voter.objects.all())} Voters")
+class VoterRollup(models.Model):
+    '''
+    Pre-aggregated voter counts read by the graphs page, one row per
+    (kind, key), e.g. ('party', 'D') or ('birth_year', '1980').
+    Kept current incrementally by rollups.py.
+    '''
+    KIND_CHOICES = [
+        ('total', 'All voters'),
+        ('birth_year', 'Year of birth'),
+        ('party', 'Party affiliation'),
+        ('election', 'Voted in election'),
+        ('voter_score', 'Voter score'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    key = models.CharField(max_length=20, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='unique_voter_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}={self.key}: {self.count}"
+
+
+def load_data(filename='/Users/luisavazquezusabiaga/django/newton_voters.csv'):
+    '''Function to load data records from CSV file into Django model instances.
+
+    Kept for the shell; delegates to the batched importer used by
+    `manage.py import_voters`, which should be preferred.'''
+    from .importer import import_voters
 
+    with open(filename, newline='') as f:
+        stats = import_voters(f, upsert=True)
+    print(stats)
@@ -0,0 +1,119 @@
+# File: rollups.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: pre-aggregated voter counts (VoterRollup) for the graphs page.
+#
+#   Notes:
+#   - Every voter contributes +1 to a handful of (kind, key) buckets: the
+#     total, their birth year, party, voter score and each election they
+#     voted in (see contributions()).
+#   - Edits go through signals.py and bulk imports through importer.py; both
+#     only apply the difference between the old and new contributions, with
+#     atomic F() updates, so the rollups never need a full table scan.
+#   - rebuild() recomputes everything from scratch in one pass per dimension
+#     (manage.py rebuild_voter_rollups).
+#   - Both drop the cached filter-form facets (facets.py) once they commit.
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import ExtractYear
+
+from cs412 import database
+
+from . import facets
+from .models import Voter, VoterRollup
+
+ELECTION_FIELDS = ['v20state', 'v21town', 'v21primary', 'v22general', 'v23town']
+
+# Voter fields that contributions() reads
+ROLLUP_FIELDS = ['date_birth', 'party', 'voter_score'] + ELECTION_FIELDS
+
+
+def contributions(voter):
+    '''Return a Counter of the (kind, key) buckets this voter is counted in.'''
+    buckets = Counter({('total', ''): 1})
+    if voter.date_birth:
+        buckets['birth_year', str(voter.date_birth.year)] += 1
+    if voter.party:
+        buckets['party', voter.party] += 1
+    if voter.voter_score is not None:
+        buckets['voter_score', str(voter.voter_score)] += 1
+    for field in ELECTION_FIELDS:
+        if getattr(voter, field) == 1:
+            buckets['election', field] += 1
+    return buckets
+
+
+def rollups_changed():
+    '''The counts changed with UPDATEs (no signals): drop the facet lists and the cached voter pages.'''
+    # both are keyed on the VoterRollup version
+    facets.invalidate()
+
+
+def apply(delta):
+    '''Add a Counter of (kind, key) -> change to the rollup table.'''
+    with transaction.atomic():
+        changed = False
+        for (kind, key), change in delta.items():
+            if not change:
+                continue
+            changed = True
+            updated = VoterRollup.objects.filter(kind=kind, key=key).update(count=F('count') + change)
+            if not updated:
+                VoterRollup.objects.create(kind=kind, key=key, count=change)
+        if changed:
+            transaction.on_commit(rollups_changed)
+
+
+def diff(old_voters, new_voters):
+    '''Return the rollup change for replacing old_voters with new_voters.'''
+    delta = Counter()
+    for voter in new_voters:
+        delta.update(contributions(voter))
+    for voter in old_voters:
+        delta.subtract(contributions(voter))
+    return delta
+
+
+# count the primary's voters, not the last analytics snapshot's
+@database.use_primary()
+def rebuild():
+    '''Recompute every rollup from the Voter table.'''
+    rows = [VoterRollup(kind='total', key='', count=Voter.objects.count())]
+
+    by_year = (
+        Voter.objects.annotate(year=ExtractYear('date_birth'))
+        .exclude(year__isnull=True)
+        .values('year').annotate(n=Count('id'))
+    )
+    rows += [VoterRollup(kind='birth_year', key=str(r['year']), count=r['n']) for r in by_year]
+
+    by_party = Voter.objects.exclude(party__isnull=True).exclude(party='').values('party').annotate(n=Count('id'))
+    rows += [VoterRollup(kind='party', key=r['party'], count=r['n']) for r in by_party]
+
+    by_score = Voter.objects.values('voter_score').annotate(n=Count('id'))
+    rows += [VoterRollup(kind='voter_score', key=str(r['voter_score']), count=r['n']) for r in by_score]
+
+    # all five election counts in a single conditional-aggregate pass
+    elections = Voter.objects.aggregate(**{
+        field: Count('id', filter=Q(**{field: 1})) for field in ELECTION_FIELDS
+    })
+    rows += [VoterRollup(kind='election', key=field, count=n) for field, n in elections.items()]
+
+    with transaction.atomic():
+        VoterRollup.objects.all().delete()
+        VoterRollup.objects.bulk_create(rows)
+        transaction.on_commit(rollups_changed)
+
+
+def get_counts(kind):
+    '''Return {key: count} for one kind of rollup, skipping empty buckets.'''
+    return dict(
+        VoterRollup.objects.filter(kind=kind, count__gt=0).values_list('key', 'count')
+    )
+
+
+def get_total():
+    '''Return the number of voters.'''
+    return get_counts('total').get('', 0)
@@ -0,0 +1,43 @@
+# File: signals.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description:
+#   Keeps the voter rollups (rollups.py) current when a single Voter is
+#   created, edited or deleted. Bulk imports update the rollups themselves.
+#   Also drops the cached facet lists when a new analytics snapshot (where the
+#   rollups are read from, see cs412/database.py) is swapped in.
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from cs412.database import analytics_synced
+
+from . import facets, rollups
+from .models import Voter
+
+
+@receiver(pre_save, sender=Voter)
+def remember_old_voter(sender, instance, using, **kwargs):
+    '''Load the stored version of an edited Voter so post_save can diff against it.'''
+    instance._rollup_old = None
+    if instance.pk:
+        # from the database being written, not the (possibly older) snapshot
+        instance._rollup_old = Voter.objects.using(using).filter(pk=instance.pk).only(*rollups.ROLLUP_FIELDS).first()
+
+
+@receiver(post_save, sender=Voter)
+def update_rollups_on_save(sender, instance, **kwargs):
+    '''Apply the change in rollup buckets caused by this save.'''
+    old = getattr(instance, '_rollup_old', None)
+    rollups.apply(rollups.diff([old] if old else [], [instance]))
+
+
+@receiver(post_delete, sender=Voter)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    '''Remove a deleted Voter from its rollup buckets.'''
+    rollups.apply(rollups.diff([instance], []))
+
+
+@receiver(analytics_synced)
+def refresh_facets(sender, **kwargs):
+    '''The facet lists come from the rollups in the snapshot, which was just replaced.'''
+    facets.invalidate()
@@ -1,3 +1,297 @@
+# File: tests.py
+# Author: Luisa Vazquez Usabiaga (lvu@bu.edu), 10/18/2026
+# Description: tests for voter analytics
+
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.http import QueryDict
 from django.test import TestCase
+from django.urls import reverse
+
+from cs412 import caching
+from cs412.pagination import encode_cursor
+
+from . import facets, graph_cache, rollups
+from .filters import VoterFilter
+from .importer import import_voters
+from .models import Voter, VoterRollup
+
+HEADER = ("Voter ID Number,Last Name,First Name,Residential Address - Street Number,"
+          "Residential Address - Street Name,Residential Address - Apartment Number,"
+          "Residential Address - Zip Code,Date of Birth,Date of Registration,Party Affiliation,"
+          "Precinct Number,v20state,v21town,v21primary,v22general,v23town,voter_score\n")
+
+ROWS = [
+    '04MDA1234000,SMITH,JOHN,12,"Main St, Rear",,2459,1980-05-01,2000-01-01,D ,1,TRUE,FALSE,FALSE,TRUE,TRUE,3\n',
+    '04MDA1234001,DOE,JANE,14,Main St,2,2459,1990-05-01,,R ,2,TRUE,TRUE,TRUE,TRUE,TRUE,5\n',
+]
+BAD_ROW = '04MDA1234002,BAD,ROW,x,Main St,2,2459,1990-05-01,,R ,2,TRUE,TRUE,TRUE,TRUE,TRUE,5\n'
+
+
+def csv_lines(*rows):
+    return StringIO(HEADER + ''.join(rows))
+
+
+class VoterImporterTest(TestCase):
+    '''The CSV importer converts rows, rejects bad ones and can be re-run without duplicating voters.'''
+
+    def test_rows_are_converted(self):
+        stats = import_voters(csv_lines(*ROWS))
+        self.assertEqual((stats.read, stats.written, stats.rejected), (2, 2, 0))
+
+        smith = Voter.objects.get(voter_id='04MDA1234000')
+        self.assertEqual(smith.address_street_name, 'Main St, Rear')
+        self.assertIsNone(smith.address_apartment_number)
+        self.assertEqual(smith.date_birth, date(1980, 5, 1))
+        self.assertEqual((smith.party, smith.party_code, smith.birth_year), ('D', 'D', 1980))
+        self.assertEqual((smith.v20state, smith.v21town, smith.voter_score), (1, 0, 3))
+        self.assertEqual(rollups.get_total(), 2)
+
+    def test_rejected_rows_go_to_the_rejects_file(self):
+        rejects = StringIO()
+        stats = import_voters(csv_lines(ROWS[0], BAD_ROW), rejects=rejects)
+        self.assertEqual((stats.written, stats.rejected), (1, 1))
+
+        lines = rejects.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith(',error'))
+        self.assertTrue(lines[1].startswith('04MDA1234002,BAD,ROW,x,'))
+        self.assertIn('invalid literal', lines[1])
+
+    def test_reimport_is_idempotent(self):
+        import_voters(csv_lines(*ROWS), batch_size=1)
+        import_voters(csv_lines(*ROWS), batch_size=1)
+        self.assertEqual(Voter.objects.count(), 2)
+
+        changed = ROWS[1].replace('R ,2,', 'D ,2,')
+        import_voters(csv_lines(ROWS[0], changed), upsert=True)
+        import_voters(csv_lines(ROWS[0], changed), upsert=True)
+        self.assertEqual(Voter.objects.count(), 2)
+        self.assertEqual(Voter.objects.get(voter_id='04MDA1234001').party_code, 'D')
+        self.assertEqual(rollups.get_counts('party'), {'D': 2})
+
+    def test_insert_mode_skips_existing_voters(self):
+        import_voters(csv_lines(ROWS[0]))
+        stats = import_voters(csv_lines(ROWS[0].replace('D ,1,', 'R ,1,')))
+        self.assertEqual(stats.written, 0)
+        self.assertEqual(Voter.objects.get().party, 'D')
+
+    def test_voters_stored_without_an_id_are_matched_not_duplicated(self):
+        # a row from before migration 0004, when the voter id was not stored
+        Voter.objects.create(
+            last_name='SMITH', first_name='JOHN', address_street_number=12, address_street_name='Main St, Rear',
+            address_zip_code=2459, date_birth=date(1980, 5, 1), party='R', voter_score=1,
+        )
+        rollups.rebuild()
+
+        import_voters(csv_lines(*ROWS), upsert=True)
+        self.assertEqual(Voter.objects.count(), 2)
+        self.assertFalse(Voter.objects.filter(voter_id__isnull=True).exists())
+        self.assertEqual(Voter.objects.get(voter_id='04MDA1234000').party, 'D')
+        self.assertEqual(rollups.get_counts('party'), {'D': 1, 'R': 1})
+
+
+def make_voter(voter_id, last_name='LEE', first_name='SAM', party='D', born=1980, score=2, elections=(1, 0, 0, 1, 0)):
+    '''An unsaved Voter; elections are the five flags in rollups.ELECTION_FIELDS order.'''
+    v20state, v21town, v21primary, v22general, v23town = elections
+    return Voter(
+        voter_id=voter_id, last_name=last_name, first_name=first_name,
+        address_street_number=1, address_street_name='Beacon St', address_zip_code=2459,
+        date_birth=date(born, 1, 1), party=party, voter_score=score, v20state=v20state, v21town=v21town,
+        v21primary=v21primary, v22general=v22general, v23town=v23town,
+    )
+
+
+def rollup_counts():
+    '''Every non-empty rollup bucket, {(kind, key): count}.'''
+    return {
+        (kind, key): count
+        for kind, key, count in VoterRollup.objects.filter(count__gt=0).values_list('kind', 'key', 'count')
+    }
+
+
+class VoterRollupTest(TestCase):
+    '''The rollups kept by signals and imports match a full rebuild.'''
+
+    def test_incremental_changes_match_a_rebuild(self):
+        # single saves and deletes go through signals.py
+        first = make_voter('A1')
+        first.save()
+        second = make_voter('A2', party='R', born=1975, score=5, elections=(1, 1, 1, 1, 1))
+        second.save()
+        make_voter('A3', party='U', born=2001, score=0, elections=(0, 0, 0, 0, 0)).save()
+        second.party = 'D'
+        second.date_birth = date(1990, 6, 1)
+        second.v21town = 0
+        second.save()
+        first.delete()
+        # bulk imports apply their own delta
+        import_voters(csv_lines(*ROWS))
+        import_voters(csv_lines(ROWS[1].replace('R ,2,', 'L ,2,')), upsert=True)
+
+        incremental = rollup_counts()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollup_counts())
+        self.assertEqual(rollups.get_total(), 4)
+        self.assertEqual(rollups.get_counts('party'), {'D': 2, 'L': 1, 'U': 1})
+
+    def test_buckets_emptied_by_a_delete_are_not_reported(self):
+        voter = make_voter('A1', party='G')
+        voter.save()
+        voter.delete()
+        self.assertEqual(rollups.get_counts('party'), {})
+        self.assertEqual(rollups.get_total(), 0)
+
+
+class VoterGraphCacheTest(TestCase):
+    '''The graph divs are rendered once per version of the rollups.'''
+
+    def setUp(self):
+        cache.clear()
+        make_voter('A1').save()
+
+    def test_hit_miss_and_invalidation(self):
+        divs, hit = graph_cache.get_graph_divs()
+        self.assertFalse(hit)
+        self.assertIn('graph_div_party', divs)
+        self.assertIn('n=1', divs['graph_div_party'])
+
+        cached, hit = graph_cache.get_graph_divs()
+        self.assertTrue(hit)
+        self.assertEqual(cached, divs)
+
+        # a new voter changes the rollups and so the version
+        make_voter('A2', party='R').save()
+        divs, hit = graph_cache.get_graph_divs()
+        self.assertFalse(hit)
+        self.assertIn('n=2', divs['graph_div_party'])
+        self.assertEqual(graph_cache.get_stats(), {'hits': 1, 'misses': 2})
+
+    def test_graphs_page_reports_the_cache(self):
+        response = self.client.get(reverse('graphs'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Graph-Cache'], 'miss')
+        # plotly.js (about 3 MB) comes from a static file, not inline in each div
+        self.assertContains(response, 'plotly/plotly.min.js')
+        self.assertLess(len(response.content), 500_000)
+        self.assertEqual(self.client.get(reverse('graphs'))['X-Graph-Cache'], 'hit')
+
+
+class VoterFilterTest(TestCase):
+    '''The list filters combine as AND, ignore malformed values and match party case-insensitively.'''
+
+    def setUp(self):
+        cache.clear()
+        make_voter('A1', last_name='ADAMS', party='D', born=1960, score=4, elections=(1, 1, 0, 1, 1)).save()
+        make_voter('A2', last_name='BAKER', party='R ', born=1985, score=2, elections=(1, 0, 0, 1, 0)).save()
+        make_voter('A3', last_name='CRUZ', party='d', born=1985, score=2, elections=(0, 0, 0, 1, 1)).save()
+        make_voter('A4', last_name='DIAZ', party='U', born=2002, score=0, elections=(0, 0, 0, 0, 0)).save()
+
+    def names(self, query):
+        return [voter.last_name for voter in VoterFilter(QueryDict(query)).apply().order_by('last_name')]
+
+    def test_combinations(self):
+        self.assertEqual(self.names(''), ['ADAMS', 'BAKER', 'CRUZ', 'DIAZ'])
+        self.assertEqual(self.names('party=d'), ['ADAMS', 'CRUZ'])
+        self.assertEqual(self.names('party=R'), ['BAKER'])
+        self.assertEqual(self.names('min_year=1980&max_year=1989'), ['BAKER', 'CRUZ'])
+        self.assertEqual(self.names('party=d&min_year=1980'), ['CRUZ'])
+        self.assertEqual(self.names('voter_score=2&elections=23town'), ['CRUZ'])
+        self.assertEqual(self.names('elections=20state&elections=22general'), ['ADAMS', 'BAKER'])
+        self.assertEqual(self.names('party=u&voter_score=4'), [])
+
+    def test_malformed_values_are_ignored(self):
+        voter_filter = VoterFilter(QueryDict('min_year=abc&max_year=&voter_score=x&elections=99future&party=+'))
+        self.assertEqual(voter_filter.get_filters(), {})
+        self.assertEqual(self.names('min_year=abc&party=d'), ['ADAMS', 'CRUZ'])
+
+    def test_list_page_applies_the_filters(self):
+        response = self.client.get(reverse('voters'), {'party': 'd', 'elections': '23town'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([voter.last_name for voter in response.context['voters']], ['ADAMS', 'CRUZ'])
+
+
+class VoterKeysetPaginationTest(TestCase):
+    '''The voter list pages by cursor, forwards and back, in name order with id breaking ties.'''
+
+    def setUp(self):
+        cache.clear()
+        # seven names for 230 voters, so most pages start and end inside a run of ties
+        voters = [make_voter(f'K{i:03d}', last_name=f'NAME{i % 7}') for i in range(230)]
+        for voter in voters:
+            voter.set_derived_fields()
+        Voter.objects.bulk_create(voters)
+        self.expected = list(Voter.objects.order_by('last_name', 'first_name', 'id').values_list('pk', flat=True))
+
+    def get_page(self, query=''):
+        response = self.client.get(f"{reverse('voters')}?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_forward_and_back(self):
+        pages = [self.get_page('party=d')]
+        while pages[-1].has_next():
+            self.assertIn('party=d', pages[-1].next_query)
+            pages.append(self.get_page(pages[-1].next_query))
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        self.assertEqual([voter.pk for page in pages for voter in page], self.expected)
+        self.assertEqual(pages[0].paginator.count, 230)
+        self.assertFalse(pages[0].has_previous())
+
+        # back from the last page gives the same rows as on the way forward
+        back = self.get_page(pages[2].previous_query)
+        self.assertEqual((back.number, [voter.pk for voter in back]), (2, [voter.pk for voter in pages[1]]))
+        self.assertTrue(back.has_next())
+        # page 1 is linked without a cursor
+        self.assertEqual(back.previous_query, 'party=d')
+
+    def test_bad_cursor_shows_the_first_page(self):
+        first = self.get_page('')
+        for cursor in ('garbage', encode_cursor(['NAME1'], 'n', 2), encode_cursor(['A', 'B', 1], 'x', 2),
+                       encode_cursor(['A', 'B', 'not-an-id'], 'n', 2)):
+            page = self.get_page(f'cursor={cursor}')
+            self.assertEqual((page.number, [voter.pk for voter in page]), (1, [voter.pk for voter in first]))
+            self.assertFalse(page.has_previous())
+
+
+class VoterFacetTest(TestCase):
+    '''The filter-form choices come from the rollups, cached until the rollups change.'''
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            make_voter('A1', party='D', born=1960, score=4).save()
+            make_voter('A2', party='d', born=1985, score=2).save()
+            make_voter('A3', party='R', born=1985, score=2).save()
+
+    def test_counts(self):
+        self.assertEqual(facets.get_facets(), {
+            'party': [('D', 2), ('R', 1)],
+            'year': [(1960, 1), (1985, 2)],
+            'score': [(2, 2), (4, 1)],
+        })
+        response = self.client.get(reverse('voters'))
+        self.assertEqual(response.context['party_list'], [('D', 2), ('R', 1)])
+
+    def test_cached_until_the_rollups_change(self):
+        facets.get_facets()
+        with self.assertNumQueries(0):
+            facets.get_facets()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_voter('A4', party='G', born=2000, score=0).save()
+        self.assertIn(('G', 1), facets.get_facets()['party'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Voter.objects.get(voter_id='A4').delete()
+        self.assertNotIn(('G', 1), facets.get_facets()['party'])
 
-# Create your tests here.
+    def test_follows_a_version_bumped_by_another_process(self):
+        facets.get_facets()
+        # e.g. sync_analytics or an import in another process: only the shared
+        # version changes, this process's cached entry is never deleted
+        VoterRollup.objects.filter(kind='party', key='R').update(count=5)
+        caching.bump_model_version(VoterRollup)
+        self.assertIn(('R', 5), facets.get_facets()['party'])